@@ -1,18 +1,81 @@
 from agno.agent import Agent, RunResponse
-from agno.models.anthropic import Claude
-from agno.models.google import Gemini
 from agno.tools.googlesearch import GoogleSearchTools
-from agno.tools.crawl4ai import Crawl4aiTools
-from agno.storage.sqlite import SqliteStorage
+from app.tools.cached_crawl4ai import CachedCrawl4aiTools
 from app.agents.base_agent import BaseAgent
+from app.agents.pooled_gemini import PooledGemini
+from app.agents.semantic_cache import SemanticCache, normalize_text
 from app.agents.agent_prompt_repository import agent_prompt_repository
 from app.agents.enum.agent_enum import AgentType
 from app.core.setting import settings
+from app.db.agent_storage import WalSqliteStorage
 from app.tools.geo_intelligence_tools import FreeGeoIntelligenceTools, FreeHealthDataSources
 import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any, Iterator
-from agno.utils.pprint import pprint_run_response
+from typing import Dict, Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+# The epidemiological and healthcare resource analyses both build on the geographic
+# context but not on each other, so they run side by side
+_ANALYSIS_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="location-analysis")
+
+# Finished reports keyed by the analysis options and looked up by the normalized location and
+# patient context; outbreak data goes stale quickly, so entries live for an hour by default
+_REPORT_CACHE = SemanticCache(
+    maxsize=256,
+    ttl=settings.LOCATION_REPORT_CACHE_TTL_HOURS * 3600,
+    db_file=settings.SEMANTIC_CACHE_DB,
+    table="location_report_cache",
+)
+
+ERROR_REPORT_TITLE = "# Location Specific Intelligence Medical Report - Error"
+
+# Section outline of the final report; it lives in the main agent's instructions so the
+# per-request synthesis prompt only carries the request and the sub-agent results
+REPORT_OUTLINE = """
+Structure every report as:
+
+# Location Specific Intelligence Medical Report
+
+## Executive Summary
+- Overall situation assessment
+- Key findings and immediate actions
+- Critical contact information
+
+## Geographic Health Context
+- Location details and jurisdiction
+- Demographics and population factors
+- Administrative health contacts
+
+## Current Health Situation
+- Disease surveillance and outbreaks
+- Health alerts and advisories
+- Seasonal and endemic risks
+
+## Healthcare Resources
+- Emergency and urgent care availability
+- Specialist and primary care options
+- Capacity, quality, and accessibility
+
+## Risk Assessment & Recommendations
+- Detailed risk analysis and levels
+- Immediate and preventive actions
+- Monitoring and escalation protocols
+
+## Emergency Preparedness
+- Emergency contacts and procedures
+- Facility recommendations by urgency
+- Transportation and backup plans
+
+## Data Quality & Next Steps
+- Analysis confidence and limitations
+- Recommended follow-up actions
+- Update schedule and monitoring
+
+FORMATTING: Use clear markdown, highlight critical info, provide specific actionable steps.
+"""
 
 
 class LocationSpecificAgent(BaseAgent):
@@ -35,20 +98,22 @@ class LocationSpecificAgent(BaseAgent):
         self.health_sources = FreeHealthDataSources()
         
         # Create the main agent with sub-agent capabilities
-        self.main_agent = self._create_main_agent()
+        self.main_agent = self._shared_agent("main_agent", self._create_main_agent)
         
         # Create specialized sub-agents
-        self.geographic_sub_agent = self._create_geographic_sub_agent()
-        self.epidemiological_sub_agent = self._create_epidemiological_sub_agent()
-        self.healthcare_resource_sub_agent = self._create_healthcare_resource_sub_agent()
-        self.risk_assessment_sub_agent = self._create_risk_assessment_sub_agent()
+        self.geographic_sub_agent = self._shared_agent("geographic_sub_agent", self._create_geographic_sub_agent)
+        self.epidemiological_sub_agent = self._shared_agent("epidemiological_sub_agent", self._create_epidemiological_sub_agent)
+        self.healthcare_resource_sub_agent = self._shared_agent(
+            "healthcare_resource_sub_agent", self._create_healthcare_resource_sub_agent
+        )
+        self.risk_assessment_sub_agent = self._shared_agent("risk_assessment_sub_agent", self._create_risk_assessment_sub_agent)
     
     def _create_main_agent(self):
         """Create the main location intelligence agent"""
         return Agent(
             name="Location Specific Intelligence Medical Agent",
             role="Master location intelligence coordinator with comprehensive health analysis capabilities",
-            model=Gemini(
+            model=PooledGemini(
                 id="gemini-2.0-flash",
                 api_key=settings.GOOGLE_API_KEY,
             ),
@@ -61,15 +126,16 @@ class LocationSpecificAgent(BaseAgent):
                 "Generate actionable recommendations for healthcare providers and patients",
                 "Ensure all recommendations are evidence-based and location-specific",
                 "Include emergency preparedness and response protocols",
-                "Synthesize data from all sub-agent analyses into cohesive intelligence"
+                "Synthesize data from all sub-agent analyses into cohesive intelligence",
+                REPORT_OUTLINE
             ],
             tools=[
                 GoogleSearchTools(fixed_max_results=10),
-                Crawl4aiTools(max_length=8000)
+                CachedCrawl4aiTools(max_length=8000)
             ],
             show_tool_calls=True,
             markdown=True,
-            storage=SqliteStorage(table_name="location_specific_agent", db_file=self.AGENT_STORAGE),
+            storage=WalSqliteStorage(table_name="location_specific_agent", db_file=self.AGENT_STORAGE),
             stream=True
         )
     
@@ -78,7 +144,7 @@ class LocationSpecificAgent(BaseAgent):
         return Agent(
             name="Geographic Context Sub-Agent",
             role="Geographic health intelligence specialist with real-time search capabilities",
-            model=Gemini(
+            model=PooledGemini(
                 id="gemini-2.0-flash",
                 api_key=settings.GOOGLE_API_KEY,
             ),
@@ -88,11 +154,15 @@ class LocationSpecificAgent(BaseAgent):
                 "Search for health jurisdiction information and administrative boundaries",
                 "Validate coordinates and standardize location data",
                 "Research demographic and population health data",
-                "Provide structured geographic context for health analysis"
+                "Provide structured geographic context for health analysis",
+                "Enhance the basic geographic data you are given with: health jurisdiction information and contacts, "
+                "administrative boundaries and health authorities, demographic and population health data, "
+                "and any special health administrative considerations",
+                "Format responses as structured data for further analysis"
             ],
             tools=[
                 GoogleSearchTools(fixed_max_results=5),
-                Crawl4aiTools(max_length=5000)
+                CachedCrawl4aiTools(max_length=5000)
             ],
             show_tool_calls=True,
             markdown=False,
@@ -104,7 +174,7 @@ class LocationSpecificAgent(BaseAgent):
         return Agent(
             name="Epidemiological Intelligence Sub-Agent", 
             role="Epidemiological intelligence analyst with real-time monitoring capabilities",
-            model=Gemini(
+            model=PooledGemini(
                 id="gemini-2.0-flash",
                 api_key=settings.GOOGLE_API_KEY,
             ),
@@ -114,11 +184,13 @@ class LocationSpecificAgent(BaseAgent):
                 "Search CDC, WHO, and local health department outbreak reports",
                 "Track antimicrobial resistance patterns and travel advisories", 
                 "Analyze seasonal disease patterns and emerging threats",
-                "Provide structured epidemiological intelligence data"
+                "Provide structured epidemiological intelligence data",
+                "Cover: current outbreak monitoring and assessment, endemic disease risks and seasonal patterns, "
+                "travel health advisories and requirements, antimicrobial resistance patterns, and surveillance data and trends"
             ],
             tools=[
                 GoogleSearchTools(fixed_max_results=10),
-                Crawl4aiTools(max_length=8000)
+                CachedCrawl4aiTools(max_length=8000)
             ],
             show_tool_calls=True,
             markdown=False,
@@ -130,7 +202,7 @@ class LocationSpecificAgent(BaseAgent):
         return Agent(
             name="Healthcare Resource Mapping Sub-Agent",
             role="Healthcare resource specialist with real-time facility monitoring capabilities",
-            model=Gemini(
+            model=PooledGemini(
                 id="gemini-2.0-flash",
                 api_key=settings.GOOGLE_API_KEY,
             ),
@@ -140,11 +212,15 @@ class LocationSpecificAgent(BaseAgent):
                 "Search for hospital capacity, emergency services, and specialist availability",
                 "Research insurance acceptance and transportation options",
                 "Assess facility quality ratings and current availability status",
-                "Provide structured healthcare resource mapping data"
+                "Provide structured healthcare resource mapping data",
+                "Cover: emergency services and hospital capacity, primary care and specialist availability, "
+                "urgent care and walk-in clinic options, insurance coverage and payment options, "
+                "transportation and accessibility factors, and quality ratings and facility recommendations",
+                "Prioritize based on the emergency level and patient needs"
             ],
             tools=[
                 GoogleSearchTools(fixed_max_results=12),
-                Crawl4aiTools(max_length=6000)
+                CachedCrawl4aiTools(max_length=6000)
             ],
             show_tool_calls=True,
             markdown=False,
@@ -156,7 +232,7 @@ class LocationSpecificAgent(BaseAgent):
         return Agent(
             name="Risk Assessment & Alert Sub-Agent",
             role="Public health risk assessment specialist with real-time advisory monitoring capabilities",
-            model=Gemini(
+            model=PooledGemini(
                 id="gemini-2.0-flash",
                 api_key=settings.GOOGLE_API_KEY,
             ),
@@ -166,11 +242,15 @@ class LocationSpecificAgent(BaseAgent):
                 "Generate risk assessments based on geographic, epidemiological, and resource data",
                 "Search for current health advisories and prevention guidelines",
                 "Create emergency preparedness and response protocols",
-                "Provide structured risk assessment and alert data"
+                "Provide structured risk assessment and alert data",
+                "Cover: overall risk level (low/moderate/high/critical), primary health risks and threats, "
+                "immediate and long-term recommendations, preventive measures and interventions, "
+                "emergency preparedness and contact information, and monitoring alerts and escalation protocols",
+                "Base the assessment on the data provided and make recommendations actionable"
             ],
             tools=[
                 GoogleSearchTools(fixed_max_results=8),
-                Crawl4aiTools(max_length=6000)
+                CachedCrawl4aiTools(max_length=6000)
             ],
             show_tool_calls=True,
             markdown=False,
@@ -194,49 +274,63 @@ class LocationSpecificAgent(BaseAgent):
         Returns:
             Comprehensive health intelligence report
         """
+        cache_key = ("location_health_intelligence", emergency_level, query_type)
+        request = f"{normalize_text(location_input)}\n{normalize_text(patient_context or '')}"
+        if settings.LOCATION_REPORT_CACHE_ENABLED:
+            cached = _REPORT_CACHE.get(cache_key, request, strategy="exact-match")
+            if cached is not None:
+                logger.info("Returning cached location intelligence report for: %s", location_input)
+                return cached
+
+        # The sub-agents are reused across requests, so each analysis starts them on a fresh session
+        self.new_sessions()
         try:
-            print(f"Starting Location Specific Intelligence Analysis for: {location_input}")
-            print(f"Emergency level: {emergency_level}, Query type: {query_type}")
+            logger.info("Starting location intelligence analysis for: %s", location_input)
+            logger.info("Emergency level: %s, query type: %s", emergency_level, query_type)
             
             # Step 1: Geographic Context Analysis (Sub-Agent)
-            print("\n=== STEP 1: Geographic Context Analysis (Sub-Agent) ===")
+            logger.debug("Step 1: Geographic Context Analysis (Sub-Agent)")
             geographic_data = self._run_geographic_analysis(location_input, patient_context)
-            print("Geographic analysis completed")
+            logger.debug("Geographic analysis completed")
             
-            # Step 2: Epidemiological Intelligence Monitoring (Sub-Agent)
-            print("\n=== STEP 2: Epidemiological Intelligence Monitoring (Sub-Agent) ===")
-            epidemiological_data = self._run_epidemiological_analysis(
-                geographic_data, query_type, patient_context
+            # Steps 2 and 3: Epidemiological Intelligence Monitoring and Healthcare Resource Mapping (Sub-Agents, concurrently)
+            logger.debug("Steps 2-3: Epidemiological Intelligence Monitoring and Healthcare Resource Mapping (Sub-Agents)")
+            epidemiological_future = _ANALYSIS_POOL.submit(
+                self._run_epidemiological_analysis, geographic_data, query_type, patient_context
             )
-            print("Epidemiological monitoring completed")
-            
-            # Step 3: Healthcare Resource Mapping (Sub-Agent)
-            print("\n=== STEP 3: Healthcare Resource Mapping (Sub-Agent) ===")
-            healthcare_resources = self._run_healthcare_resource_analysis(
-                geographic_data, patient_context, emergency_level
+            resources_future = _ANALYSIS_POOL.submit(
+                self._run_healthcare_resource_analysis, geographic_data, patient_context, emergency_level
             )
-            print("Healthcare resource mapping completed")
+            epidemiological_data = epidemiological_future.result()
+            healthcare_resources = resources_future.result()
+            logger.debug("Epidemiological monitoring and healthcare resource mapping completed")
             
             # Step 4: Risk Assessment and Alert Generation (Sub-Agent)
-            print("\n=== STEP 4: Risk Assessment and Alert Generation (Sub-Agent) ===")
+            logger.debug("Step 4: Risk Assessment and Alert Generation (Sub-Agent)")
             risk_assessment = self._run_risk_assessment_analysis(
                 geographic_data, epidemiological_data, healthcare_resources, patient_context
             )
-            print("Risk assessment completed")
+            logger.debug("Risk assessment completed")
             
             # Step 5: Master Synthesis and Final Report Generation (Main Agent)
-            print("\n=== STEP 5: Master Synthesis and Report Generation (Main Agent) ===")
+            logger.debug("Step 5: Master Synthesis and Report Generation (Main Agent)")
             final_report = self._generate_comprehensive_report(
                 location_input, patient_context, emergency_level, query_type,
                 geographic_data, epidemiological_data, healthcare_resources, risk_assessment
             )
             
-            print("Location Specific Intelligence Analysis completed successfully.")
+            logger.info("Location intelligence analysis completed successfully.")
+
+            # Reports built on a failed step are returned but not cached, so the next request retries them
+            analyses = (geographic_data, epidemiological_data, healthcare_resources, risk_assessment)
+            if (settings.LOCATION_REPORT_CACHE_ENABLED and final_report and ERROR_REPORT_TITLE not in final_report
+                    and not any("error" in analysis for analysis in analyses)):
+                _REPORT_CACHE.set(cache_key, request, final_report)
             return final_report
             
         except Exception as e:
-            print(f"Error in location intelligence analysis: {e}")
-            return self._create_error_report(location_input, str(e))
+            logger.exception("Location intelligence analysis failed for %s", location_input)
+            return self._create_error_report(location_input, self._fmt_error(e, "location intelligence analysis"))
     
     def _run_geographic_analysis(self, location_input: str, patient_context: str) -> Dict[str, Any]:
         """Run geographic context analysis using sub-agent and tools"""
@@ -246,21 +340,9 @@ class LocationSpecificAgent(BaseAgent):
             
             # Enhanced analysis using geographic sub-agent
             geo_prompt = f"""
-            Enhance the following basic geographic data with comprehensive health context:
-            
             Location Input: {location_input}
             Patient Context: {patient_context or "General population"}
-            
-            Basic Geographic Data:
-            {json.dumps(basic_geo_data, indent=2)}
-            
-            Please provide enhanced geographic health context including:
-            1. Health jurisdiction information and contacts
-            2. Administrative boundaries and health authorities
-            3. Demographic and population health data
-            4. Any special health administrative considerations
-            
-            Format response as structured data for further analysis.
+            Basic Geographic Data: {json.dumps(basic_geo_data)}
             """
             
             response: RunResponse = self.geographic_sub_agent.run(geo_prompt)
@@ -275,7 +357,7 @@ class LocationSpecificAgent(BaseAgent):
             return enhanced_geo_data
             
         except Exception as e:
-            print(f"Error in geographic analysis: {e}")
+            logger.exception("Error in geographic analysis")
             return {'error': str(e), 'basic_data': basic_geo_data if 'basic_geo_data' in locals() else {}}
     
     def _run_epidemiological_analysis(self, geographic_data: Dict, query_type: str, 
@@ -288,24 +370,11 @@ class LocationSpecificAgent(BaseAgent):
             
             # Enhanced analysis using epidemiological sub-agent
             epi_prompt = f"""
-            Conduct comprehensive epidemiological intelligence analysis:
-            
-            Geographic Context: {json.dumps(geographic_data.get('administrative_levels', {}), indent=2)}
+            Geographic Context: {json.dumps(geographic_data.get('administrative_levels', {}))}
             Query Type: {query_type}
             Patient Context: {patient_context or "General population"}
-            
-            Basic Data Available:
-            - CDC Outbreak Data: {len(basic_outbreak_data)} items
-            - WHO Health Alerts: {len(basic_who_alerts)} items
-            
-            Provide comprehensive epidemiological intelligence including:
-            1. Current outbreak monitoring and assessment
-            2. Endemic disease risks and seasonal patterns
-            3. Travel health advisories and requirements
-            4. Antimicrobial resistance patterns
-            5. Surveillance data and trends
-            
-            Format response as structured intelligence data.
+            CDC Outbreak Data: {len(basic_outbreak_data)} items
+            WHO Health Alerts: {len(basic_who_alerts)} items
             """
             
             response: RunResponse = self.epidemiological_sub_agent.run(epi_prompt)
@@ -321,7 +390,7 @@ class LocationSpecificAgent(BaseAgent):
             return enhanced_epi_data
             
         except Exception as e:
-            print(f"Error in epidemiological analysis: {e}")
+            logger.exception("Error in epidemiological analysis")
             return {'error': str(e), 'basic_data': {'outbreaks': basic_outbreak_data if 'basic_outbreak_data' in locals() else []}}
     
     def _run_healthcare_resource_analysis(self, geographic_data: Dict, patient_context: str,
@@ -329,22 +398,9 @@ class LocationSpecificAgent(BaseAgent):
         """Run healthcare resource mapping analysis using sub-agent"""
         try:
             resource_prompt = f"""
-            Map comprehensive healthcare resources for the location:
-            
-            Geographic Context: {json.dumps(geographic_data.get('administrative_levels', {}), indent=2)}
+            Geographic Context: {json.dumps(geographic_data.get('administrative_levels', {}))}
             Patient Context: {patient_context or "General care needs"}
             Emergency Level: {emergency_level}
-            
-            Provide comprehensive healthcare resource mapping including:
-            1. Emergency services and hospital capacity
-            2. Primary care and specialist availability
-            3. Urgent care and walk-in clinic options
-            4. Insurance coverage and payment options
-            5. Transportation and accessibility factors
-            6. Quality ratings and facility recommendations
-            
-            Prioritize based on emergency level and patient needs.
-            Format response as structured resource data.
             """
             
             response: RunResponse = self.healthcare_resource_sub_agent.run(resource_prompt)
@@ -370,7 +426,7 @@ class LocationSpecificAgent(BaseAgent):
             return resource_data
             
         except Exception as e:
-            print(f"Error in healthcare resource analysis: {e}")
+            logger.exception("Error in healthcare resource analysis")
             return {'error': str(e)}
     
     def _run_risk_assessment_analysis(self, geographic_data: Dict, epidemiological_data: Dict,
@@ -385,10 +441,8 @@ class LocationSpecificAgent(BaseAgent):
             resource_analysis = healthcare_resources.get('resource_analysis', 'Limited resource data')
             
             risk_prompt = f"""
-            Generate comprehensive risk assessment and health alerts:
-            
             GEOGRAPHIC CONTEXT:
-            {json.dumps(admin_levels, indent=2)}
+            {json.dumps(admin_levels)}
             
             EPIDEMIOLOGICAL INTELLIGENCE:
             Basic Outbreaks: {outbreak_count}
@@ -399,17 +453,6 @@ class LocationSpecificAgent(BaseAgent):
             {resource_analysis[:500]}...
             
             PATIENT CONTEXT: {patient_context or "General population"}
-            
-            Provide comprehensive risk assessment including:
-            1. Overall risk level assessment (low/moderate/high/critical)
-            2. Primary health risks and threats identification
-            3. Immediate and long-term recommendations
-            4. Preventive measures and interventions
-            5. Emergency preparedness and contact information
-            6. Monitoring alerts and escalation protocols
-            
-            Base assessment on current data and provide actionable recommendations.
-            Format response as structured risk assessment data.
             """
             
             response: RunResponse = self.risk_assessment_sub_agent.run(risk_prompt)
@@ -423,7 +466,7 @@ class LocationSpecificAgent(BaseAgent):
             return risk_data
             
         except Exception as e:
-            print(f"Error in risk assessment analysis: {e}")
+            logger.exception("Error in risk assessment analysis")
             return {'error': str(e)}
     
     def _generate_comprehensive_report(self, location_input: str, patient_context: str,
@@ -433,8 +476,6 @@ class LocationSpecificAgent(BaseAgent):
         """Generate final comprehensive report using main agent"""
         try:
             synthesis_prompt = f"""
-            Generate a comprehensive Location Specific Intelligence Medical Report:
-            
             QUERY CONTEXT:
             Location: {location_input}
             Patient Context: {patient_context or "General population"}
@@ -445,82 +486,36 @@ class LocationSpecificAgent(BaseAgent):
             SUB-AGENT ANALYSIS RESULTS:
             
             1. GEOGRAPHIC INTELLIGENCE:
-            {json.dumps(geographic_data, indent=2)}
+            {json.dumps(geographic_data)}
             
             2. EPIDEMIOLOGICAL INTELLIGENCE:
-            {json.dumps(epidemiological_data, indent=2)}
+            {json.dumps(epidemiological_data)}
             
             3. HEALTHCARE RESOURCE MAPPING:
-            {json.dumps(healthcare_resources, indent=2)}
+            {json.dumps(healthcare_resources)}
             
             4. RISK ASSESSMENT:
-            {json.dumps(risk_assessment, indent=2)}
-            
-            Generate a comprehensive, actionable health intelligence report with:
-            
-            # Location Specific Intelligence Medical Report
-            
-            ## Executive Summary
-            - Overall situation assessment
-            - Key findings and immediate actions
-            - Critical contact information
-            
-            ## Geographic Health Context
-            - Location details and jurisdiction
-            - Demographics and population factors
-            - Administrative health contacts
-            
-            ## Current Health Situation
-            - Disease surveillance and outbreaks
-            - Health alerts and advisories
-            - Seasonal and endemic risks
-            
-            ## Healthcare Resources
-            - Emergency and urgent care availability
-            - Specialist and primary care options
-            - Capacity, quality, and accessibility
-            
-            ## Risk Assessment & Recommendations
-            - Detailed risk analysis and levels
-            - Immediate and preventive actions
-            - Monitoring and escalation protocols
-            
-            ## Emergency Preparedness
-            - Emergency contacts and procedures
-            - Facility recommendations by urgency
-            - Transportation and backup plans
-            
-            ## Data Quality & Next Steps
-            - Analysis confidence and limitations
-            - Recommended follow-up actions
-            - Update schedule and monitoring
-            
-            FORMATTING: Use clear markdown, highlight critical info, provide specific actionable steps.
+            {json.dumps(risk_assessment)}
             """
             
             # Generate comprehensive report using main agent
             response_stream: Iterator[RunResponse] = self.main_agent.run(synthesis_prompt)
             
             # Collect the streaming response
-            final_content = ""
-            final_response = None
-            for response in response_stream:
-                final_content += response.content
-                final_response = response
-            
-            # Print the final response for debugging
-            if final_response:
-                pprint_run_response(final_response, markdown=True)
-            
-            return final_content
+            return self._collect_content(response_stream)
             
         except Exception as e:
-            return self._create_error_report(location_input, f"Report generation error: {str(e)}")
+            logger.exception("Report generation failed for %s", location_input)
+            return self._create_error_report(location_input, self._fmt_error(e, "report generation"))
+
+    def _fmt_error(self, e: Exception, stage: str) -> str:
+        """Format an exception for the error report"""
+        return f"Error during {stage}: {type(e).__name__}: {e}"
     
     def _create_error_report(self, location_input: str, error_msg: str) -> str:
         """Create error report when analysis fails"""
         return f"""
-        # Location Specific Intelligence Medical Report - Error
+        {ERROR_REPORT_TITLE}
         
         **Location:** {location_input}
         **Analysis Time:** {datetime.now().isoformat()}
@@ -584,7 +579,8 @@ class LocationSpecificAgent(BaseAgent):
             )
             
         except Exception as e:
-            return self._create_error_report(query, str(e))
+            logger.exception("Failed to process location intelligence request")
+            return self._create_error_report(query, self._fmt_error(e, "request parsing"))
     
     def run_location_intelligence(self, location: str, patient_context: str = None,
                                 emergency_level: str = "routine") -> str:
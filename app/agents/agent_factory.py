@@ -1,3 +1,5 @@
+import threading
+
 from app.agents.base_agent import BaseAgent
 from app.agents.ai_agent import AIAgent
 from app.agents.linkedin_writer_agent import LinkedInWriterAgent
@@ -9,6 +11,8 @@ from app.agents.clinical_decision_agents import ClinicalDecisionAgent
 from app.agents.medication_interaction_agent import MedicationInteractionAgent
 from app.agents.enum.agent_enum import AgentType
 
+_thread_agents = threading.local()
+
 
 class AgentFactory:
     _agents = {
@@ -24,7 +28,22 @@ class AgentFactory:
 
     @staticmethod
     def get_agent(agent_type: AgentType) -> BaseAgent:
+        """
+        Return the agent for agent_type, constructed on first use in each worker thread.
+
+        Agents hold agno Agents with per-run state, so like BaseAgent._shared_agent they
+        are reused per thread instead of being shared process-wide, and each call starts
+        their agno Agents on a fresh session so requests do not see each other's runs.
+        """
         agent_class = AgentFactory._agents.get(agent_type)
         if not agent_class:
             raise ValueError(f"No agent found for type: {agent_type}")
-        return agent_class()
+        agents = getattr(_thread_agents, "agents", None)
+        if agents is None:
+            agents = _thread_agents.agents = {}
+        agent = agents.get(agent_type)
+        if agent is None:
+            agent = agents[agent_type] = agent_class()
+        else:
+            agent.new_sessions()
+        return agent
@@ -1,8 +1,8 @@
 from agno.agent import Agent, RunResponse
-from agno.models.anthropic import Claude
 from agno.tools.reasoning import ReasoningTools
 from agno.tools.yfinance import YFinanceTools
 from app.agents.base_agent import BaseAgent
+from app.agents.cached_claude import CachedClaude
 from app.core.setting import settings
 
 
@@ -22,7 +22,7 @@ instructions=[
 class AIAgent(BaseAgent):
     def __init__(self, model_id='claude-3-7-sonnet-latest', tools=tools, instructions=instructions, markdown=True):
         self.agent = Agent(
-            model=Claude(id=model_id, api_key=settings.ANTHROPIC_API_KEY,),
+            model=CachedClaude(id=model_id, api_key=settings.ANTHROPIC_API_KEY,),
             tools=tools,
             instructions=instructions,
             markdown=markdown,
@@ -1,6 +1,172 @@
+import asyncio
+import functools
+import io
+import logging
+import threading
 from abc import ABC, abstractmethod
+from typing import Any, Callable, Iterable, Iterator
+
+from agno.agent import Agent
+from agno.memory.v2.memory import Memory
+
+logger = logging.getLogger(__name__)
+
+_thread_agents = threading.local()
+
+
+def safe_call(default: Any, log_level: int = logging.WARNING) -> Callable:
+    """
+    Make a function return default instead of raising.
+
+    The exception is logged at log_level with the function's name, so optional steps
+    (search enrichment, summaries) can fail without failing the request.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                logger.log(log_level, "%s failed: %s", func.__qualname__, e)
+                return default
+
+        return wrapper
+
+    return decorator
 
 class BaseAgent(ABC):
     @abstractmethod
     def get_response(self, url: str) -> str:
         pass
+
+    @classmethod
+    def _shared_agent(cls, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Return the agno Agent registered under name for this class, building it on first use.
+
+        Agents keep per-run state (run_response, session_id, model tool state), so
+        they are reused per worker thread instead of being shared process-wide. The
+        agent is handed out with a fresh session so it carries nothing over from
+        earlier requests on the thread.
+        """
+        agents = getattr(_thread_agents, "agents", None)
+        if agents is None:
+            agents = _thread_agents.agents = {}
+        key = (cls, name)
+        agent = agents.get(key)
+        if agent is None:
+            agent = agents[key] = factory()
+        else:
+            cls._new_session(agent)
+        return agent
+
+    @classmethod
+    def _new_session(cls, agent: Any) -> None:
+        """
+        Start a fresh session on an agno Agent and its team members, or on every Agent in a dict.
+
+        agno fixes an Agent's session_id on its first run and appends every later run to
+        that session's memory and storage row, so a reused Agent would keep growing and
+        mix unrelated requests. Clearing the session makes the next run start a new one.
+        Unlike Agent.new_session this does not touch storage; the next run creates its row.
+        """
+        if isinstance(agent, dict):
+            for member in agent.values():
+                cls._new_session(member)
+            return
+        if not isinstance(agent, Agent):
+            return
+        agent.session_id = None
+        agent.agent_session = None
+        agent.session_name = None
+        agent.run_response = None
+        if isinstance(agent.memory, Memory):
+            # Memory.clear would also wipe the user memories in its database; only the runs are per session
+            agent.memory.runs = {}
+        elif agent.memory is not None:
+            agent.memory.clear()
+        if agent.model is not None:
+            agent.model.clear()
+        for member in agent.team or ():
+            cls._new_session(member)
+
+    def new_sessions(self) -> None:
+        """Start a fresh session on every agno Agent this agent holds, directly or in a dict of agents"""
+        for value in vars(self).values():
+            self._new_session(value)
+
+    @staticmethod
+    def _thread_loop() -> asyncio.AbstractEventLoop:
+        """
+        Return this worker thread's event loop, creating it on first use.
+
+        The loop stays open between requests: agno models cache async HTTP clients whose
+        pooled connections belong to the loop that opened them, so running each request
+        on a fresh loop (asyncio.run) would find those connections closed.
+        """
+        loop = getattr(_thread_agents, "loop", None)
+        if loop is None or loop.is_closed():
+            loop = _thread_agents.loop = asyncio.new_event_loop()
+        return loop
+
+    @classmethod
+    def _run_async(cls, coroutine: Any) -> Any:
+        """Run a coroutine to completion on this worker thread's event loop"""
+        return cls._thread_loop().run_until_complete(coroutine)
+
+    @classmethod
+    def _run_content(cls, agent: Any, prompt: Any) -> str:
+        """
+        Run an agno Agent to completion and return its content.
+
+        agno's sync Agent.run keeps streaming when the Agent is built with stream=True and
+        then returns only the first chunk for stream=False, so such Agents are run streamed
+        and their chunks collected.
+        """
+        if getattr(agent, "stream", None) is True:
+            return cls._collect_content(agent.run(prompt, stream=True))
+        response = agent.run(prompt, stream=False)
+        return response.content or ""
+
+    @staticmethod
+    async def _arun_content(agent: Any, prompt: Any) -> str:
+        """Run an agno Agent asynchronously without streaming and return its content"""
+        response = await agent.arun(prompt, stream=False)
+        return response.content or ""
+
+    @classmethod
+    async def _arun_content_with_timeout(cls, agent: Any, prompt: Any, timeout: float, retries: int) -> str:
+        """
+        Run an agno Agent like _arun_content, giving up on a run after timeout seconds.
+
+        A run that times out is cancelled and retried, up to retries more times, so one
+        stalled model call costs a retry instead of stalling the caller.
+        """
+        name = getattr(agent, "name", None) or "Agent"
+        for attempt in range(retries + 1):
+            try:
+                return await asyncio.wait_for(cls._arun_content(agent, prompt), timeout)
+            except asyncio.TimeoutError:
+                if attempt < retries:
+                    logger.warning("%s timed out after %ss, retrying", name, timeout)
+        raise asyncio.TimeoutError(f"{name} did not finish within {timeout}s ({retries + 1} attempts)")
+
+    @staticmethod
+    def _collect_content(response_stream: Iterable) -> str:
+        """Accumulate the content of a streamed run into a single string"""
+        buf = io.StringIO()
+        write = buf.write
+        for chunk in response_stream:
+            content = getattr(chunk, "content", None)
+            if content:
+                write(content)
+        return buf.getvalue()
+
+    @staticmethod
+    def _stream_content(response_stream: Iterable) -> Iterator[str]:
+        """Yield the non-empty content of each chunk of a streamed run"""
+        for chunk in response_stream:
+            content = getattr(chunk, "content", None)
+            if content:
+                yield content
@@ -0,0 +1,103 @@
+"""
+Claude model with Anthropic prompt caching.
+
+CachedClaude sends the agent's system prompt (role, instructions and tool
+guidance) as a content block marked ``cache_control: ephemeral``, so repeat
+requests reuse the cached prefix instead of paying full input-token prefill.
+cached_prompt builds a user message whose large static section is cached in
+the same way, with only the short per-request details left uncached.
+Prompt-cache reads are recorded as the run's cached_tokens metric and
+logged at debug level, so cache hits can be checked per call.
+
+When Claude requests several tools in one turn (e.g. a web search and a
+reasoning step), they run concurrently (see concurrent_tool_calls).
+
+Every CachedClaude shares one keep-alive HTTP/2 connection pool, and models
+with the same API key share one Anthropic client, so agents built per thread
+or per request reuse open TLS connections to the API. The pool is closed at
+interpreter exit. The Claude models themselves stay per Agent because agno
+keeps per-run state on them.
+"""
+
+import atexit
+import functools
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import httpx
+from anthropic import Anthropic as AnthropicClient
+from anthropic import DefaultHttpxClient
+from agno.models.anthropic import Claude
+from agno.models.message import Message
+
+from app.agents.concurrent_tool_calls import ConcurrentToolCalls
+
+logger = logging.getLogger(__name__)
+
+EPHEMERAL_CACHE_CONTROL = {"type": "ephemeral"}
+
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=64, keepalive_expiry=60)
+
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
+
+def shared_http_client() -> httpx.Client:
+    """The process-wide HTTP/2 client used by every CachedClaude, built on first use"""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = DefaultHttpxClient(http2=True, limits=HTTP_LIMITS)
+                atexit.register(_http_client.close)
+    return _http_client
+
+
+@functools.lru_cache(maxsize=None)
+def shared_anthropic_client(api_key: Optional[str]) -> AnthropicClient:
+    """The Anthropic client shared by every CachedClaude using api_key"""
+    return AnthropicClient(api_key=api_key, http_client=shared_http_client())
+
+
+def cached_text_block(text: str) -> Dict[str, Any]:
+    """A text content block marked for prompt caching"""
+    return {"type": "text", "text": text, "cache_control": EPHEMERAL_CACHE_CONTROL}
+
+
+def cached_prompt(static_prefix: str, dynamic_suffix: str) -> List[Dict[str, Any]]:
+    """
+    Build user message content with a cached static prefix and an uncached suffix
+
+    Args:
+        static_prefix: Instructions that are identical across requests
+        dynamic_suffix: The per-request part (topic, options, user text)
+    """
+    return [cached_text_block(static_prefix), {"type": "text", "text": dynamic_suffix}]
+
+
+class CachedClaude(ConcurrentToolCalls, Claude):
+    """Claude model that marks the system prompt for Anthropic prompt caching"""
+
+    def get_client(self) -> AnthropicClient:
+        if self.client is None:
+            client_params = self._get_client_params()
+            if client_params.keys() == {"api_key"}:
+                self.client = shared_anthropic_client(client_params["api_key"])
+            else:
+                self.client = AnthropicClient(**client_params, http_client=shared_http_client())
+        return self.client
+
+    def _prepare_request_kwargs(self, system_message: str) -> Dict[str, Any]:
+        request_kwargs = super()._prepare_request_kwargs(system_message)
+        if system_message:
+            request_kwargs["system"] = [cached_text_block(system_message)]
+        return request_kwargs
+
+    def _add_usage_metrics_to_assistant_message(self, assistant_message: Message, response_usage: Any) -> None:
+        super()._add_usage_metrics_to_assistant_message(assistant_message, response_usage)
+        cache_read = getattr(response_usage, "cache_read_input_tokens", None) or 0
+        cache_write = getattr(response_usage, "cache_creation_input_tokens", None) or 0
+        if cache_read:
+            assistant_message.metrics.cached_tokens = cache_read
+        logger.debug("%s prompt cache: %s tokens read, %s written", self.id, cache_read, cache_write)
@@ -1,26 +1,92 @@
-from typing import Iterator
-from agno.agent import Agent, RunResponse
-from agno.models.anthropic import Claude
-from agno.storage.sqlite import SqliteStorage
+from agno.agent import Agent
 from agno.tools.googlesearch import GoogleSearchTools
-from agno.tools.crawl4ai import Crawl4aiTools
 from app.agents.base_agent import BaseAgent
+from app.agents.cached_claude import CachedClaude, cached_prompt
 from app.core import settings
-from agno.utils.pprint import pprint_run_response
+from app.db.agent_storage import WalSqliteStorage
+from app.tools.cached_crawl4ai import CachedCrawl4aiTools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import copy
 import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Output ceilings per team role, sized a little above the longest reports each role writes;
+# override them with settings.CLINICAL_AGENT_MAX_TOKENS or the max_tokens constructor argument
+_MAX_TOKENS = {
+    "patient_assessment": 3000,
+    "treatment_comparison": 4000,
+    "safety_monitoring": 3000,
+    "clinical_documentation": 6000,
+    "clinical_decision_team": 8000,
+}
+
+_ANALYSIS_BRIEF = """\
+Please conduct a comprehensive clinical decision analysis for the patient case given below.
+
+Follow this systematic clinical decision process:
+
+1. PATIENT ASSESSMENT:
+- Analyze all patient demographics, medical history, current medications
+- Identify contraindications, allergies, and drug interactions
+- Assess comorbidities and organ function
+- Evaluate social and lifestyle factors
+- Generate risk stratification
+
+2. TREATMENT COMPARISON:
+- Identify all appropriate therapeutic alternatives
+- Compare efficacy, safety, and tolerability profiles
+- Analyze clinical trial and real-world evidence
+- Rank treatment options based on patient-specific factors
+- Apply current clinical guidelines
+
+3. SAFETY MONITORING:
+- Develop comprehensive monitoring protocols
+- Identify required pre-treatment assessments
+- Create personalized monitoring schedules
+- Define warning signs and emergency protocols
+- Establish follow-up criteria
+
+4. CLINICAL DOCUMENTATION:
+- Generate primary treatment recommendation with rationale
+- Create medical record documentation
+- Develop patient counseling materials
+- Produce follow-up decision trees
+- Generate alternative treatment options
+
+Provide a comprehensive clinical decision report with:
+- Treatment Comparison Matrix
+- Patient-Specific Risk Assessment
+- Evidence Summary Report
+- Primary Recommendation with detailed rationale
+- Safety Monitoring Dashboard
+- Alternative Options (ranked)
+- Patient Counseling Points
+- Follow-up Action Plan
+- Clinical Documentation
+
+Ensure all recommendations are evidence-based, patient-centered, and clinically actionable.
+"""
+
 
 class ClinicalDecisionAgent(BaseAgent):
-    def __init__(self):
+    def __init__(self, max_tokens: Optional[Dict[str, int]] = None):
         self.AGENT_STORAGE = settings.AGENT_STORAGE
-        print(self.AGENT_STORAGE)
-        self.clinical_decision_team = self._create_clinical_decision_team()
+        self.max_tokens = {**_MAX_TOKENS, **settings.CLINICAL_AGENT_MAX_TOKENS, **(max_tokens or {})}
+        if max_tokens:
+            self.clinical_decision_team = self._create_clinical_decision_team()
+        else:
+            self.clinical_decision_team = self._shared_agent("clinical_decision_team", self._create_clinical_decision_team)
 
     # Factory methods for creating individual agents
     def create_patient_assessment_agent(self):
         return Agent(
             name="Patient Assessment Agent",
             role="You are an expert at analyzing comprehensive patient data for clinical decision-making",
-            model=Claude(id="claude-3-5-sonnet-latest", max_tokens=8096),
+            model=CachedClaude(id="claude-3-5-sonnet-latest", max_tokens=self.max_tokens["patient_assessment"]),
             instructions=[
                 "Analyze patient demographics, medical history, current medications, and laboratory values",
                 "Identify contraindications, drug allergies, and potential drug interactions",
@@ -36,8 +102,8 @@ class ClinicalDecisionAgent(BaseAgent):
                 "Flag any missing critical information needed for optimal decision-making",
             ],
             show_tool_calls=True,
-            tools=[GoogleSearchTools(fixed_max_results=3), Crawl4aiTools(max_length=15000)],
-            stream=True,
+            tools=[GoogleSearchTools(fixed_max_results=3), CachedCrawl4aiTools(max_length=15000)],
+            stream=False,
             markdown=True,
         )
 
@@ -45,7 +111,7 @@ class ClinicalDecisionAgent(BaseAgent):
         return Agent(
             name="Treatment Comparison Agent",
             role="You are an expert at comparing therapeutic alternatives using evidence-based medicine",
-            model=Claude(id="claude-3-5-sonnet-latest", max_tokens=8096),
+            model=CachedClaude(id="claude-3-5-sonnet-latest", max_tokens=self.max_tokens["treatment_comparison"]),
             instructions=[
                 "Compare multiple therapeutic alternatives for efficacy, safety, and tolerability",
                 "Analyze clinical trial data, meta-analyses, and real-world evidence",
@@ -61,8 +127,8 @@ class ClinicalDecisionAgent(BaseAgent):
                 "Provide specific dosing guidelines and administration recommendations",
             ],
             show_tool_calls=True,
-            tools=[GoogleSearchTools(fixed_max_results=3), Crawl4aiTools(max_length=15000)],
-            stream=True,
+            tools=[GoogleSearchTools(fixed_max_results=3), CachedCrawl4aiTools(max_length=15000)],
+            stream=False,
             markdown=True,
         )
 
@@ -70,7 +136,7 @@ class ClinicalDecisionAgent(BaseAgent):
         return Agent(
             name="Safety Monitoring Agent",
             role="You are an expert at developing comprehensive safety monitoring protocols for clinical treatments",
-            model=Claude(id="claude-3-5-sonnet-latest", max_tokens=8096),
+            model=CachedClaude(id="claude-3-5-sonnet-latest", max_tokens=self.max_tokens["safety_monitoring"]),
             instructions=[
                 "Screen for medication-specific contraindications and precautions",
                 "Identify required pre-treatment assessments and baseline measurements",
@@ -86,8 +152,8 @@ class ClinicalDecisionAgent(BaseAgent):
                 "Include specific instructions for handling adverse events",
             ],
             show_tool_calls=True,
-            tools=[GoogleSearchTools(fixed_max_results=3), Crawl4aiTools(max_length=15000)],
-            stream=True,
+            tools=[GoogleSearchTools(fixed_max_results=3), CachedCrawl4aiTools(max_length=15000)],
+            stream=False,
             markdown=True,
         )
 
@@ -95,7 +161,7 @@ class ClinicalDecisionAgent(BaseAgent):
         return Agent(
             name="Clinical Documentation Agent",
             role="You are an expert at creating comprehensive clinical documentation and decision support materials",
-            model=Claude(id="claude-3-5-sonnet-latest", max_tokens=8096),
+            model=CachedClaude(id="claude-3-5-sonnet-latest", max_tokens=self.max_tokens["clinical_documentation"]),
             instructions=[
                 "Generate primary treatment recommendations with detailed clinical rationale",
                 "Create comprehensive medical record documentation ready for clinical use",
@@ -112,8 +178,8 @@ class ClinicalDecisionAgent(BaseAgent):
                 "Create templates for ongoing monitoring and follow-up documentation",
             ],
             show_tool_calls=True,
-            tools=[GoogleSearchTools(fixed_max_results=3), Crawl4aiTools(max_length=15000)],
-            stream=True,
+            tools=[GoogleSearchTools(fixed_max_results=3), CachedCrawl4aiTools(max_length=15000)],
+            stream=False,
             markdown=True,
         )
 
@@ -126,7 +192,7 @@ class ClinicalDecisionAgent(BaseAgent):
                 self.create_safety_monitoring_agent(),
                 self.create_clinical_documentation_agent()
             ],
-            model=Claude(id="claude-3-5-sonnet-latest", max_tokens=8096),
+            model=CachedClaude(id="claude-3-5-sonnet-latest", max_tokens=self.max_tokens["clinical_decision_team"]),
             instructions=[
                 "You are a team of clinical experts who work together to provide comprehensive clinical decision support.",
                 "Given patient information and clinical questions, conduct a thorough analysis to recommend optimal treatment choices.",
@@ -149,12 +215,12 @@ class ClinicalDecisionAgent(BaseAgent):
             ],
             show_tool_calls=True,
             markdown=True,
-            storage=SqliteStorage(table_name="clinical_decision_team", db_file=self.AGENT_STORAGE),
+            storage=WalSqliteStorage(table_name="clinical_decision_team", db_file=self.AGENT_STORAGE),
             stream=True,
         )
 
     def analyze_clinical_case(self, patient_data):
-        print(f"Starting clinical decision analysis for patient case")
+        logger.info("Starting clinical decision analysis for patient case")
         
         # Parse patient data if it's a string
         if isinstance(patient_data, str):
@@ -165,68 +231,57 @@ class ClinicalDecisionAgent(BaseAgent):
         else:
             patient_info = patient_data
 
-        prompt = f"""
-        Please conduct a comprehensive clinical decision analysis for the following patient case:
-
-        PATIENT INFORMATION:
-        {json.dumps(patient_info, indent=2)}
-
-        Follow this systematic clinical decision process:
-
-        1. PATIENT ASSESSMENT:
-        - Analyze all patient demographics, medical history, current medications
-        - Identify contraindications, allergies, and drug interactions
-        - Assess comorbidities and organ function
-        - Evaluate social and lifestyle factors
-        - Generate risk stratification
-
-        2. TREATMENT COMPARISON:
-        - Identify all appropriate therapeutic alternatives
-        - Compare efficacy, safety, and tolerability profiles
-        - Analyze clinical trial and real-world evidence
-        - Rank treatment options based on patient-specific factors
-        - Apply current clinical guidelines
-
-        3. SAFETY MONITORING:
-        - Develop comprehensive monitoring protocols
-        - Identify required pre-treatment assessments
-        - Create personalized monitoring schedules
-        - Define warning signs and emergency protocols
-        - Establish follow-up criteria
-
-        4. CLINICAL DOCUMENTATION:
-        - Generate primary treatment recommendation with rationale
-        - Create medical record documentation
-        - Develop patient counseling materials
-        - Produce follow-up decision trees
-        - Generate alternative treatment options
-
-        Provide a comprehensive clinical decision report with:
-        - Treatment Comparison Matrix
-        - Patient-Specific Risk Assessment
-        - Evidence Summary Report
-        - Primary Recommendation with detailed rationale
-        - Safety Monitoring Dashboard
-        - Alternative Options (ranked)
-        - Patient Counseling Points
-        - Follow-up Action Plan
-        - Clinical Documentation
-
-        Ensure all recommendations are evidence-based, patient-centered, and clinically actionable.
-        """
+        prompt = cached_prompt(_ANALYSIS_BRIEF, f"PATIENT INFORMATION:\n{json.dumps(patient_info, indent=2)}")
 
         try:
-            response_stream: Iterator[RunResponse] = self.clinical_decision_team.run(prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            pprint_run_response(response, markdown=True)
-            print("Clinical decision team analysis completed successfully.")
+            content = self._run_content(self.clinical_decision_team, prompt)
+            logger.info("Clinical decision team analysis completed successfully.")
             return content
         except Exception as e:
-            print(f"Error running clinical decision team: {e}")
+            logger.exception("Error running clinical decision team")
             return f"# Clinical Decision Analysis Error: {e}"
 
+    def get_responses_batch(
+        self,
+        cases: List[Any],
+        concurrency: Optional[int] = None,
+        on_result: Optional[Callable[[int, str], None]] = None,
+    ) -> List[str]:
+        """
+        Analyze several independent patient cases, returning one report per case in order.
+
+        The first case runs alone so the team's cached system prompts and analysis brief are
+        written to Anthropic's prompt cache; the rest then run up to concurrency
+        (settings.CLINICAL_BATCH_CONCURRENCY) at a time and read that prefix from the cache.
+        Each worker thread runs its own copy of the team, since agents keep per-run state.
+        on_result(index, report) is called as each case finishes.
+        """
+        if not cases:
+            return []
+        reports: List[Optional[str]] = [None] * len(cases)
+
+        def finish(index: int, report: str) -> None:
+            reports[index] = report
+            if on_result is not None:
+                on_result(index, report)
+
+        finish(0, self.analyze_clinical_case(cases[0]))
+
+        workers = threading.local()
+
+        def analyze(index: int) -> None:
+            agent = getattr(workers, "agent", None)
+            if agent is None:
+                agent = workers.agent = copy.copy(self)
+                agent.clinical_decision_team = self._create_clinical_decision_team()
+            finish(index, agent.analyze_clinical_case(cases[index]))
+
+        if len(cases) > 1:
+            max_workers = min(concurrency or settings.CLINICAL_BATCH_CONCURRENCY, len(cases) - 1)
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="clinical-batch") as pool:
+                list(pool.map(analyze, range(1, len(cases))))
+        return reports
+
     def run_clinical_decision_agent(self, patient_data) -> str:
         return self.analyze_clinical_case(patient_data)
     
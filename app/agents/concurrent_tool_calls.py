@@ -0,0 +1,47 @@
+"""
+Concurrent execution of the tool calls a model requests in one turn.
+
+When a model asks for several tools at once (e.g. two web searches and a
+crawl), agno's synchronous run path executes them one after another.
+ConcurrentToolCalls routes such turns through agno's async dispatcher, which
+gathers the calls and runs sync tools in worker threads, so the turn waits
+for the slowest call rather than the sum of all of them. Every tool the
+agents use is a read-only lookup (search, crawl, reasoning notes), so the
+calls are independent.
+"""
+
+import asyncio
+from typing import Iterator, List
+
+from agno.models.message import Message
+from agno.models.response import ModelResponse
+from agno.tools.function import FunctionCall
+
+
+class ConcurrentToolCalls:
+    """Model mixin that runs a turn's tool calls concurrently on the synchronous run path"""
+
+    def run_function_calls(
+        self, function_calls: List[FunctionCall], function_call_results: List[Message]
+    ) -> Iterator[ModelResponse]:
+        try:
+            asyncio.get_running_loop()
+            in_event_loop = True
+        except RuntimeError:
+            in_event_loop = False
+        if len(function_calls) < 2 or in_event_loop:
+            yield from super().run_function_calls(function_calls, function_call_results)
+            return
+
+        # arun_function_calls gathers the calls, running sync tools in worker threads
+        loop = asyncio.new_event_loop()
+        responses = self.arun_function_calls(function_calls, function_call_results)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(responses.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(responses.aclose())
+            loop.close()
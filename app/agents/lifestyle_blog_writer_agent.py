@@ -1,89 +1,105 @@
+import asyncio
+import functools
+import hashlib
+import logging
 from agno.agent import Agent, RunResponse
-from agno.models.anthropic import Claude
 from agno.tools.reasoning import ReasoningTools
 from agno.tools.googlesearch import GoogleSearchTools
 from app.agents.base_agent import BaseAgent
+from app.agents.cached_claude import CachedClaude, cached_prompt
+from app.agents.prompt_routing import first_match, prompt_terms, series_length
+from app.agents.semantic_cache import semantic_cached
 from app.core.setting import settings
-from agno.utils.pprint import pprint_run_response
-from typing import Iterator
+from types import MappingProxyType
+from typing import Iterator, List, Optional, Tuple, Union
 
+logger = logging.getLogger(__name__)
 
-class LifestyleBlogWriterAgent(BaseAgent):
-    def __init__(self):
-        self.lifestyle_blog_writer = self._create_lifestyle_blog_writer()
+# Prompt details for each blog post option
+_LENGTH_SPECS = MappingProxyType({
+    "short": "800-1200 words, focused and actionable with key insights",
+    "medium": "1500-2200 words, comprehensive coverage with stories and practical tips",
+    "long": "2500-3500 words, in-depth exploration with multiple perspectives and detailed guidance"
+})
 
-    def _create_lifestyle_blog_writer(self):
-        return Agent(
-            name="Lifestyle Blog Writer",
-            role="You are an expert lifestyle blog writer specializing in wellness, personal development, and lifestyle content",
-            model=Claude(id="claude-3-7-sonnet-20250219", max_tokens=6144),
-            instructions=[
-                "Create engaging, relatable lifestyle blog posts that inspire and provide practical value",
-                "Use storytelling techniques to connect emotionally with readers",
-                "Include personal insights, practical tips, and actionable advice",
-                "Write in a conversational, authentic tone that feels like talking to a friend",
-                "Focus on topics like wellness, personal growth, relationships, productivity, and life balance",
-                "Include relatable examples and real-life scenarios",
-                "Use positive, uplifting language that motivates readers",
-                "Structure content with engaging introductions, valuable body content, and inspiring conclusions",
-                "Include practical takeaways that readers can implement immediately",
-                "Use markdown formatting for better readability",
-                "Create content that feels authentic and avoids being preachy",
-                "Include relevant lifestyle trends and current topics when appropriate",
-                "Focus on holistic well-being including mental, physical, and emotional health",
-                "Make complex lifestyle concepts accessible and easy to understand",
-            ],
-            show_tool_calls=True,
-            tools=[ReasoningTools(add_instructions=True), GoogleSearchTools()],
-            stream=True,
-            markdown=True,
-        )
+_STYLE_SPECS = MappingProxyType({
+    "casual": "Friendly, conversational tone like talking to a close friend, use personal anecdotes",
+    "formal": "Professional yet warm tone, structured approach with clear sections and expert insights",
+    "inspirational": "Uplifting, motivational tone that empowers readers to take action and embrace change",
+    "conversational": "Natural, flowing dialogue style with questions and direct reader engagement"
+})
 
-    def generate_lifestyle_blog_post(self, topic: str, style: str = "casual", length: str = "medium", focus_area: str = "general") -> str:
-        """
-        Generate a lifestyle blog post based on the topic, style, and length
-        
-        Args:
-            topic: The lifestyle topic for the blog post
-            style: Writing style (casual, formal, inspirational, conversational)
-            length: Desired post length (short, medium, long)
-            focus_area: Specific lifestyle focus (wellness, productivity, relationships, personal_growth, mindfulness, fitness)
-        """
-        
-        # Define length specifications
-        length_specs = {
-            "short": "800-1200 words, focused and actionable with key insights",
-            "medium": "1500-2200 words, comprehensive coverage with stories and practical tips", 
-            "long": "2500-3500 words, in-depth exploration with multiple perspectives and detailed guidance"
-        }
-        
-        # Define style specifications
-        style_specs = {
-            "casual": "Friendly, conversational tone like talking to a close friend, use personal anecdotes",
-            "formal": "Professional yet warm tone, structured approach with clear sections and expert insights",
-            "inspirational": "Uplifting, motivational tone that empowers readers to take action and embrace change",
-            "conversational": "Natural, flowing dialogue style with questions and direct reader engagement"
-        }
-        
-        # Define focus area specifications
-        focus_specs = {
-            "wellness": "Holistic health, mental well-being, self-care practices, and healthy lifestyle choices",
-            "productivity": "Time management, goal setting, habits, work-life balance, and efficiency tips",
-            "relationships": "Communication, boundaries, love, friendship, family dynamics, and social connections",
-            "personal_growth": "Self-improvement, mindset, confidence, learning, and personal transformation",
-            "mindfulness": "Meditation, presence, stress reduction, gratitude, and mindful living practices",
-            "fitness": "Exercise routines, motivation, body positivity, nutrition, and physical wellness",
-            "general": "Broad lifestyle topics covering multiple aspects of modern living"
-        }
+_FOCUS_SPECS = MappingProxyType({
+    "wellness": "Holistic health, mental well-being, self-care practices, and healthy lifestyle choices",
+    "productivity": "Time management, goal setting, habits, work-life balance, and efficiency tips",
+    "relationships": "Communication, boundaries, love, friendship, family dynamics, and social connections",
+    "personal_growth": "Self-improvement, mindset, confidence, learning, and personal transformation",
+    "mindfulness": "Meditation, presence, stress reduction, gratitude, and mindful living practices",
+    "fitness": "Exercise routines, motivation, body positivity, nutrition, and physical wellness",
+    "general": "Broad lifestyle topics covering multiple aspects of modern living"
+})
 
-        enhanced_prompt = f"""
-        Create a lifestyle blog post about: "{topic}"
-        
-        Specifications:
-        - Style: {style} ({style_specs.get(style, style_specs['casual'])})
-        - Length: {length} ({length_specs.get(length, length_specs['medium'])})
-        - Focus Area: {focus_area} ({focus_specs.get(focus_area, focus_specs['general'])})
-        
+# Output budgets: blog posts by length (about 1.5 tokens per word plus markdown), other requests by method
+_LENGTH_MAX_TOKENS = MappingProxyType({"short": 1800, "medium": 3300, "long": 5200})
+_METHOD_MAX_TOKENS = MappingProxyType({
+    "create_lifestyle_series": 4096,
+    "create_seasonal_content": 4096,
+    "create_lifestyle_guide": 4096,
+    "chat_lifestyle_advice": 4096,
+})
+
+# Model tiers: "auto" picks the fast model for chat replies and short posts
+_MODEL_IDS = MappingProxyType({
+    "fast": "claude-3-5-haiku-latest",
+    "quality": "claude-3-7-sonnet-20250219",
+})
+_MODEL_TIERS = ("auto", *_MODEL_IDS)
+
+# Cached responses at or above the threshold are reused; near misses down to the
+# floor are adapted by the fast model instead of generating from scratch
+_CACHE_THRESHOLD = 0.92
+_NEAR_MISS_SIMILARITY = 0.75
+_NEAR_MISS_EXAMPLES = 3
+
+# Chat history sent verbatim; older turns are folded into a summary in blocks of this
+# size, so the summary only changes (and is regenerated) once every window
+_HISTORY_WINDOW = 6
+
+# Routing keywords, matched against prompt_terms(); map order sets priority
+_SERIES_KEYWORDS = frozenset({"series", "multiple posts"})
+_SEASONS = ("spring", "summer", "fall", "autumn", "winter")
+_SEASONAL_KEYWORDS = frozenset(_SEASONS) | {"seasonal", "holiday", "holidays"}
+_GUIDE_KEYWORDS = frozenset({"guide", "guides", "comprehensive", "complete guide"})
+_CHAT_KEYWORDS = frozenset({"chat", "advice", "help me"})
+_STYLE_MAP = {
+    "formal": "formal",
+    "professional": "formal",
+    "inspirational": "inspirational",
+    "motivational": "inspirational",
+    "conversational": "conversational",
+}
+_LENGTH_MAP = {
+    "short": "short",
+    "brief": "short",
+    "long": "long",
+    "detailed": "long",
+    "comprehensive": "long",
+}
+_FOCUS_MAP = {
+    "wellness": "wellness",
+    "productivity": "productivity",
+    "relationships": "relationships",
+    "personal_growth": "personal_growth",
+    "personal growth": "personal_growth",
+    "mindfulness": "mindfulness",
+    "fitness": "fitness",
+}
+
+
+class LifestyleBlogWriterAgent(BaseAgent):
+    # Static prompt sections are sent ahead of the per-request details and
+    # marked for Anthropic prompt caching, so repeat calls reuse their prefill.
+    BLOG_POST_PREFIX = """
         Content Structure Requirements:
         1. **Compelling Title**: Engaging, relatable headline that draws readers in
         2. **Hook Opening**: Start with a relatable scenario, question, or personal story
@@ -125,36 +141,9 @@ class LifestyleBlogWriterAgent(BaseAgent):
         - Practical wellness that fits real life
         
         Please create an engaging lifestyle blog post that provides genuine value, inspiration, and practical guidance for readers seeking to improve their daily lives and overall well-being.
-        """
+    """
 
-        try:
-            print(f"Generating lifestyle blog post for topic: {topic}")
-            response_stream: Iterator[RunResponse] = self.lifestyle_blog_writer.run(enhanced_prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            pprint_run_response(response, markdown=True)
-            print("Lifestyle blog post generated successfully.")
-            return content
-        except Exception as e:
-            print(f"Error generating lifestyle blog post: {e}")
-            return f"# Error generating lifestyle blog post: {e}"
-
-    def create_lifestyle_series(self, theme: str, series_length: int = 5, focus_area: str = "wellness") -> str:
-        """
-        Create a series of related lifestyle blog posts
-        """
-        
-        series_prompt = f"""
-        Create a comprehensive lifestyle blog series about: "{theme}"
-        
-        Series Specifications:
-        - Number of posts: {series_length}
-        - Focus area: {focus_area}
-        - Each post should be 1500-2200 words
-        - Progressive depth and practical application
-        - Connected theme with standalone value
-        
+    SERIES_PREFIX = """
         Please provide:
         1. **Series Overview**: Main theme, target audience, and transformation journey
         2. **Series Outline**: Title and compelling description for each post
@@ -178,30 +167,9 @@ class LifestyleBlogWriterAgent(BaseAgent):
         
         Target Audience: People seeking authentic lifestyle improvement and personal growth
         Focus: Practical, sustainable changes that enhance daily life and well-being
-        """
-
-        try:
-            print(f"Creating lifestyle blog series for theme: {theme}")
-            response_stream: Iterator[RunResponse] = self.lifestyle_blog_writer.run(series_prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            print("Lifestyle blog series created successfully.")
-            return content
-        except Exception as e:
-            print(f"Error creating lifestyle blog series: {e}")
-            return f"# Error creating lifestyle series: {e}"
+    """
 
-    def create_seasonal_content(self, season: str, lifestyle_focus: str = "wellness") -> str:
-        """
-        Create seasonal lifestyle content
-        """
-        
-        seasonal_prompt = f"""
-        Create seasonal lifestyle content for: "{season}"
-        
-        Focus Area: {lifestyle_focus}
-        
+    SEASONAL_PREFIX = """
         Seasonal Content Requirements:
         1. **Seasonal Connection**: How this time of year affects lifestyle and well-being
         2. **Timely Challenges**: Common struggles people face during this season
@@ -222,30 +190,9 @@ class LifestyleBlogWriterAgent(BaseAgent):
         - Focused on sustainable seasonal habits
         
         Target Audience: People seeking to live more intentionally with seasonal rhythms
-        """
-
-        try:
-            print(f"Creating seasonal lifestyle content for: {season}")
-            response_stream: Iterator[RunResponse] = self.lifestyle_blog_writer.run(seasonal_prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            print("Seasonal lifestyle content created successfully.")
-            return content
-        except Exception as e:
-            print(f"Error creating seasonal content: {e}")
-            return f"# Error creating seasonal content: {e}"
+    """
 
-    def create_lifestyle_guide(self, topic: str, target_audience: str = "general") -> str:
-        """
-        Create a comprehensive lifestyle guide
-        """
-        
-        guide_prompt = f"""
-        Create a comprehensive lifestyle guide about: "{topic}"
-        
-        Target Audience: {target_audience}
-        
+    GUIDE_PREFIX = """
         Guide Structure:
         1. **Introduction**: Why this lifestyle area matters and what readers will gain
         2. **Assessment**: Help readers understand their current situation
@@ -269,126 +216,428 @@ class LifestyleBlogWriterAgent(BaseAgent):
         - Include reflection questions and self-assessment tools
         
         Target Audience: People ready to make meaningful lifestyle changes with practical guidance
+    """
+
+    def __init__(self):
+        self.lifestyle_blog_writer = self._shared_agent("lifestyle_blog_writer", self._create_lifestyle_blog_writer)
+        self.lifestyle_blog_writer_fast = self._shared_agent(
+            "lifestyle_blog_writer_fast", lambda: self._create_lifestyle_blog_writer("fast")
+        )
+
+    def _create_lifestyle_blog_writer(self, model_tier: str = "quality"):
+        return Agent(
+            name="Lifestyle Blog Writer",
+            role="You are an expert lifestyle blog writer specializing in wellness, personal development, and lifestyle content",
+            model=CachedClaude(id=_MODEL_IDS[model_tier], max_tokens=6144),
+            instructions=[
+                "Create engaging, relatable lifestyle blog posts that inspire and provide practical value",
+                "Use storytelling techniques to connect emotionally with readers",
+                "Include personal insights, practical tips, and actionable advice",
+                "Write in a conversational, authentic tone that feels like talking to a friend",
+                "Focus on topics like wellness, personal growth, relationships, productivity, and life balance",
+                "Include relatable examples and real-life scenarios",
+                "Use positive, uplifting language that motivates readers",
+                "Structure content with engaging introductions, valuable body content, and inspiring conclusions",
+                "Include practical takeaways that readers can implement immediately",
+                "Use markdown formatting for better readability",
+                "Create content that feels authentic and avoids being preachy",
+                "Include relevant lifestyle trends and current topics when appropriate",
+                "Focus on holistic well-being including mental, physical, and emotional health",
+                "Make complex lifestyle concepts accessible and easy to understand",
+                "In conversations, respond as a caring lifestyle coach and friend: listen empathetically and validate feelings, "
+                "ask thoughtful follow-up questions when appropriate, offer practical advice and different perspectives without being preachy, "
+                "and keep replies conversational, warm and focused on empowerment and positive action",
+            ],
+            show_tool_calls=True,
+            tools=[ReasoningTools(add_instructions=True), GoogleSearchTools()],
+            stream=True,
+            markdown=True,
+        )
+
+    _REQUEST_BUILDERS = {
+        "generate_lifestyle_blog_post": "_blog_post_request",
+        "create_lifestyle_series": "_series_request",
+        "create_seasonal_content": "_seasonal_request",
+        "create_lifestyle_guide": "_guide_request",
+        "chat_lifestyle_advice": "_chat_request",
+    }
+
+    @semantic_cached(threshold=_CACHE_THRESHOLD, ttl=3600, db_file=settings.SEMANTIC_CACHE_DB)
+    def _generate(self, key: tuple, text: str, prompt: Optional[Union[str, list]], messages: Optional[List[dict]] = None) -> str:
+        """
+        Run the writer on prompt and collect the streamed content
+
+        Args:
+            key: Method name and generation options; only responses with the same key are reused
+            text: The user-supplied text compared semantically against cached requests
+            prompt: The full prompt sent to the model
+            messages: Conversation messages sent after the prompt, for chat replies
+        """
+        if key[0] == "create_lifestyle_series":
+            # Series are planned once and their posts written concurrently, so no single run hits max_tokens
+            _, series_length, focus_area, model_tier = key
+            return self._run_async(self._write_series_async(text, series_length, focus_area, model_tier))
+        response_stream: Iterator[RunResponse] = self._run_or_adapt(key, text, prompt, messages)
+        return self._collect_content(response_stream)
+
+    def _run_or_adapt(self, key: tuple, text: str, prompt: Optional[Union[str, list]], messages: Optional[List[dict]] = None) -> Iterator[RunResponse]:
+        """
+        Start a run for a cache miss, adapting related cached posts when there are any
+
+        Adaptation is a fast-model shortcut, so requests for the quality tier are always written from scratch:
+        the response is cached under the key's tier and must come from that model.
+        """
+        if isinstance(prompt, list) and key[-1] == "fast":
+            related = LifestyleBlogWriterAgent._generate.cache.neighbors(
+                key, text, k=_NEAR_MISS_EXAMPLES, min_similarity=_NEAR_MISS_SIMILARITY
+            )
+            if related:
+                return self._run(key, prompt + [self._adaptation_block(text, related)], messages)
+        return self._run(key, prompt, messages)
+
+    @staticmethod
+    def _adaptation_block(text: str, related: List[Tuple[float, str]]) -> dict:
+        """Prompt block asking the model to adapt previous posts on similar topics to the new request"""
+        previous_posts = "\n\n".join(
+            f"<previous_post_on_similar_topic>\n{response}\n</previous_post_on_similar_topic>" for _, response in related
+        )
+        return {
+            "type": "text",
+            "text": f"""
+        {previous_posts}
+
+        The pieces above were written for closely related requests. Adapt them into new content for: "{text}"
+        Keep what fits, rewrite everything specific to the old topic, and follow the specifications above.
+        """,
+        }
+
+    def _run(self, key: tuple, prompt: Optional[Union[str, list]], messages: Optional[List[dict]] = None, model_tier: Optional[str] = None) -> Iterator[RunResponse]:
+        """Start a streamed run on the key's model tier with max_tokens bounded to the requested output"""
+        method = key[0]
+        model_tier = model_tier or key[-1]
+        if method == "generate_lifestyle_blog_post":
+            max_tokens = _LENGTH_MAX_TOKENS.get(key[2], _LENGTH_MAX_TOKENS["medium"])
+        else:
+            max_tokens = _METHOD_MAX_TOKENS[method]
+        writer = self.lifestyle_blog_writer_fast if model_tier == "fast" else self.lifestyle_blog_writer
+        # The writer Agent is per thread, so adjusting its model here cannot race another request
+        writer.model.max_tokens = max_tokens
+        return writer.run(prompt, messages=messages)
+
+    @staticmethod
+    def _resolve_tier(model_tier: str, fast_by_default: bool) -> str:
+        """Resolve "auto" to a concrete model tier for a request"""
+        if model_tier not in _MODEL_TIERS:
+            raise ValueError(f"Unknown model tier: {model_tier}")
+        if model_tier == "auto":
+            return "fast" if fast_by_default else "quality"
+        return model_tier
+
+    def _stream(self, key: tuple, text: str, prompt: Optional[Union[str, list]], messages: Optional[List[dict]] = None) -> Iterator[str]:
+        """
+        Yield content chunks for prompt, serving from and populating the response cache
         """
+        cache = LifestyleBlogWriterAgent._generate.cache
+        cached = cache.get(key, text)
+        if cached is not None:
+            yield cached
+            return
 
+        parts = []
         try:
-            print(f"Creating comprehensive lifestyle guide for: {topic}")
-            response_stream: Iterator[RunResponse] = self.lifestyle_blog_writer.run(guide_prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            print("Lifestyle guide created successfully.")
-            return content
+            for content in self._stream_content(self._run_or_adapt(key, text, prompt, messages)):
+                parts.append(content)
+                yield content
         except Exception as e:
-            print(f"Error creating lifestyle guide: {e}")
-            return f"# Error creating lifestyle guide: {e}"
+            logger.exception("Error streaming lifestyle content")
+            yield f"# Error generating lifestyle content: {e}"
+            return
+        if parts:
+            cache.set(key, text, "".join(parts))
 
-    def chat_lifestyle_advice(self, message: str, context_history: list = None) -> str:
+    def _blog_post_request(self, topic: str, style: str = "casual", length: str = "medium", focus_area: str = "general", model_tier: str = "auto") -> Tuple[tuple, str, Union[str, list]]:
+        """Build the cache key, cache text and prompt for a lifestyle blog post"""
+        dynamic_prompt = f"""
+        Create a lifestyle blog post about: "{topic}"
+        
+        Specifications:
+        - Style: {style} ({_STYLE_SPECS.get(style, _STYLE_SPECS['casual'])})
+        - Length: {length} ({_LENGTH_SPECS.get(length, _LENGTH_SPECS['medium'])})
+        - Focus Area: {focus_area} ({_FOCUS_SPECS.get(focus_area, _FOCUS_SPECS['general'])})
         """
-        Provide conversational lifestyle advice and coaching
+        enhanced_prompt = cached_prompt(self.BLOG_POST_PREFIX, dynamic_prompt)
+
+        model_tier = self._resolve_tier(model_tier, length == "short")
+        return ("generate_lifestyle_blog_post", style, length, focus_area, model_tier), topic, enhanced_prompt
+
+    def generate_lifestyle_blog_post(self, topic: str, style: str = "casual", length: str = "medium", focus_area: str = "general", model_tier: str = "auto") -> str:
         """
+        Generate a lifestyle blog post based on the topic, style, and length
         
-        if context_history is None:
-            context_history = []
-        
-        # Build conversation context
-        conversation_context = "\n".join([f"{msg['role']}: {msg['content']}" for msg in context_history])
-        
-        chat_prompt = f"""
-        You are having a supportive, friendly conversation about lifestyle and personal development.
+        Args:
+            topic: The lifestyle topic for the blog post
+            style: Writing style (casual, formal, inspirational, conversational)
+            length: Desired post length (short, medium, long)
+            focus_area: Specific lifestyle focus (wellness, productivity, relationships, personal_growth, mindfulness, fitness)
+            model_tier: Model to use (auto, fast, quality); auto uses the fast model for short posts
+        """
+        key, text, prompt = self._blog_post_request(topic, style, length, focus_area, model_tier)
+
+        try:
+            logger.info("Generating lifestyle blog post for topic: %s", topic)
+            content = self._generate(key, text, prompt)
+            logger.info("Lifestyle blog post generated successfully.")
+            return content
+        except Exception as e:
+            logger.exception("Error generating lifestyle blog post")
+            return f"# Error generating lifestyle blog post: {e}"
+
+    def _series_request(self, theme: str, series_length: int = 5, focus_area: str = "wellness", model_tier: str = "auto") -> Tuple[tuple, str, Union[str, list]]:
+        """Build the cache key, cache text and prompt for a lifestyle series"""
+        dynamic_prompt = f"""
+        Create a comprehensive lifestyle blog series about: "{theme}"
         
-        Previous conversation context:
-        {conversation_context}
+        Series Specifications:
+        - Number of posts: {series_length}
+        - Focus area: {focus_area}
+        - Each post should be 1500-2200 words
+        - Progressive depth and practical application
+        - Connected theme with standalone value
+        """
+        series_prompt = cached_prompt(self.SERIES_PREFIX, dynamic_prompt)
+
+        return ("create_lifestyle_series", series_length, focus_area, self._resolve_tier(model_tier, False)), theme, series_prompt
+
+    def create_lifestyle_series(self, theme: str, series_length: int = 5, focus_area: str = "wellness", model_tier: str = "auto") -> str:
+        """
+        Create a series of related lifestyle blog posts
+        """
+        key, text, prompt = self._series_request(theme, series_length, focus_area, model_tier)
+
+        try:
+            logger.info("Creating lifestyle blog series for theme: %s", theme)
+            content = self._generate(key, text, prompt)
+            logger.info("Lifestyle blog series created successfully.")
+            return content
+        except Exception as e:
+            logger.exception("Error creating lifestyle blog series")
+            return f"# Error creating lifestyle series: {e}"
+
+    def _series_outline_prompt(self, theme: str, series_length: int, focus_area: str) -> list:
+        """Build the prompt for planning a lifestyle series without writing the posts"""
+        dynamic_prompt = f"""
+        Plan a lifestyle blog series of {series_length} posts about: "{theme}"
         
-        Current message from user: "{message}"
+        Focus area: {focus_area}
         
-        Respond as a caring lifestyle coach and friend who:
-        - Listens empathetically and validates feelings
-        - Asks thoughtful follow-up questions when appropriate
-        - Provides practical, actionable advice
-        - Shares relevant insights without being preachy
-        - Encourages self-reflection and personal growth
-        - Maintains a warm, supportive tone
-        - Offers different perspectives and options
-        - Acknowledges that everyone's lifestyle journey is unique
+        Provide only the series overview, the series outline, a detailed content plan for each post, the community building strategy, the publishing schedule and the series conclusion. The posts themselves are written separately.
+        """
+        return cached_prompt(self.SERIES_PREFIX, dynamic_prompt)
+
+    def _series_post_prompt(self, theme: str, outline: str, post_number: int, series_length: int) -> list:
+        """Build the prompt for one post of a planned series; the plan is the shared cached prefix"""
+        series_plan = f"""{self.SERIES_PREFIX}
+        Series plan for "{theme}":
+        {outline}
+        """
+        dynamic_prompt = f"""
+        Write post {post_number} of {series_length} of this series in full (1500-2200 words), following its entry in the content plan. Return only the post.
+        """
+        return cached_prompt(series_plan, dynamic_prompt)
+
+    async def _write_series_async(self, theme: str, series_length: int, focus_area: str, model_tier: str = "quality") -> str:
+        """Plan a lifestyle series and then write every post concurrently; errors propagate"""
+        planner = self.lifestyle_blog_writer_fast if model_tier == "fast" else self.lifestyle_blog_writer
+        # The planner Agent is per thread, so adjusting its model here cannot race another request
+        planner.model.max_tokens = _METHOD_MAX_TOKENS["create_lifestyle_series"]
+        outline = await self._arun_content(planner, self._series_outline_prompt(theme, series_length, focus_area))
+        # Each post runs on its own Agent because agno Agents hold per-run state
+        posts = await asyncio.gather(*[
+            self._arun_content(
+                self._create_lifestyle_blog_writer(model_tier), self._series_post_prompt(theme, outline, number, series_length)
+            )
+            for number in range(1, series_length + 1)
+        ])
+        return "\n\n---\n\n".join([outline, *posts])
+
+    async def create_lifestyle_series_async(self, theme: str, series_length: int = 5, focus_area: str = "wellness") -> str:
+        """
+        Create a lifestyle series by planning it first and then writing every post concurrently
+        """
+        try:
+            logger.info("Creating lifestyle blog series concurrently for theme: %s", theme)
+            content = await self._write_series_async(theme, series_length, focus_area)
+            logger.info("Lifestyle blog series created successfully.")
+            return content
+        except Exception as e:
+            logger.exception("Error creating lifestyle blog series")
+            return f"# Error creating lifestyle series: {e}"
+
+    def _seasonal_request(self, season: str, lifestyle_focus: str = "wellness", model_tier: str = "auto") -> Tuple[tuple, str, Union[str, list]]:
+        """Build the cache key, cache text and prompt for seasonal content"""
+        dynamic_prompt = f"""
+        Create seasonal lifestyle content for: "{season}"
         
-        Keep the response conversational, supportive, and practical. Focus on empowerment and positive action.
+        Focus Area: {lifestyle_focus}
         """
+        seasonal_prompt = cached_prompt(self.SEASONAL_PREFIX, dynamic_prompt)
+
+        return ("create_seasonal_content", lifestyle_focus, self._resolve_tier(model_tier, False)), season, seasonal_prompt
+
+    def create_seasonal_content(self, season: str, lifestyle_focus: str = "wellness", model_tier: str = "auto") -> str:
+        """
+        Create seasonal lifestyle content
+        """
+        key, text, prompt = self._seasonal_request(season, lifestyle_focus, model_tier)
 
         try:
-            print(f"Providing lifestyle chat response for: {message[:50]}...")
-            response_stream: Iterator[RunResponse] = self.lifestyle_blog_writer.run(chat_prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            print("Lifestyle chat response generated successfully.")
+            logger.info("Creating seasonal lifestyle content for: %s", season)
+            content = self._generate(key, text, prompt)
+            logger.info("Seasonal lifestyle content created successfully.")
             return content
         except Exception as e:
-            print(f"Error generating lifestyle chat response: {e}")
-            return f"I'm sorry, I'm having trouble responding right now. Could you try asking again?"
+            logger.exception("Error creating seasonal content")
+            return f"# Error creating seasonal content: {e}"
 
-    def get_response(self, prompt: str) -> str:
+    def _guide_request(self, topic: str, target_audience: str = "general", model_tier: str = "auto") -> Tuple[tuple, str, Union[str, list]]:
+        """Build the cache key, cache text and prompt for a lifestyle guide"""
+        dynamic_prompt = f"""
+        Create a comprehensive lifestyle guide about: "{topic}"
+        
+        Target Audience: {target_audience}
         """
-        Main interface method that handles different types of lifestyle content requests
+        guide_prompt = cached_prompt(self.GUIDE_PREFIX, dynamic_prompt)
+
+        return ("create_lifestyle_guide", target_audience, self._resolve_tier(model_tier, False)), topic, guide_prompt
+
+    def create_lifestyle_guide(self, topic: str, target_audience: str = "general", model_tier: str = "auto") -> str:
+        """
+        Create a comprehensive lifestyle guide
         """
-        print(f"Processing lifestyle blog content request: {prompt}")
+        key, text, prompt = self._guide_request(topic, target_audience, model_tier)
+
+        try:
+            logger.info("Creating comprehensive lifestyle guide for: %s", topic)
+            content = self._generate(key, text, prompt)
+            logger.info("Lifestyle guide created successfully.")
+            return content
+        except Exception as e:
+            logger.exception("Error creating lifestyle guide")
+            return f"# Error creating lifestyle guide: {e}"
+
+    def _chat_request(self, message: str, context_history: list = None, model_tier: str = "auto") -> Tuple[tuple, str, None, List[dict]]:
+        """Build the cache key, cache text and conversation messages for a chat reply"""
+        if context_history is None:
+            context_history = []
         
-        # Parse the prompt to determine the type of content and parameters
-        prompt_lower = prompt.lower()
+        # Keep the last one to two windows of turns verbatim and summarize everything before them
+        cut = max(len(context_history) - _HISTORY_WINDOW, 0) // _HISTORY_WINDOW * _HISTORY_WINDOW
+        older, recent = context_history[:cut], context_history[cut:]
+        
+        # Prior turns are sent as real messages so the system prompt stays a stable cached prefix
+        messages = []
+        older_turns = tuple((msg["role"], msg["content"]) for msg in older)
+        if older:
+            try:
+                summary = self._summarize_history(older_turns)
+                messages.append({"role": "user", "content": f"Summary of our earlier conversation:\n{summary}"})
+            except Exception:
+                logger.exception("Error summarizing lifestyle chat history")
+        messages.extend({"role": msg["role"], "content": msg["content"]} for msg in recent)
+        messages.append({"role": "user", "content": message})
+        
+        conversation_context = "\n".join([f"{msg['role']}: {msg['content']}" for msg in recent])
+        # The summarized turns are not part of the cache text, so replies are only shared by chats with the same earlier history
+        history_digest = hashlib.blake2b(repr(older_turns).encode("utf-8"), digest_size=8).hexdigest() if older else ""
+        key = ("chat_lifestyle_advice", history_digest, self._resolve_tier(model_tier, True))
+        return key, f"{conversation_context}\n{message}", None, messages
+
+    @staticmethod
+    def _create_history_summarizer():
+        return Agent(
+            name="Lifestyle Chat Summarizer",
+            model=CachedClaude(id=_MODEL_IDS["fast"], max_tokens=512),
+            instructions=[
+                "Summarize the conversation between a user and their lifestyle coach in a short paragraph",
+                "Keep the user's goals, circumstances, feelings and any advice already given",
+            ],
+        )
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def _summarize_history(cls, turns: Tuple[Tuple[str, str], ...]) -> str:
+        """Summarize older chat turns with the fast model; results are cached per exact history"""
+        summarizer = cls._shared_agent("history_summarizer", cls._create_history_summarizer)
+        transcript = "\n".join(f"{role}: {content}" for role, content in turns)
+        response: RunResponse = summarizer.run(transcript, stream=False)
+        return response.content or ""
+
+    def chat_lifestyle_advice(self, message: str, context_history: list = None, model_tier: str = "auto") -> str:
+        """
+        Provide conversational lifestyle advice and coaching
+        """
+        key, text, prompt, messages = self._chat_request(message, context_history, model_tier)
+
+        try:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Providing lifestyle chat response for: %s...", message[:50])
+            content = self._generate(key, text, prompt, messages)
+            logger.info("Lifestyle chat response generated successfully.")
+            return content
+        except Exception:
+            logger.exception("Error generating lifestyle chat response")
+            return "I'm sorry, I'm having trouble responding right now. Could you try asking again?"
+
+    def _route(self, prompt: str) -> Tuple[str, tuple]:
+        """
+        Pick the generator method and its arguments for a free-form request
+        """
+        # Tokenize once and match every keyword group against the same term set
+        terms = prompt_terms(prompt)
         
         # Detect series requests
-        if "series" in prompt_lower or "multiple posts" in prompt_lower:
-            # Extract series length if specified
-            series_length = 5  # default
-            for num in range(3, 11):  # check for numbers 3-10
-                if str(num) in prompt:
-                    series_length = num
-                    break
-            return self.create_lifestyle_series(prompt, series_length)
+        if terms & _SERIES_KEYWORDS:
+            return "create_lifestyle_series", (prompt, series_length(prompt))
         
         # Detect seasonal content requests
-        elif any(season in prompt_lower for season in ["spring", "summer", "fall", "autumn", "winter", "seasonal", "holiday"]):
-            # Extract season
-            season = "current season"
-            seasons = ["spring", "summer", "fall", "autumn", "winter"]
-            for s in seasons:
-                if s in prompt_lower:
-                    season = s
-                    break
-            return self.create_seasonal_content(season)
+        elif terms & _SEASONAL_KEYWORDS:
+            season = next((s for s in _SEASONS if s in terms), "current season")
+            return "create_seasonal_content", (season,)
         
         # Detect guide requests
-        elif "guide" in prompt_lower or "comprehensive" in prompt_lower or "complete guide" in prompt_lower:
-            return self.create_lifestyle_guide(prompt)
+        elif terms & _GUIDE_KEYWORDS:
+            return "create_lifestyle_guide", (prompt,)
         
         # Detect chat/conversation requests
-        elif "chat" in prompt_lower or "advice" in prompt_lower or "help me" in prompt_lower:
-            return self.chat_lifestyle_advice(prompt)
+        elif terms & _CHAT_KEYWORDS:
+            return "chat_lifestyle_advice", (prompt,)
         
         # Default to blog post generation
         else:
-            # Detect style
-            style = "casual"  # default
-            if "formal" in prompt_lower or "professional" in prompt_lower:
-                style = "formal"
-            elif "inspirational" in prompt_lower or "motivational" in prompt_lower:
-                style = "inspirational"
-            elif "conversational" in prompt_lower:
-                style = "conversational"
-            
-            # Detect length
-            length = "medium"  # default
-            if "short" in prompt_lower or "brief" in prompt_lower:
-                length = "short"
-            elif "long" in prompt_lower or "detailed" in prompt_lower or "comprehensive" in prompt_lower:
-                length = "long"
-            
-            # Detect focus area
-            focus_area = "general"  # default
-            focus_areas = ["wellness", "productivity", "relationships", "personal_growth", "mindfulness", "fitness"]
-            for area in focus_areas:
-                if area in prompt_lower or area.replace("_", " ") in prompt_lower:
-                    focus_area = area
-                    break
-            
-            return self.generate_lifestyle_blog_post(prompt, style, length, focus_area)
+            style = first_match(terms, _STYLE_MAP, "casual")
+            length = first_match(terms, _LENGTH_MAP, "medium")
+            focus_area = first_match(terms, _FOCUS_MAP, "general")
+            return "generate_lifestyle_blog_post", (prompt, style, length, focus_area)
+
+    def get_response(self, prompt: str) -> str:
+        """
+        Main interface method that handles different types of lifestyle content requests
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Processing lifestyle blog content request: %s", prompt[:50])
+        method_name, args = self._route(prompt)
+        return getattr(self, method_name)(*args)
+
+    def get_response_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Streaming variant of get_response that yields content chunks as they are generated
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Streaming lifestyle blog content request: %s", prompt[:50])
+        method_name, args = self._route(prompt)
+        if method_name == "create_lifestyle_series":
+            # Series posts are written concurrently by the planned pipeline, so the series arrives in one chunk
+            yield self.create_lifestyle_series(*args)
+            return
+        request = getattr(self, self._REQUEST_BUILDERS[method_name])(*args)
+        yield from self._stream(*request)
@@ -1,55 +1,40 @@
+import asyncio
+import logging
 from agno.agent import Agent, RunResponse
-from agno.models.anthropic import Claude
 from agno.tools.reasoning import ReasoningTools
 from app.agents.base_agent import BaseAgent
-from app.core.setting import settings
-from agno.utils.pprint import pprint_run_response
-from typing import Iterator
+from app.agents.cached_claude import CachedClaude, cached_prompt
+from app.agents.prompt_routing import first_match, prompt_terms
+from typing import Iterator, Tuple
 
+logger = logging.getLogger(__name__)
 
-class LinkedInWriterAgent(BaseAgent):
-    def __init__(self):
-        self.linkedin_writer = self._create_linkedin_writer()
+# Routing keywords, matched against prompt_terms(); map order sets priority
+_SERIES_KEYWORDS = frozenset({"series", "multiple posts"})
+_OPTIMIZE_KEYWORDS = frozenset({
+    "optimize", "optimized", "optimizes", "optimizing",
+    "improve", "improved", "improves", "improving", "improvement", "improvements",
+})
+_POST_TYPE_MAP = {
+    **dict.fromkeys(("story", "stories", "experience", "experiences"), "story"),
+    **dict.fromkeys(("tip", "tips", "advice"), "tip"),
+    **dict.fromkeys(("insight", "insights", "thought", "thoughts"), "insight"),
+    **dict.fromkeys(("announce", "announced", "announcement", "announcing", "launch", "launched", "launching"), "announcement"),
+    **dict.fromkeys(("question", "questions", "ask", "asked", "asking"), "question"),
+    **dict.fromkeys(("list", "lists", "tools", "resources"), "list"),
+}
 
-    def _create_linkedin_writer(self):
-        return Agent(
-            name="LinkedIn Content Writer",
-            role="You are an expert LinkedIn content creator specializing in professional, engaging, and viral-worthy posts",
-            model=Claude(id="claude-3-7-sonnet-20250219", max_tokens=4096),
-            instructions=[
-                "Create compelling LinkedIn posts that drive engagement and professional value",
-                "Use proven LinkedIn content frameworks and best practices",
-                "Incorporate storytelling, insights, and actionable takeaways",
-                "Optimize for LinkedIn algorithm preferences (engagement, comments, shares)",
-                "Include appropriate hashtags and call-to-action elements",
-                "Match the tone to professional yet approachable style",
-                "Create content that positions the author as a thought leader",
-                "Use formatting that works well on LinkedIn (line breaks, emojis when appropriate)",
-                "Ensure content is valuable, authentic, and shareable",
-                "Format all output in markdown for easy copying",
-                "Always include 3-5 relevant hashtags at the end",
-                "Create content that encourages meaningful professional discussions",
-            ],
-            show_tool_calls=True,
-            tools=[ReasoningTools(add_instructions=True)],
-            stream=True,
-            markdown=True,
-        )
 
-    def generate_linkedin_post(self, prompt: str, post_type: str = "general") -> str:
-        """
-        Generate LinkedIn content based on the prompt and post type
-        
-        Args:
-            prompt: The topic or idea for the LinkedIn post
-            post_type: Type of post (story, tip, insight, announcement, question, list)
-        """
-        
-        enhanced_prompt = f"""
-        Create a LinkedIn post based on this prompt: "{prompt}"
-        
-        Post type: {post_type}
-        
+class LinkedInWriterAgent(BaseAgent):
+    _PROMPT_BUILDERS = {
+        "generate_linkedin_post": "_post_prompt",
+        "create_content_series": "_series_prompt",
+        "optimize_existing_post": "_optimization_prompt",
+    }
+
+    # Static prompt sections are sent ahead of the per-request details and
+    # marked for Anthropic prompt caching, so repeat calls reuse their prefill.
+    POST_PREFIX = """
         LinkedIn Content Guidelines:
         1. Hook: Start with an attention-grabbing first line
         2. Value: Provide genuine insights or useful information
@@ -73,69 +58,27 @@ class LinkedInWriterAgent(BaseAgent):
         - Goal: Build thought leadership and attract potential clients
         
         Please create an engaging LinkedIn post that follows these guidelines and generates meaningful professional engagement.
-        """
-
-        try:
-            print(f"Generating LinkedIn post for prompt: {prompt}")
-            response_stream: Iterator[RunResponse] = self.linkedin_writer.run(enhanced_prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            pprint_run_response(response, markdown=True)
-            print("LinkedIn post generated successfully.")
-            return content
-        except Exception as e:
-            print(f"Error generating LinkedIn post: {e}")
-            return f"# Error generating LinkedIn post: {e}"
+    """
 
-    def create_content_series(self, topic: str, series_length: int = 5) -> str:
-        """
-        Create a series of LinkedIn posts around a specific topic
-        """
-        
-        series_prompt = f"""
-        Create a series of {series_length} LinkedIn posts around the topic: "{topic}"
-        
+    SERIES_PREFIX = """
         Each post should:
         1. Stand alone as valuable content
         2. Connect to the overall theme
         3. Build anticipation for the next post
-        4. Include series numbering (1/{series_length}, 2/{series_length}, etc.)
+        4. Include series numbering (1/N, 2/N, etc.)
         5. Use different content formats (story, tip, insight, question, list)
         
         Please provide:
         - A brief series overview
-        - {series_length} complete LinkedIn posts
+        - The complete LinkedIn posts
         - Suggested posting schedule
         - Engagement strategy for the series
         
         Target audience: Software development professionals, startup founders, tech leaders
         Company positioning: Premium software development with AI enhancement and craftsmanship focus
-        """
-
-        try:
-            print(f"Creating LinkedIn content series for topic: {topic}")
-            response_stream: Iterator[RunResponse] = self.linkedin_writer.run(series_prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            print("LinkedIn content series created successfully.")
-            return content
-        except Exception as e:
-            print(f"Error creating LinkedIn content series: {e}")
-            return f"# Error creating content series: {e}"
+    """
 
-    def optimize_existing_post(self, existing_post: str) -> str:
-        """
-        Optimize an existing LinkedIn post for better engagement
-        """
-        
-        optimization_prompt = f"""
-        Please analyze and optimize this existing LinkedIn post for better engagement:
-        
-        Original Post:
-        {existing_post}
-        
+    OPTIMIZATION_PREFIX = """
         Optimization Guidelines:
         1. Improve the hook (first line) to grab attention
         2. Enhance storytelling and emotional connection
@@ -152,48 +95,177 @@ class LinkedInWriterAgent(BaseAgent):
         - Engagement prediction and tips
         
         Target audience: Software development professionals, startup founders, tech leaders
+    """
+
+    def __init__(self):
+        self.linkedin_writer = self._shared_agent("linkedin_writer", self._create_linkedin_writer)
+
+    def _create_linkedin_writer(self):
+        return Agent(
+            name="LinkedIn Content Writer",
+            role="You are an expert LinkedIn content creator specializing in professional, engaging, and viral-worthy posts",
+            model=CachedClaude(id="claude-3-7-sonnet-20250219", max_tokens=4096),
+            instructions=[
+                "Create compelling LinkedIn posts that drive engagement and professional value",
+                "Use proven LinkedIn content frameworks and best practices",
+                "Incorporate storytelling, insights, and actionable takeaways",
+                "Optimize for LinkedIn algorithm preferences (engagement, comments, shares)",
+                "Include appropriate hashtags and call-to-action elements",
+                "Match the tone to professional yet approachable style",
+                "Create content that positions the author as a thought leader",
+                "Use formatting that works well on LinkedIn (line breaks, emojis when appropriate)",
+                "Ensure content is valuable, authentic, and shareable",
+                "Format all output in markdown for easy copying",
+                "Always include 3-5 relevant hashtags at the end",
+                "Create content that encourages meaningful professional discussions",
+            ],
+            show_tool_calls=True,
+            tools=[ReasoningTools(add_instructions=True)],
+            stream=True,
+            markdown=True,
+        )
+
+    def _post_prompt(self, prompt: str, post_type: str = "general") -> list:
+        """Build the prompt for a single LinkedIn post"""
+        dynamic_prompt = f"""
+        Create a LinkedIn post based on this prompt: "{prompt}"
+        
+        Post type: {post_type}
         """
+        return cached_prompt(self.POST_PREFIX, dynamic_prompt)
+
+    def generate_linkedin_post(self, prompt: str, post_type: str = "general") -> str:
+        """
+        Generate LinkedIn content based on the prompt and post type
+        
+        Args:
+            prompt: The topic or idea for the LinkedIn post
+            post_type: Type of post (story, tip, insight, announcement, question, list)
+        """
+        enhanced_prompt = self._post_prompt(prompt, post_type)
 
         try:
-            print("Optimizing existing LinkedIn post...")
-            response_stream: Iterator[RunResponse] = self.linkedin_writer.run(optimization_prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            print("LinkedIn post optimization completed successfully.")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Generating LinkedIn post for prompt: %s", prompt[:50])
+            response_stream: Iterator[RunResponse] = self.linkedin_writer.run(enhanced_prompt)
+            content = self._collect_content(response_stream)
+            logger.info("LinkedIn post generated successfully.")
             return content
         except Exception as e:
-            print(f"Error optimizing LinkedIn post: {e}")
-            return f"# Error optimizing post: {e}"
+            logger.exception("Error generating LinkedIn post")
+            return f"# Error generating LinkedIn post: {e}"
 
-    def get_response(self, prompt: str) -> str:
+    def _series_prompt(self, topic: str, series_length: int = 5) -> list:
+        """Build the prompt for a LinkedIn content series"""
+        dynamic_prompt = f"""
+        Create a series of {series_length} LinkedIn posts around the topic: "{topic}"
         """
-        Main interface method that handles different types of LinkedIn content requests
+        return cached_prompt(self.SERIES_PREFIX, dynamic_prompt)
+
+    def create_content_series(self, topic: str, series_length: int = 5) -> str:
+        """
+        Create a series of LinkedIn posts around a specific topic, writing the posts concurrently
+        """
+        return self._run_async(self.create_content_series_async(topic, series_length))
+
+    def _series_outline_prompt(self, topic: str, series_length: int) -> list:
+        """Build the prompt for planning a LinkedIn content series without writing the posts"""
+        dynamic_prompt = f"""
+        Plan a series of {series_length} LinkedIn posts around the topic: "{topic}"
+        
+        Provide only the series overview, a numbered outline with the title, content format and key message of each post, the suggested posting schedule and the engagement strategy. The posts themselves are written separately.
+        """
+        return cached_prompt(self.SERIES_PREFIX, dynamic_prompt)
+
+    def _series_post_prompt(self, topic: str, outline: str, post_number: int, series_length: int) -> list:
+        """Build the prompt for one post of a planned series; the plan is the shared cached prefix"""
+        series_plan = f"""{self.SERIES_PREFIX}
+        Series plan for "{topic}":
+        {outline}
+        """
+        dynamic_prompt = f"""
+        Write post {post_number}/{series_length} of this series in full, following its entry in the series plan. Return only the post.
         """
-        print(f"Processing LinkedIn content request: {prompt}")
+        return cached_prompt(series_plan, dynamic_prompt)
+
+    async def create_content_series_async(self, topic: str, series_length: int = 5) -> str:
+        """
+        Create a LinkedIn content series by planning it first and then writing every post concurrently
+        """
+        try:
+            logger.info("Creating LinkedIn content series concurrently for topic: %s", topic)
+            outline = await self._arun_content(self.linkedin_writer, self._series_outline_prompt(topic, series_length))
+            # Each post runs on its own Agent because agno Agents hold per-run state
+            posts = await asyncio.gather(*[
+                self._arun_content(self._create_linkedin_writer(), self._series_post_prompt(topic, outline, number, series_length))
+                for number in range(1, series_length + 1)
+            ])
+            logger.info("LinkedIn content series created successfully.")
+            return "\n\n---\n\n".join([outline, *posts])
+        except Exception as e:
+            logger.exception("Error creating LinkedIn content series")
+            return f"# Error creating content series: {e}"
+
+    def _optimization_prompt(self, existing_post: str) -> list:
+        """Build the prompt for optimizing an existing LinkedIn post"""
+        dynamic_prompt = f"""
+        Please analyze and optimize this existing LinkedIn post for better engagement:
         
-        # Determine the type of request based on keywords in the prompt
-        prompt_lower = prompt.lower()
+        Original Post:
+        {existing_post}
+        """
+        return cached_prompt(self.OPTIMIZATION_PREFIX, dynamic_prompt)
+
+    def optimize_existing_post(self, existing_post: str) -> str:
+        """
+        Optimize an existing LinkedIn post for better engagement
+        """
+        prompt = self._optimization_prompt(existing_post)
+
+        try:
+            logger.info("Optimizing existing LinkedIn post...")
+            response_stream: Iterator[RunResponse] = self.linkedin_writer.run(prompt)
+            content = self._collect_content(response_stream)
+            logger.info("LinkedIn post optimization completed successfully.")
+            return content
+        except Exception as e:
+            logger.exception("Error optimizing LinkedIn post")
+            return f"# Error optimizing post: {e}"
+
+    def _route(self, prompt: str) -> Tuple[str, tuple]:
+        """
+        Pick the generator method and its arguments for a free-form request
+        """
+        # Tokenize once and match every keyword group against the same term set
+        terms = prompt_terms(prompt)
         
-        if "series" in prompt_lower or "multiple posts" in prompt_lower:
-            return self.create_content_series(prompt)
-        elif "optimize" in prompt_lower or "improve" in prompt_lower:
+        if terms & _SERIES_KEYWORDS:
+            return "create_content_series", (prompt,)
+        elif terms & _OPTIMIZE_KEYWORDS:
             # Extract the post content for optimization (this is a simplified approach)
-            return self.optimize_existing_post(prompt)
+            return "optimize_existing_post", (prompt,)
         else:
-            # Determine post type based on keywords
-            post_type = "general"
-            if "story" in prompt_lower or "experience" in prompt_lower:
-                post_type = "story"
-            elif "tip" in prompt_lower or "advice" in prompt_lower:
-                post_type = "tip"
-            elif "insight" in prompt_lower or "thought" in prompt_lower:
-                post_type = "insight"
-            elif "announce" in prompt_lower or "launch" in prompt_lower:
-                post_type = "announcement"
-            elif "question" in prompt_lower or "ask" in prompt_lower:
-                post_type = "question"
-            elif "list" in prompt_lower or "tools" in prompt_lower or "resources" in prompt_lower:
-                post_type = "list"
-            
-            return self.generate_linkedin_post(prompt, post_type)
+            return "generate_linkedin_post", (prompt, first_match(terms, _POST_TYPE_MAP, "general"))
+
+    def get_response(self, prompt: str) -> str:
+        """
+        Main interface method that handles different types of LinkedIn content requests
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Processing LinkedIn content request: %s", prompt[:50])
+        method_name, args = self._route(prompt)
+        return getattr(self, method_name)(*args)
+
+    def get_response_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Streaming variant of get_response that yields content chunks as they are generated
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Streaming LinkedIn content request: %s", prompt[:50])
+        method_name, args = self._route(prompt)
+        full_prompt = getattr(self, self._PROMPT_BUILDERS[method_name])(*args)
+        try:
+            yield from self._stream_content(self.linkedin_writer.run(full_prompt))
+        except Exception as e:
+            logger.exception("Error streaming LinkedIn content")
+            yield f"# Error generating LinkedIn content: {e}"
@@ -1,19 +1,137 @@
+import asyncio
+import json
+import logging
+import re
+import textwrap
 from typing import Iterator
-from agno.agent import Agent, RunResponse
-from agno.models.anthropic import Claude
-from agno.storage.sqlite import SqliteStorage
-from agno.tools.googlesearch import GoogleSearchTools
-from agno.tools.crawl4ai import Crawl4aiTools
+from agno.agent import Agent
 from app.agents.base_agent import BaseAgent
+from app.agents.cached_claude import CachedClaude, cached_prompt, cached_text_block
+from app.agents.semantic_cache import SemanticCache
 from app.core import settings
-from agno.utils.pprint import pprint_run_response
-import os
+from app.db.agent_storage import WalSqliteStorage
+from app.tools.cached_crawl4ai import CachedCrawl4aiTools
+from app.tools.cached_googlesearch import CachedGoogleSearchTools
+
+logger = logging.getLogger(__name__)
+
+# Team members run in dependency order; members within a stage are independent
+_ANALYSIS_STAGE = ("website_analyzer", "seo_keyword", "offer_analysis", "audience_analysis", "distribution", "testing")
+_COPY_STAGE = ("copywriting",)
+_REFINEMENT_STAGE = ("copy_variation_technical", "copy_variation_emotional", "conversion_pathway")
+_PLANNING_STAGE = ("product_manager",)
+
+# Output budgets sized to each member's report; settings.MARKETING_AGENT_MAX_TOKENS overrides any of them
+_MAX_TOKENS = {
+    "website_analyzer": 3000,
+    "seo_keyword": 3000,
+    "offer_analysis": 4000,
+    "audience_analysis": 3500,
+    "copywriting": 8000,
+    "copy_variation_technical": 8000,
+    "copy_variation_emotional": 8000,
+    "conversion_pathway": 3000,
+    "distribution": 3000,
+    "testing": 4000,
+    "product_manager": 5000,
+}
+
+
+def _clean_prompt(text):
+    """Dedent a prompt literal and strip trailing whitespace and surrounding blank lines"""
+    return "\n".join(line.rstrip() for line in textwrap.dedent(text).strip("\n").splitlines())
+
+
+def _max_tokens(member):
+    return settings.MARKETING_AGENT_MAX_TOKENS.get(member, _MAX_TOKENS[member])
+
+
+# Every member but the product manager ends its report with a machine-readable summary;
+# the product manager plans from the merged summaries instead of re-reading every report
+_STRUCTURED_OUTPUT_INSTRUCTION = (
+    "At the end, emit a fenced ```json block with keys `findings` and `actions`, "
+    "each a list of {title, priority, effort} objects"
+)
+_JSON_BLOCK_RE = re.compile(r"```json[ \t]*\n(.*?)\n[ \t]*```", re.S)
+
+
+def _split_structured(content):
+    """Split a member's report into its markdown and its trailing JSON summary, if that parses"""
+    matches = list(_JSON_BLOCK_RE.finditer(content))
+    if not matches:
+        return content, None
+    match = matches[-1]
+    try:
+        data = json.loads(match.group(1))
+    except ValueError:
+        return content, None
+    if not isinstance(data, dict):
+        return content, None
+    return (content[:match.start()] + content[match.end():]).strip(), data
+
+
+# Crawled pages are capped so a large site does not flood every agent's context
+_CRAWL_MAX_LENGTH = 40_000
+
+# Finished reviews keyed by the review brief and looked up by exact URL
+_REVIEW_CACHE = SemanticCache(
+    maxsize=256,
+    ttl=settings.MARKETING_REVIEW_CACHE_TTL_DAYS * 24 * 3600,
+    db_file=settings.SEMANTIC_CACHE_DB,
+    table="marketing_review_cache",
+)
 
 class MarketingAgent(BaseAgent):
+    # The review brief is identical for every website; it is sent ahead of the
+    # URL and marked for Anthropic prompt caching, so each stage reuses its prefill.
+    # It is normalised once here so the prompt-cache prefix and the review cache key
+    # stay byte-identical across runs.
+    REVIEW_PREFIX = _clean_prompt("""
+        Please conduct a complete marketing review and optimization of the website given below.
+        The website should be a marketing machine that generates leads and converts them into customers.
+        Current Audience: CxOs, Product Managers, and Founders of startups. Pre-product, non-tech startup founders looking for software development services.
+        We target people who have already been burnt by India or other outsourcing experience because quality of work stands us apart.
+        We want to appeal to the people who already understand software craft, or totally non-tech audience.
+        <company-purpose>
+        Bring our clients' dreams to life by being their trusted engineering partners, crafting innovative software solutions.
+        Challenge offshore development stereotypes by delivering exceptional quality, and proving the value of craftsmanship.
+        Empower clients to deliver value quickly and frequently to their end users.
+        Ensure long-term success for our clients by building reliable, sustainable, and impactful solutions.
+        Raise the bar of software craft by setting a new standard for the community.
+        </company-purpose>
+        
+        Follow this process:
+        1. Analyze technical aspects of the website
+        2. Evaluate SEO and keyword strategy
+        3. Evaluate the offers and value propositions
+        4. Assess audience understanding and segmentation
+        5. Create complete new copy for the entire website (not just recommendations)
+        6. Generate two additional variations of the new copy for different audience segments
+        7. Analyze user journey and conversion pathways
+        8. Analyze distribution and traffic strategies
+        9. Develop testing and optimization strategy
+        
+        For the new copy, provide:
+        - VARIATION 1: Balanced copy that speaks to both technical and non-technical audiences
+        - VARIATION 2: Copy optimized for technical audiences (CxOs with technical background)
+        - VARIATION 3: Copy optimized for non-technical audiences (Founders without technical expertise)
+        
+        Each variation should be complete and include all major website sections.
+        
+        For each area, provide:
+        - Analysis of current status
+        - Specific issues identified
+        - Actionable recommendations with examples
+        - Priority improvements that will have the biggest impact
+        
+        Provide a comprehensive report with all findings and improvements. Along with the three complete variations of new website copy.
+        """)
+    REVIEW_CACHE_KEY = ("review_marketing_website", REVIEW_PREFIX)
+
     def __init__(self):
         self.AGENT_STORAGE = settings.AGENT_STORAGE
-        print(self.AGENT_STORAGE)
-        self.marketing_website_team = self._create_marketing_website_team()
+        # Building the members (models, search and crawl tools) is done once per worker thread
+        self.marketing_website_team = self._shared_agent("marketing_website_team", self._create_marketing_website_team)
 
 
     # Factory methods for creating individual agents
@@ -21,7 +139,7 @@ class MarketingAgent(BaseAgent):
         return Agent(
             name="Website Analyzer Agent",
             role="You are an expert at analyzing website structure, performance, and technical SEO elements",
-            model=Claude(id="claude-3-7-sonnet-20250219", max_tokens=8096),
+            model=CachedClaude(id="claude-3-7-sonnet-20250219", max_tokens=_max_tokens("website_analyzer")),
             instructions=[
                 "Analyze technical aspects of websites including performance, structure, and technical SEO elements",
                 "Check loading speed and performance metrics",
@@ -34,10 +152,11 @@ class MarketingAgent(BaseAgent):
                 "Create a comprehensive technical report with an overall score from 0-100",
                 "Format all output in markdown",
                 "Instead of making open-ended recommendations, provide clear actionable steps",
+                _STRUCTURED_OUTPUT_INSTRUCTION,
             ],
             show_tool_calls=True,
-            tools=[GoogleSearchTools(), Crawl4aiTools(max_length=None)],
-            stream=True,
+            tools=[CachedGoogleSearchTools(), CachedCrawl4aiTools(max_length=_CRAWL_MAX_LENGTH)],
+            stream=False,
             markdown=True,
         )
 
@@ -45,7 +164,7 @@ class MarketingAgent(BaseAgent):
         return Agent(
             name="SEO Keyword Agent",
             role="You are an expert at optimizing website content for search engines and keyword relevance",
-            model=Claude(id="claude-3-7-sonnet-20250219", max_tokens=8096),
+            model=CachedClaude(id="claude-3-7-sonnet-20250219", max_tokens=_max_tokens("seo_keyword")),
             instructions=[
                 "Extract the current primary and secondary keywords being targeted",
                 "Analyze keyword density, placement, and relevance in content",
@@ -57,10 +176,11 @@ class MarketingAgent(BaseAgent):
                 "Create a keyword strategy with short-term and long-term recommendations",
                 "Format all output in markdown with tables for keyword analysis",
                 "Instead of making open-ended recommendations, provide clear actionable steps",
+                _STRUCTURED_OUTPUT_INSTRUCTION,
             ],
             show_tool_calls=True,
-            tools=[GoogleSearchTools(), Crawl4aiTools(max_length=None)],
-            stream=True,
+            tools=[CachedGoogleSearchTools(), CachedCrawl4aiTools(max_length=_CRAWL_MAX_LENGTH)],
+            stream=False,
             markdown=True,
         )
 
@@ -68,7 +188,7 @@ class MarketingAgent(BaseAgent):
         return Agent(
             name="Offer Analysis Agent",
             role="You are an expert at analyzing and improving product/service offers on websites",
-            model=Claude(id="claude-3-7-sonnet-20250219", max_tokens=8096),
+            model=CachedClaude(id="claude-3-7-sonnet-20250219", max_tokens=_max_tokens("offer_analysis")),
             instructions=[
                 "Analyze existing offers on the website based on Alex Hormozi's $100M Offers framework",
                 "Identify the core value proposition and evaluate its clarity and appeal",
@@ -89,10 +209,11 @@ class MarketingAgent(BaseAgent):
                 "We are truly better faster cheaper",
                 "Our heart lies in craftsmanship and we are not a bodyshop",
                 "We consider ourselves tech nannies of our clients, we take care of their tech when they go out and do their business",
+                _STRUCTURED_OUTPUT_INSTRUCTION,
             ],
             show_tool_calls=True,
-            tools=[GoogleSearchTools(), Crawl4aiTools(max_length=None)],
-            stream=True,
+            tools=[CachedGoogleSearchTools(), CachedCrawl4aiTools(max_length=_CRAWL_MAX_LENGTH)],
+            stream=False,
             markdown=True,
         )
 
@@ -100,7 +221,7 @@ class MarketingAgent(BaseAgent):
         return Agent(
             name="Audience Analysis Agent",
             role="You are an expert at identifying target audiences and their needs from website content",
-            model=Claude(id="claude-3-7-sonnet-20250219", max_tokens=8096),
+            model=CachedClaude(id="claude-3-7-sonnet-20250219", max_tokens=_max_tokens("audience_analysis")),
             instructions=[
                 "Analyze the website to identify the target audience segments",
                 "Evaluate how well the website demonstrates understanding of customer needs and pain points",
@@ -115,10 +236,11 @@ class MarketingAgent(BaseAgent):
                 "Format all output in markdown",
                 "Include specific examples of how to better address audience needs and emotions",
                 "Instead of making open-ended recommendations, provide clear actionable recommendations",
+                _STRUCTURED_OUTPUT_INSTRUCTION,
             ],
             show_tool_calls=True,
-            tools=[GoogleSearchTools(), Crawl4aiTools(max_length=None)],
-            stream=True,
+            tools=[CachedGoogleSearchTools(), CachedCrawl4aiTools(max_length=_CRAWL_MAX_LENGTH)],
+            stream=False,
             markdown=True,
         )
 
@@ -126,7 +248,7 @@ class MarketingAgent(BaseAgent):
         return Agent(
             name="Copywriting Agent",
             role="You are an expert copywriter specializing in clear, emotional, and compelling marketing messages",
-            model=Claude(id="claude-3-7-sonnet-20250219", max_tokens=8096),
+            model=CachedClaude(id="claude-3-7-sonnet-20250219", max_tokens=_max_tokens("copywriting")),
             instructions=[
                 "Analyze the current copywriting and messaging on the website",
                 "Don't just make recommendations - create complete new copy for all major website sections",
@@ -143,34 +265,57 @@ class MarketingAgent(BaseAgent):
                 "Ensure the new copy aligns with our company purpose",
                 "Focus on creating copy that speaks to both technical and non-technical audiences",
                 "The new copy should emphasize quality, craftsmanship, and AI-enhanced development",
+                _STRUCTURED_OUTPUT_INSTRUCTION,
             ],
             show_tool_calls=True,
-            tools=[GoogleSearchTools(), Crawl4aiTools(max_length=None)],
-            stream=True,
+            tools=[CachedGoogleSearchTools()],
+            stream=False,
             markdown=True,
         )
 
-    def create_copy_variation_agent(self):
+    def create_copy_variation_technical_agent(self):
         return Agent(
-            name="Copy Variation Agent",
-            role="You are an expert at creating multiple distinct but effective copy variations for websites",
-            model=Claude(id="claude-3-7-sonnet-20250219", max_tokens=8096),
+            name="Technical Copy Variation Agent",
+            role="You are an expert at writing technical, feature-focused website copy for technically savvy buyers",
+            model=CachedClaude(id="claude-3-7-sonnet-20250219", max_tokens=_max_tokens("copy_variation_technical")),
             instructions=[
-                "Take the initial new copy created by the Copywriting Agent and create 2 distinct variations",
+                "Take the initial new copy created by the Copywriting Agent and create VARIATION 2 only",
                 "VARIATION 2 should use a more technical, feature-focused approach for technically savvy audiences",
+                "Create complete copy for all major website sections",
+                "Include headlines, subheadlines, body copy, and CTAs",
+                "Format all output in markdown with clear section labels",
+                "Clearly label the output VARIATION 2",
+                "Maintain the core value proposition and align with company purpose",
+                "Make the variation genuinely different in tone, structure, and approach - not just minor word changes",
+                "Incorporate the insights from audience analysis and offer analysis",
+                "Use SEO friendly language and keywords",
+                _STRUCTURED_OUTPUT_INSTRUCTION,
+            ],
+            show_tool_calls=True,
+            stream=False,
+            markdown=True,
+        )
+
+    def create_copy_variation_emotional_agent(self):
+        return Agent(
+            name="Emotional Copy Variation Agent",
+            role="You are an expert at writing emotional, benefit-focused website copy for non-technical buyers",
+            model=CachedClaude(id="claude-3-7-sonnet-20250219", max_tokens=_max_tokens("copy_variation_emotional")),
+            instructions=[
+                "Take the initial new copy created by the Copywriting Agent and create VARIATION 3 only",
                 "VARIATION 3 should use a more emotional, benefit-focused approach for non-technical audiences",
-                "For each variation, create complete copy for all major website sections",
-                "Include headlines, subheadlines, body copy, and CTAs in each variation",
+                "Create complete copy for all major website sections",
+                "Include headlines, subheadlines, body copy, and CTAs",
                 "Format all output in markdown with clear section labels",
-                "Clearly label each variation (VARIATION 2, VARIATION 3)",
-                "Ensure all variations maintain the core value proposition and align with company purpose",
-                "Make the variations genuinely different in tone, structure, and approach - not just minor word changes",
-                "Incorporate the insights from audience analysis and offer analysis in your variations",
-                "Use SEO friendly language and keywords in all variations",
+                "Clearly label the output VARIATION 3",
+                "Maintain the core value proposition and align with company purpose",
+                "Make the variation genuinely different in tone, structure, and approach - not just minor word changes",
+                "Incorporate the insights from audience analysis and offer analysis",
+                "Use SEO friendly language and keywords",
+                _STRUCTURED_OUTPUT_INSTRUCTION,
             ],
             show_tool_calls=True,
-            tools=[Crawl4aiTools(max_length=None)],
-            stream=True,
+            stream=False,
             markdown=True,
         )
 
@@ -178,7 +323,7 @@ class MarketingAgent(BaseAgent):
         return Agent(
             name="Conversion Pathway Agent",
             role="You are an expert at optimizing user journeys and conversion paths on websites",
-            model=Claude(id="claude-3-7-sonnet-20250219", max_tokens=8096),
+            model=CachedClaude(id="claude-3-7-sonnet-20250219", max_tokens=_max_tokens("conversion_pathway")),
             instructions=[
                 "Map the current user journey from entry to conversion point",
                 "Identify friction points where copy or design may cause users to hesitate or abandon",
@@ -191,10 +336,10 @@ class MarketingAgent(BaseAgent):
                 "Create a conversion funnel analysis with specific improvement recommendations",
                 "Format all output in markdown with journey maps",
                 "Instead of making open-ended recommendations, provide clear actionable steps",
+                _STRUCTURED_OUTPUT_INSTRUCTION,
             ],
             show_tool_calls=True,
-            tools=[Crawl4aiTools(max_length=None)],
-            stream=True,
+            stream=False,
             markdown=True,
         )
 
@@ -202,7 +347,7 @@ class MarketingAgent(BaseAgent):
         return Agent(
             name="Distribution Strategy Agent",
             role="You are an expert at analyzing and improving traffic generation and visibility strategies",
-            model=Claude(id="claude-3-7-sonnet-20250219", max_tokens=8096),
+            model=CachedClaude(id="claude-3-7-sonnet-20250219", max_tokens=_max_tokens("distribution")),
             instructions=[
                 "Analyze the website's current distribution and traffic generation strategies",
                 "Evaluate social media integration, SEO setup, content shareability, and traffic sources",
@@ -217,10 +362,11 @@ class MarketingAgent(BaseAgent):
                 "Format all output in markdown",
                 "Include specific tactics to improve distribution across owned, earned, and paid channels",
                 "Instead of making open-ended recommendations, provide clear actionable steps",
+                _STRUCTURED_OUTPUT_INSTRUCTION,
             ],
             show_tool_calls=True,
-            tools=[GoogleSearchTools(), Crawl4aiTools(max_length=None)],
-            stream=True,
+            tools=[CachedGoogleSearchTools(), CachedCrawl4aiTools(max_length=_CRAWL_MAX_LENGTH)],
+            stream=False,
             markdown=True,
         )
 
@@ -228,7 +374,7 @@ class MarketingAgent(BaseAgent):
         return Agent(
             name="Testing & Iteration Agent",
             role="You are an expert at developing testing strategies for marketing websites",
-            model=Claude(id="claude-3-7-sonnet-20250219", max_tokens=8096),
+            model=CachedClaude(id="claude-3-7-sonnet-20250219", max_tokens=_max_tokens("testing")),
             instructions=[
                 "Analyze the website for existing testing capabilities and data collection",
                 "Identify key elements that should be tested (headlines, offers, CTAs, etc.)",
@@ -241,10 +387,11 @@ class MarketingAgent(BaseAgent):
                 "Format all output in markdown",
                 "Include specific examples of tests to run and how to implement them",
                 "Instead of making open-ended recommendations, provide clear actionable steps",
+                _STRUCTURED_OUTPUT_INSTRUCTION,
             ],
             show_tool_calls=True,
-            tools=[GoogleSearchTools(), Crawl4aiTools(max_length=None)],
-            stream=True,
+            tools=[CachedGoogleSearchTools(), CachedCrawl4aiTools(max_length=_CRAWL_MAX_LENGTH)],
+            stream=False,
             markdown=True,
         )
 
@@ -252,7 +399,7 @@ class MarketingAgent(BaseAgent):
         return Agent(
             name="Product Manager Agent",
             role="You are an expert product manager who can analyze and improve product offerings",
-            model=Claude(id="claude-3-7-sonnet-20250219", max_tokens=8096),
+            model=CachedClaude(id="claude-3-7-sonnet-20250219", max_tokens=_max_tokens("product_manager")),
             instructions=[
                 "Analyze all the aspects of the generated report and create a list of todos",
                 "Create a markdown todo list for a set of developers",
@@ -265,119 +412,210 @@ class MarketingAgent(BaseAgent):
                 "Instead of making open-ended recommendations, provide clear actionable steps",
             ],
             show_tool_calls=True,
-            tools=[Crawl4aiTools(max_length=None), GoogleSearchTools()],
-            stream=True,
+            tools=[CachedCrawl4aiTools(max_length=_CRAWL_MAX_LENGTH), CachedGoogleSearchTools()],
+            storage=WalSqliteStorage(table_name="marketing_website_team", db_file=self.AGENT_STORAGE),
+            stream=False,
             markdown=True,
         )
 
     def _create_marketing_website_team(self):
-        return Agent(
-            name="Marketing Website Optimization Team",
-            team=[
-                self.create_website_analyzer_agent(),
-                self.create_seo_keyword_agent(),
-                self.create_offer_analysis_agent(),
-                self.create_audience_analysis_agent(),
-                self.create_copywriting_agent(),
-                self.create_copy_variation_agent(),
-                self.create_conversion_pathway_agent(),
-                self.create_distribution_agent(),
-                self.create_testing_agent(),
-                self.create_product_manager_agent()
-            ],
-            model=Claude(id="claude-3-7-sonnet-20250219", max_tokens=12000),
-            instructions=[
-                "You are a team of marketing experts who work together to analyze and optimize websites.",
-                "Given a website URL, conduct a comprehensive review focused on marketing effectiveness.",
-                "Each team member has specific expertise aligned with core marketing skills:",
-                "1. Technical Foundation (Website Analyzer) reviews technical aspects",
-                "2. Search Engine Visibility (SEO Keyword Agent) evaluates keyword strategy",
-                "3. Offer Creation (Offer Analysis) evaluates the product/service offers",
-                "4. Audience Understanding (Audience Analysis) evaluates target audience alignment",
-                "5. Message Crafting (Copywriting) creates complete new copy for the website",
-                "6. Copy Variation (Copy Variation Agent) creates multiple distinct versions of the copy",
-                "7. User Journey (Conversion Pathway) analyzes the path to conversion",
-                "8. Distribution (Distribution Strategy) analyzes traffic generation",
-                "9. Testing & Iteration (Testing) develops a testing and optimization plan",
-                "10. Implementation Planning (Product Manager) creates actionable tasks",
-                "Provide a comprehensive report with actionable recommendations",
-                "Include specific examples and improvements for each section",
-                "Format all output in markdown with clear sections",
-                "Create a separate section called NEW WEBSITE COPY with three complete variations",
-                "Pass all the analysis and reports to the product manager so that clear course of action is charted for developers",
-                "Create a separate section called TODOS at the end of the report to gather all the todos",
-                "Instead of making open-ended recommendations, provide clear actionable steps",
-            ],
-            show_tool_calls=True,
-            markdown=True,
-            storage=SqliteStorage(table_name="marketing_website_team", db_file=self.AGENT_STORAGE),
-            stream=True,
+        return {
+            "website_analyzer": self.create_website_analyzer_agent(),
+            "seo_keyword": self.create_seo_keyword_agent(),
+            "offer_analysis": self.create_offer_analysis_agent(),
+            "audience_analysis": self.create_audience_analysis_agent(),
+            "copywriting": self.create_copywriting_agent(),
+            "copy_variation_technical": self.create_copy_variation_technical_agent(),
+            "copy_variation_emotional": self.create_copy_variation_emotional_agent(),
+            "conversion_pathway": self.create_conversion_pathway_agent(),
+            "distribution": self.create_distribution_agent(),
+            "testing": self.create_testing_agent(),
+            "product_manager": self.create_product_manager_agent(),
+        }
+
+    async def _run_stage(self, prompt, names, failed, limit):
+        """
+        Run the named team members concurrently on the same prompt.
+
+        Returns (name, markdown, summary) per member, where summary is the parsed JSON block
+        or None. A failing member does not abort the review; its section records the error
+        instead and its name is appended to failed. Members call the API while holding limit,
+        the review's semaphore shared by all of its stages.
+        """
+        agents = [self.marketing_website_team[name] for name in names]
+
+        async def run(agent):
+            async with limit:
+                return await self._arun_content(agent, prompt)
+
+        results = await asyncio.gather(*(run(agent) for agent in agents), return_exceptions=True)
+        reports = []
+        for agent, result in zip(agents, results):
+            if isinstance(result, BaseException):
+                logger.error("Error running %s: %s", agent.name, result)
+                failed.append(agent.name)
+                reports.append((agent.name, f"_{agent.name} failed: {result}_", None))
+            else:
+                reports.append((agent.name, *_split_structured(result)))
+        return reports
+
+    @staticmethod
+    def _with_reports(prompt, reports):
+        """Extend the review brief with the reports of the earlier stages"""
+        sections = "\n\n".join(
+            f'<report agent="{name}">\n{content}\n</report>' for name, content, _ in reports
         )
+        return prompt + [{"type": "text", "text": f"Reports from the team so far:\n{sections}"}]
 
-    def review_marketing_website(self, url):
-        print(f"Starting marketing website review for URL: {url}")
-        prompt = f"""
-        Please conduct a complete marketing review and optimization of the website at {url}.
-        The website should be a marketing machine that generates leads and converts them into customers.
-        Current Audience: CxOs, Product Managers, and Founders of startups. Pre-product, non-tech startup founders looking for software development services.
-        We target people who have already been burnt by India or other outsourcing experience because quality of work stands us apart.
-        We want to appeal to the people who already understand software craft, or totally non-tech audience.
-        <company-purpose>
-    Bring our clients' dreams to life by being their trusted engineering partners, crafting innovative software solutions.
-    Challenge offshore development stereotypes by delivering exceptional quality, and proving the value of craftsmanship.
-    Empower clients to deliver value quickly and frequently to their end users.
-    Ensure long-term success for our clients by building reliable, sustainable, and impactful solutions.
-    Raise the bar of software craft by setting a new standard for the community.
-        </company-purpose>
-        
-        Follow this process:
-        1. Analyze technical aspects of the website
-        2. Evaluate SEO and keyword strategy
-        3. Evaluate the offers and value propositions
-        4. Assess audience understanding and segmentation
-        5. Create complete new copy for the entire website (not just recommendations)
-        6. Generate two additional variations of the new copy for different audience segments
-        7. Analyze user journey and conversion pathways
-        8. Analyze distribution and traffic strategies
-        9. Develop testing and optimization strategy
-        
-        For the new copy, provide:
-        - VARIATION 1: Balanced copy that speaks to both technical and non-technical audiences
-        - VARIATION 2: Copy optimized for technical audiences (CxOs with technical background)
-        - VARIATION 3: Copy optimized for non-technical audiences (Founders without technical expertise)
-        
-        Each variation should be complete and include all major website sections.
-        
-        For each area, provide:
-        - Analysis of current status
-        - Specific issues identified
-        - Actionable recommendations with examples
-        - Priority improvements that will have the biggest impact
-        
-        Provide a comprehensive report with all findings and improvements. Along with the three complete variations of new website copy.
+    @staticmethod
+    def _with_summaries(prompt, reports):
+        """
+        Extend the review brief with the team's merged JSON findings and actions.
+
+        Reports without a usable summary are passed in full so nothing is lost.
+        """
+        merged = {"findings": [], "actions": []}
+        unstructured = []
+        for name, content, summary in reports:
+            if summary is None:
+                unstructured.append((name, content, None))
+                continue
+            for key, items in merged.items():
+                items.extend({**item, "source": name} for item in summary.get(key) or [] if isinstance(item, dict))
+        text = f"Findings and actions from the team:\n```json\n{json.dumps(merged, ensure_ascii=False)}\n```"
+        if unstructured:
+            text += "\n\nReports without a summary:\n" + "\n\n".join(
+                f'<report agent="{name}">\n{content}\n</report>' for name, content, _ in unstructured
+            )
+        return prompt + [{"type": "text", "text": text}]
+
+    async def _review_sections(self, url, failed):
+        """
+        Review the website in dependency order, yielding report sections as each stage finishes.
+
+        The analysis stage fans out across six agents, the copywriter builds on their reports,
+        the two copy variations and the conversion review run together on the new copy, and the
+        product manager turns the merged JSON summaries into the TODOS. Names of members that
+        failed are appended to failed. At most settings.MARKETING_AGENT_CONCURRENCY members of
+        the review call the API at once.
+        """
+        # The team is reused across reviews, so each review starts it on a fresh session
+        self.new_sessions()
+        limit = asyncio.Semaphore(settings.MARKETING_AGENT_CONCURRENCY)
+        yield f"# Marketing Website Review: {url}"
+        prompt = self._review_prompt(url, await self._crawl_website(url))
+        reports = []
+        for stage in (_ANALYSIS_STAGE, _COPY_STAGE, _REFINEMENT_STAGE):
+            stage_prompt = self._with_reports(prompt, reports) if reports else prompt
+            stage_reports = await self._run_stage(stage_prompt, stage, failed, limit)
+            reports.extend(stage_reports)
+            for name, content, _ in stage_reports:
+                yield f"## {name}\n\n{content}"
+        planning_prompt = self._with_summaries(self._review_prompt(url), reports)
+        for _, content, _ in await self._run_stage(planning_prompt, _PLANNING_STAGE, failed, limit):
+            yield f"## TODOS\n\n{content}"
+
+    async def _review(self, url):
+        """Run the whole review and return the report and the names of any members that failed"""
+        failed = []
+        sections = [section async for section in self._review_sections(url, failed)]
+        return "\n\n".join(sections), failed
+
+    @staticmethod
+    async def _crawl_website(url):
+        """Crawl the website once for the whole team; agents see the result in their prompt"""
+        try:
+            return await asyncio.to_thread(CachedCrawl4aiTools(max_length=_CRAWL_MAX_LENGTH).web_crawler, url)
+        except Exception as e:
+            logger.warning("Error crawling %s: %s", url, e)
+            return None
+
+    def _review_prompt(self, url, page=None):
         """
+        Build the review brief for a website.
+
+        The crawled page follows the URL in its own cached block, since every model call
+        of every team member in a review resends it.
+        """
+        dynamic_prompt = f"Website to review: {url}"
+        prompt = cached_prompt(self.REVIEW_PREFIX, dynamic_prompt)
+        if page:
+            prompt.append(cached_text_block(f"<website_content>\n{page}\n</website_content>"))
+        return prompt
+
+    def _cached_review(self, url, force_refresh=False):
+        if not settings.MARKETING_REVIEW_CACHE_ENABLED or force_refresh:
+            return None
+        cached = _REVIEW_CACHE.get(self.REVIEW_CACHE_KEY, url, strategy="exact-match")
+        if cached is not None:
+            logger.info("Returning cached marketing website review for URL: %s", url)
+        return cached
+
+    def _cache_review(self, url, content, failed):
+        # Reviews with failed sections are returned but not cached, so the next run retries them
+        if settings.MARKETING_REVIEW_CACHE_ENABLED and not failed:
+            _REVIEW_CACHE.set(self.REVIEW_CACHE_KEY, url, content)
+
+    async def review_marketing_website_async(self, url, force_refresh=False):
+        logger.info("Starting marketing website review for URL: %s", url)
+        cached = self._cached_review(url, force_refresh)
+        if cached is not None:
+            return cached
 
         try:
-            print(f"Running marketing website team for URL: {url}")
-            print(self.marketing_website_team)
-            response_stream : Iterator[RunResponse] = self.marketing_website_team.run(prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            pprint_run_response(response, markdown=True)
-            print("Marketing website team completed successfully.")
-            return content
+            content, failed = await self._review(url)
+            logger.info("Marketing website team completed successfully.")
         except Exception as e:
-            print(f"Error running marketing website team: {e}")
+            logger.exception("Error running marketing website team")
             return f"# Error: {e}"
 
+        self._cache_review(url, content, failed)
+        return content
+
+    def review_marketing_website(self, url, force_refresh=False):
+        return self._run_async(self.review_marketing_website_async(url, force_refresh=force_refresh))
+
+    def review_marketing_website_stream(self, url, force_refresh=False) -> Iterator[str]:
+        """
+        Yield the review section by section as each stage of the team finishes.
+
+        Sections are separated exactly as in review_marketing_website, so the joined
+        chunks equal the non-streamed report.
+        """
+        logger.info("Streaming marketing website review for URL: %s", url)
+        cached = self._cached_review(url, force_refresh)
+        if cached is not None:
+            yield cached
+            return
+
+        failed = []
+        sections = []
+        loop = self._thread_loop()
+        stream = self._review_sections(url, failed)
+        try:
+            while True:
+                try:
+                    section = loop.run_until_complete(stream.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield f"\n\n{section}" if sections else section
+                sections.append(section)
+        except Exception as e:
+            logger.exception("Error streaming marketing website review")
+            yield f"# Error: {e}"
+            return
+        finally:
+            loop.run_until_complete(stream.aclose())
+
+        self._cache_review(url, "\n\n".join(sections), failed)
+
 
     
-    def run_marketing_agent(self, url: str) -> str:
-        return self.review_marketing_website(url)
+    def run_marketing_agent(self, url: str, force_refresh: bool = False) -> str:
+        return self.review_marketing_website(url, force_refresh=force_refresh)
     
     def get_response(self, url: str) -> str:
-        print(f"Getting response for URL: {url}")
-        response = self.run_marketing_agent(url)
-        print("Response received successfully.")
-        return response
+        return self.run_marketing_agent(url)
+
+    def get_response_stream(self, url: str) -> Iterator[str]:
+        return self.review_marketing_website_stream(url)
@@ -2,20 +2,220 @@
 Medication Interaction Agent - Fixed Implementation for Gemini
 """
 
-from typing import Iterator
+import asyncio
+import copy
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Iterator, List, Optional, Tuple
 from agno.agent import Agent, RunResponse
-from agno.models.google import Gemini
-from agno.storage.sqlite import SqliteStorage
 from agno.tools.reasoning import ReasoningTools
-from app.agents.base_agent import BaseAgent
+from app.agents.base_agent import BaseAgent, safe_call
+from app.agents.pooled_gemini import PooledGemini
+from app.agents.semantic_cache import SemanticCache, normalize_text
 from app.core import settings
+from app.db.agent_storage import WalSqliteStorage
 from app.tools.duckduckgo_search import FreeDrugSearchTool
+from app.tools.result_cache import ToolResultCache
+from google import genai
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+_TEAM_WORKFLOW = [
+    "You are a comprehensive medication interaction analysis team.",
+    "Work together to analyze drug combinations for safety.",
+    "Follow this workflow:",
+    "1. Drug Parser: Standardize and validate medications",
+    "2. Interaction Detector: Analyze drug pairs for interactions",
+    "3. Patient Context: Apply patient-specific factors",
+    "4. Alert Generator: Create appropriate alerts and recommendations",
+]
+
+_SAFETY_AND_REPORT_FORMAT = [
+    "Safety Priorities:",
+    "- Patient safety is the absolute top priority",
+    "- When in doubt, err on the side of caution",
+    "- Always recommend professional consultation for complex cases",
+    "",
+    "Format output as a comprehensive report with:",
+    "1. Executive Summary with key findings",
+    "2. Drug Analysis with standardized names",
+    "3. Interaction Assessment with severity levels",
+    "4. Patient-Specific Considerations",
+    "5. Recommendations and Alternatives",
+    "6. Monitoring Plan",
+    "7. Emergency Guidance when applicable",
+]
+
+# Batch jobs make one model call per case, so the system instruction is the team brief without tool guidance
+BATCH_MODEL = "gemini-2.0-flash"
+BATCH_POLL_INTERVAL = 30
+_BATCH_SYSTEM_INSTRUCTION = "\n".join([*_TEAM_WORKFLOW, "", *_SAFETY_AND_REPORT_FORMAT])
+_BATCH_FINAL_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_PARTIALLY_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+
+# The parser standardizes the drug list first; the interaction and patient reviews both build
+# on it but not on each other, so they run concurrently before the alert generator reports
+_PARSE_STAGE = ("drug_parser",)
+_REVIEW_STAGE = ("interaction_detector", "patient_context")
+_REPORT_MEMBER = "alert_generator"
+
+# Drug lookups run concurrently, so more candidates can be searched without adding latency
+MAX_DRUG_SEARCHES = 5
+DRUG_SEARCH_TIMEOUT = 20
+SEARCH_SUMMARY_MODEL = "gemini-2.0-flash-lite"
+_DRUG_SEARCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="drug-search")
+
+# Common drugs come up in request after request, so search results are kept for a day
+DRUG_SEARCH_TTL = 24 * 3600
+_DRUG_SEARCHES = ToolResultCache(ttl=DRUG_SEARCH_TTL, maxsize=1024)
+
+
+def clear_drug_search_cache() -> None:
+    _DRUG_SEARCHES.clear()
+
+
+def _has_drug_findings(result: str) -> bool:
+    """Whether a search_drug_info report found anything; failed searches are retried next time"""
+    return "\n## " in result
+
+
+# Words of five or more letters that are not common request vocabulary may be drug names
+_DRUG_CANDIDATE_RE = re.compile(r"\b[A-Za-z]{5,}\b")
+_COMMON_WORDS = frozenset({"patient", "taking", "medication", "drug", "interaction", "check", "analysis"})
+
+
+def _drug_candidates(prompt: str, limit: Optional[int] = None) -> List[str]:
+    """Words in prompt that might be drug names, in order of first appearance; the scan stops after limit"""
+    candidates = {}
+    for match in _DRUG_CANDIDATE_RE.finditer(prompt):
+        word = match.group()
+        if word.lower() not in _COMMON_WORDS:
+            candidates.setdefault(word.lower(), word)
+            if len(candidates) == limit:
+                break
+    return list(candidates.values())
+
+
+# Searches are the slow part of a request, so only candidates that look like drug names are
+# looked up: a common drug-class suffix, or a frequently prescribed drug or brand without one
+_DRUG_SUFFIX_RE = re.compile(
+    r"(?:olol|pril|sartan|mab|tinib|pam|zolam|statin|cillin|mycin|cycline|azole|vir|caine|dine|dipine|"
+    r"parin|floxacin|oxetine|pramine|triptan|gliptin|gliflozin|glutide|profen|coxib|lukast|"
+    r"semide|thiazide|dronate|terol|sone|olone)$",
+    re.IGNORECASE,
+)
+_KNOWN_DRUGS = frozenset({
+    "acetaminophen", "allopurinol", "amiodarone", "aspirin", "carbamazepine", "citalopram", "clopidogrel",
+    "codeine", "cyclosporine", "digoxin", "fentanyl", "gabapentin", "insulin", "levothyroxine", "lithium",
+    "metformin", "methadone", "methotrexate", "morphine", "naproxen", "oxycodone", "paracetamol",
+    "phenytoin", "rifampin", "sertraline", "sildenafil", "spironolactone", "tacrolimus", "tramadol",
+    "valproate", "warfarin", "zolpidem",
+})
+_KNOWN_BRANDS = frozenset({
+    "abilify", "adderall", "advil", "aleve", "allegra", "ambien", "ativan", "benadryl", "celebrex", "celexa",
+    "cialis", "claritin", "coumadin", "crestor", "cymbalta", "depakote", "dilantin", "effexor", "eliquis",
+    "glucophage", "humira", "januvia", "jardiance", "keppra", "klonopin", "lamictal", "lantus", "lasix",
+    "lexapro", "lipitor", "lyrica", "motrin", "neurontin", "nexium", "norvasc", "ozempic", "paxil", "percocet",
+    "plavix", "prilosec", "prozac", "ritalin", "seroquel", "singulair", "synthroid", "tegretol", "topamax",
+    "tylenol", "valium", "viagra", "vicodin", "wellbutrin", "xanax", "xarelto", "zoloft", "zyrtec",
+})
+
+
+def _looks_like_drug(word: str) -> bool:
+    word_lower = word.lower()
+    return word_lower in _KNOWN_DRUGS or word_lower in _KNOWN_BRANDS or _DRUG_SUFFIX_RE.search(word) is not None
+
+
+def _search_candidates(prompt: str) -> List[str]:
+    """Drug candidates in prompt worth searching for, at most MAX_DRUG_SEARCHES"""
+    return [word for word in _drug_candidates(prompt) if _looks_like_drug(word)][:MAX_DRUG_SEARCHES]
+
+_UNSET = object()
+_drug_search_tool = _UNSET
+_drug_search_tool_lock = threading.Lock()
+
+
+def _shared_drug_search_tool() -> Optional[FreeDrugSearchTool]:
+    """The FreeDrugSearchTool shared by every agent, built on first search so idle workers skip it"""
+    global _drug_search_tool
+    if _drug_search_tool is _UNSET:
+        with _drug_search_tool_lock:
+            if _drug_search_tool is _UNSET:
+                try:
+                    _drug_search_tool = FreeDrugSearchTool(max_results=5)
+                except Exception as e:
+                    logger.warning(f"Search tool initialization failed: {e}. Search will be disabled.")
+                    _drug_search_tool = None
+    return _drug_search_tool
+
+
+# Interaction analysis needs a pair of drugs, so empty and one-word requests skip the team. Anything
+# longer goes to the drug parser: abbreviations like "MAOI" or "ASA" are too short for _drug_candidates
+MIN_REQUEST_WORDS = 2
+_WORD_RE = re.compile(r"\w+")
+NOT_ENOUGH_DRUGS_REPORT = (
+    "# Medication Interaction Analysis\n\n"
+    "Please provide at least two medications to analyze interactions, "
+    "for example: \"warfarin 5mg daily and aspirin 81mg daily\"."
+)
+
+
+def _too_few_drugs(prompt: str) -> bool:
+    return len(_WORD_RE.findall(prompt)) < MIN_REQUEST_WORDS
+
+
+def _error_report(error) -> str:
+    return f"# Error in Medication Analysis\n\n{str(error)}\n\nPlease try again or consult a healthcare professional."
+
+
+# Team prompt, filled per request with str.format_map. Every member receives it, so the
+# analyze() parameter contract for the reasoning tools is stated here once for the team
+_ANALYSIS_PROMPT_TEMPLATE = """
+        Please conduct a comprehensive medication interaction analysis.
+        
+        USER REQUEST:
+        {prompt}
+        
+        ENHANCED INFORMATION FROM SEARCH:
+        {enhanced_info}
+        
+        IMPORTANT FOR GEMINI: When using reasoning tools, remember:
+        - analyze() function requires: title, result, analysis, next_action, confidence
+        - The 'result' parameter is MANDATORY and must contain your actual findings
+        - Example: analyze(title="Interaction Found", result="Major warfarin-amiodarone interaction detected", analysis="Requires 30-50% dose reduction", next_action="continue", confidence=0.9)
+        
+        Please provide:
+        1. Drug identification and standardization
+        2. Comprehensive interaction analysis
+        3. Risk assessment and severity levels
+        4. Patient-specific considerations
+        5. Actionable recommendations and alternatives
+        6. Monitoring requirements
+        7. Emergency guidance if needed
+        
+        Focus on patient safety and provide clear, actionable guidance.
+        """
+
+# Finished reports keyed by the analysis brief and looked up by the normalized request
+_REPORT_CACHE = SemanticCache(
+    maxsize=256,
+    ttl=settings.MEDICATION_REPORT_CACHE_TTL_HOURS * 3600,
+    db_file=settings.SEMANTIC_CACHE_DB,
+    table="medication_interaction_cache",
+)
+_REPORT_CACHE_KEY = ("medication_interaction", _ANALYSIS_PROMPT_TEMPLATE)
+
+
 class MedicationInteractionAgent(BaseAgent):
     """Medication Interaction Agent with free search capabilities"""
     
@@ -26,20 +226,27 @@ class MedicationInteractionAgent(BaseAgent):
             logger.warning(f"Settings error: {e}. Using default storage.")
             self.AGENT_STORAGE = "./default_agent_storage.db"
         
-        try:
-            self.drug_search_tool = FreeDrugSearchTool(max_results=5)
-        except Exception as e:
-            logger.warning(f"Search tool initialization failed: {e}. Search will be disabled.")
-            self.drug_search_tool = None
+        self._drug_search_tool = _UNSET
         
-        self.medication_team = self._create_medication_interaction_team()
+        self.medication_team = self._shared_agent("medication_team", self._create_medication_interaction_team)
         logger.info("Medication Interaction Agent initialized successfully")
 
+    @property
+    def drug_search_tool(self):
+        """The drug search tool, shared process-wide and built on first use; None if unavailable"""
+        if self._drug_search_tool is _UNSET:
+            return _shared_drug_search_tool()
+        return self._drug_search_tool
+
+    @drug_search_tool.setter
+    def drug_search_tool(self, tool):
+        self._drug_search_tool = tool
+
     def create_drug_parser_agent(self):
         return Agent(
             name="Drug Parser & Standardization Agent",
             role="You are a pharmaceutical data specialist with search capabilities for drug identification",
-            model=Gemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
+            model=PooledGemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
             instructions=[
                 "Parse, standardize, and validate medication inputs",
                 "Standardize drug names to generic names when possible",
@@ -49,15 +256,9 @@ class MedicationInteractionAgent(BaseAgent):
                 "Always indicate confidence level and whether manual review is needed",
                 "Flag unknown substances for further investigation",
                 "Consider drug synonyms, brand names, and international names",
-                "",
-                "IMPORTANT: When using reasoning tools, follow these exact formats:",
-                "For analyze(): analyze(title='Analysis Title', result='The actual outcome or finding', analysis='Your analysis of the result', next_action='continue', confidence=0.8)",
-                "The 'result' parameter in analyze() is REQUIRED and must contain the actual finding or outcome.",
-                "Example: analyze(title='Drug Parsing Complete', result='Successfully identified 3 medications: warfarin, amiodarone, metoprolol', analysis='All drugs validated with high confidence', next_action='continue', confidence=0.9)",
             ],
             show_tool_calls=True,
-            tools=[ReasoningTools()],
-            stream=True,
+            stream=False,
             markdown=True,
         )
 
@@ -65,7 +266,7 @@ class MedicationInteractionAgent(BaseAgent):
         return Agent(
             name="Interaction Detection & Risk Assessment Agent",
             role="You are a clinical pharmacologist specializing in drug interaction analysis",
-            model=Gemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
+            model=PooledGemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
             instructions=[
                 "Analyze drug combinations for potential interactions",
                 "Assess interaction severity: contraindicated, major, moderate, minor, or none",
@@ -74,14 +275,10 @@ class MedicationInteractionAgent(BaseAgent):
                 "Determine onset timing and monitoring requirements",
                 "Provide clear clinical explanations for each interaction",
                 "Include contraindications and special warnings",
-                "",
-                "CRITICAL: Always include the 'result' parameter when using analyze():",
-                "analyze(title='Interaction Assessment', result='Found major interaction between warfarin and amiodarone', analysis='CYP3A4 inhibition increases bleeding risk', next_action='continue', confidence=0.9)",
-                "The result parameter must contain your specific findings, not just analysis.",
             ],
             show_tool_calls=True,
             tools=[ReasoningTools()],
-            stream=True,
+            stream=False,
             markdown=True,
         )
 
@@ -89,7 +286,7 @@ class MedicationInteractionAgent(BaseAgent):
         return Agent(
             name="Patient Context & Personalization Agent", 
             role="You are a clinical pharmacist specializing in personalized medication therapy",
-            model=Gemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
+            model=PooledGemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
             instructions=[
                 "Apply patient-specific factors to modify drug interaction risks",
                 "Consider age, weight, and gender considerations",
@@ -97,13 +294,9 @@ class MedicationInteractionAgent(BaseAgent):
                 "Consider comorbidities and their impact on drug safety",
                 "Apply age-specific considerations (pediatric, geriatric)",
                 "Recommend additional monitoring based on patient profile",
-                "",
-                "MANDATORY: When using analyze(), always provide the 'result' parameter:",
-                "Format: analyze(title='Patient Risk Assessment', result='Elderly patient with CKD increases bleeding risk by 40%', analysis='Requires dose reduction due to age and kidney function', next_action='continue', confidence=0.8)",
             ],
             show_tool_calls=True,
-            tools=[ReasoningTools()],
-            stream=True,
+            stream=False,
             markdown=True,
         )
 
@@ -111,7 +304,7 @@ class MedicationInteractionAgent(BaseAgent):
         return Agent(
             name="Alert Generation & Recommendation Agent",
             role="You are a clinical communication specialist creating medication safety alerts",
-            model=Gemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
+            model=PooledGemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
             instructions=[
                 "Generate actionable medication safety alerts with appropriate urgency",
                 "Suggest specific alternative medications when interactions are problematic",
@@ -120,143 +313,283 @@ class MedicationInteractionAgent(BaseAgent):
                 "Include clear explanations of WHY interactions matter clinically",
                 "Provide specific, actionable next steps for each alert level",
                 "",
-                "ESSENTIAL: Always include 'result' parameter in analyze() calls:",
-                "Example: analyze(title='Alert Generation', result='Created CRITICAL alert for warfarin-amiodarone interaction with dose reduction recommendations', analysis='Alert clearly communicates immediate actions needed', next_action='final_answer', confidence=0.95)",
+                "You write the team's final report from the other specialists' reports.",
+                *_SAFETY_AND_REPORT_FORMAT,
             ],
             show_tool_calls=True,
-            tools=[ReasoningTools()],
-            stream=True,
+            storage=WalSqliteStorage(table_name="medication_interaction_team", db_file=self.AGENT_STORAGE),
+            stream=False,
             markdown=True,
         )
 
     def _create_medication_interaction_team(self):
-        return Agent(
-            name="Medication Interaction Analysis Team",
-            team=[
-                self.create_drug_parser_agent(),
-                self.create_interaction_detector_agent(), 
-                self.create_patient_context_agent(),
-                self.create_alert_generator_agent()
-            ],
-            model=Gemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
-            instructions=[
-                "You are a comprehensive medication interaction analysis team.",
-                "Work together to analyze drug combinations for safety.",
-                "Follow this workflow:",
-                "1. Drug Parser: Standardize and validate medications",
-                "2. Interaction Detector: Analyze drug pairs for interactions",
-                "3. Patient Context: Apply patient-specific factors",
-                "4. Alert Generator: Create appropriate alerts and recommendations",
-                "",
-                "CRITICAL GEMINI GUIDANCE FOR REASONING TOOLS:",
-                "When ANY team member uses the analyze() function, you MUST include ALL required parameters:",
-                "- title: A descriptive title for the analysis step",
-                "- result: The ACTUAL outcome, finding, or data from your work (REQUIRED)",
-                "- analysis: Your interpretation or evaluation of the result",
-                "- next_action: Either 'continue', 'validate', or 'final_answer'",
-                "- confidence: A number between 0.0 and 1.0",
-                "",
-                "WRONG: analyze(title='Drug Analysis', analysis='Found interactions', next_action='continue')",
-                "CORRECT: analyze(title='Drug Analysis', result='Identified 2 major interactions: warfarin-amiodarone and simvastatin-gemfibrozil', analysis='Both require immediate attention and dose adjustments', next_action='continue', confidence=0.9)",
-                "",
-                "Safety Priorities:",
-                "- Patient safety is the absolute top priority",
-                "- When in doubt, err on the side of caution",
-                "- Always recommend professional consultation for complex cases",
-                "",
-                "Format output as a comprehensive report with:",
-                "1. Executive Summary with key findings",
-                "2. Drug Analysis with standardized names",
-                "3. Interaction Assessment with severity levels", 
-                "4. Patient-Specific Considerations",
-                "5. Recommendations and Alternatives",
-                "6. Monitoring Plan",
-                "7. Emergency Guidance when applicable",
-            ],
-            show_tool_calls=True,
-            markdown=True,
-            storage=SqliteStorage(table_name="medication_interaction_team", db_file=self.AGENT_STORAGE),
-            stream=True,
-        )
+        return {
+            "drug_parser": self.create_drug_parser_agent(),
+            "interaction_detector": self.create_interaction_detector_agent(),
+            "patient_context": self.create_patient_context_agent(),
+            "alert_generator": self.create_alert_generator_agent(),
+        }
 
     def get_response(self, url: str) -> str:
         """Main interface method for medication interaction analysis"""
         # Note: 'url' parameter name kept for BaseAgent compatibility
         # but we treat it as a general prompt for medication analysis
-        prompt = url  # Rename for clarity
-        logger.info(f"Processing medication request: {prompt[:100]}...")
-        
-        # Enhance with search results if needed
-        enhanced_info = self._enhance_with_search(prompt)
-        
-        # Create comprehensive prompt with specific Gemini guidance
-        analysis_prompt = f"""
-        Please conduct a comprehensive medication interaction analysis.
-        
-        USER REQUEST:
-        {prompt}
-        
-        ENHANCED INFORMATION FROM SEARCH:
-        {enhanced_info}
-        
-        IMPORTANT FOR GEMINI: When using reasoning tools, remember:
-        - analyze() function requires: title, result, analysis, next_action, confidence
-        - The 'result' parameter is MANDATORY and must contain your actual findings
-        - Example: analyze(title="Interaction Found", result="Major warfarin-amiodarone interaction detected", analysis="Requires 30-50% dose reduction", next_action="continue", confidence=0.9)
-        
-        Please provide:
-        1. Drug identification and standardization
-        2. Comprehensive interaction analysis
-        3. Risk assessment and severity levels
-        4. Patient-specific considerations
-        5. Actionable recommendations and alternatives
-        6. Monitoring requirements
-        7. Emergency guidance if needed
-        
-        Focus on patient safety and provide clear, actionable guidance.
+        return self._run_async(self.get_response_async(url))
+
+    async def get_response_async(self, prompt: str) -> str:
+        """Analyze one medication request with the team, returning the final report"""
+        if _too_few_drugs(prompt):
+            logger.info("Skipping medication analysis: fewer than two possible drugs in request")
+            return NOT_ENOUGH_DRUGS_REPORT
+        request = normalize_text(prompt)
+        if settings.MEDICATION_REPORT_CACHE_ENABLED:
+            cached = _REPORT_CACHE.get(_REPORT_CACHE_KEY, request, strategy="exact-match")
+            if cached is not None:
+                logger.info("Returning cached medication analysis")
+                return cached
+        analysis_prompt = await asyncio.to_thread(self._analysis_prompt, prompt)
+
+        try:
+            failed = []
+            content = await self._run_team(analysis_prompt, failed)
+
+            logger.info("Medication analysis completed successfully")
+        except Exception as e:
+            logger.error(f"Error in medication analysis: {e}")
+            return _error_report(e)
+
+        # Reports with failed sections are returned but not cached, so the next request retries them
+        if settings.MEDICATION_REPORT_CACHE_ENABLED and content and not failed:
+            _REPORT_CACHE.set(_REPORT_CACHE_KEY, request, content)
+        return content
+
+    def get_response_stream(self, prompt: str) -> Iterator[str]:
         """
+        Analyze one medication request like get_response_async, streaming the final report.
 
+        The parse and review stages still run to completion first; only the alert
+        generator's report is streamed, so callers can send it as it is written.
+        """
+        if _too_few_drugs(prompt):
+            logger.info("Skipping medication analysis: fewer than two possible drugs in request")
+            yield NOT_ENOUGH_DRUGS_REPORT
+            return
+        request = normalize_text(prompt)
+        if settings.MEDICATION_REPORT_CACHE_ENABLED:
+            cached = _REPORT_CACHE.get(_REPORT_CACHE_KEY, request, strategy="exact-match")
+            if cached is not None:
+                logger.info("Returning cached medication analysis")
+                yield cached
+                return
+
+        failed = []
+        parts = []
         try:
-            response_stream: Iterator[RunResponse] = self.medication_team.run(analysis_prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            
+            report_prompt = self._run_async(self._report_prompt(self._analysis_prompt(prompt), failed))
+            report_member = self.medication_team[_REPORT_MEMBER]
+            for content in self._stream_content(report_member.run(report_prompt, stream=True)):
+                parts.append(content)
+                yield content
+
             logger.info("Medication analysis completed successfully")
-            return content
         except Exception as e:
             logger.error(f"Error in medication analysis: {e}")
-            return f"# Error in Medication Analysis\n\n{str(e)}\n\nPlease try again or consult a healthcare professional."
+            yield _error_report(e)
+            return
+
+        if settings.MEDICATION_REPORT_CACHE_ENABLED and parts and not failed:
+            _REPORT_CACHE.set(_REPORT_CACHE_KEY, request, "".join(parts))
+
+    async def _run_team(self, analysis_prompt: str, failed: List[str]) -> str:
+        """
+        Run the team in dependency order and return the alert generator's report.
+
+        The drug parser goes first, the interaction detector and patient context agent then
+        run concurrently on its drug list, and the alert generator writes the final report
+        from all three. A failing reviewer leaves a note in place of its report instead of
+        aborting the analysis, and its name is appended to failed.
+        """
+        report_prompt = await self._report_prompt(analysis_prompt, failed)
+        return await self._arun_member(self.medication_team[_REPORT_MEMBER], report_prompt)
+
+    async def _report_prompt(self, analysis_prompt: str, failed: List[str]) -> str:
+        """Run the parse and review stages, returning the alert generator's prompt with their reports"""
+        reports = await self._run_stage(analysis_prompt, _PARSE_STAGE, failed)
+        reports += await self._run_stage(self._with_reports(analysis_prompt, reports), _REVIEW_STAGE, failed)
+        return self._with_reports(analysis_prompt, reports)
+
+    async def _run_stage(self, prompt: str, names, failed: List[str]) -> List[Tuple[str, str]]:
+        """Run the named team members concurrently on the same prompt, returning (name, report) pairs"""
+        agents = [self.medication_team[name] for name in names]
+        results = await asyncio.gather(*(self._arun_member(agent, prompt) for agent in agents), return_exceptions=True)
+        reports = []
+        for agent, result in zip(agents, results):
+            if isinstance(result, BaseException):
+                logger.error("Error running %s: %s", agent.name, result)
+                failed.append(agent.name)
+                result = f"_{agent.name} failed: {result}_"
+            reports.append((agent.name, result))
+        return reports
 
+    async def _arun_member(self, agent: Agent, prompt: str) -> str:
+        """Run one team member, retrying a run that outlasts settings.LLM_REQUEST_TIMEOUT"""
+        return await self._arun_content_with_timeout(agent, prompt, settings.LLM_REQUEST_TIMEOUT, settings.LLM_MAX_RETRIES)
+
+    @staticmethod
+    def _with_reports(prompt: str, reports: List[Tuple[str, str]]) -> str:
+        """Extend the analysis prompt with the reports of the earlier stages"""
+        sections = "\n\n".join(f'<report agent="{name}">\n{content}\n</report>' for name, content in reports)
+        return f"{prompt}\n\nReports from the team so far:\n{sections}"
+
+    async def get_responses_batch(self, prompts: List[str], batch: bool = False, concurrency: Optional[int] = None) -> List[str]:
+        """
+        Analyze several independent medication requests, returning one report per prompt.
+
+        By default each prompt goes through get_response_async, with up to concurrency
+        (settings.MEDICATION_BATCH_CONCURRENCY) requests analyzed at once. With batch=True the
+        prompts are submitted as one Gemini batch job instead: cheaper for bulk sweeps, but each
+        case is a single model call without the team's tools, and results can take hours.
+        """
+        if not batch:
+            return await self._analyze_concurrently(prompts, concurrency or settings.MEDICATION_BATCH_CONCURRENCY)
+
+        responses = [NOT_ENOUGH_DRUGS_REPORT if _too_few_drugs(prompt) else None for prompt in prompts]
+        pending = [index for index, response in enumerate(responses) if response is None]
+        if not pending:
+            return responses
+
+        analysis_prompts = await asyncio.to_thread(lambda: [self._analysis_prompt(prompts[index]) for index in pending])
+        try:
+            results = await self._run_batch(analysis_prompts)
+        except Exception as e:
+            logger.error(f"Error in batch medication analysis: {e}")
+            results = [_error_report(e)] * len(pending)
+        for index, result in zip(pending, results):
+            responses[index] = result
+        return responses
+
+    async def _analyze_concurrently(self, prompts: List[str], concurrency: int) -> List[str]:
+        """
+        Run get_response_async on each prompt, at most concurrency at a time.
+
+        Team members keep per-run state, so concurrent requests cannot share a team: each
+        request borrows a whole team from a pool of concurrency teams, this agent's own first.
+        """
+        teams = asyncio.Queue()
+        teams.put_nowait(self)
+        for _ in range(min(concurrency, len(prompts)) - 1):
+            worker = copy.copy(self)
+            worker.medication_team = self._create_medication_interaction_team()
+            teams.put_nowait(worker)
+
+        async def analyze(prompt):
+            worker = await teams.get()
+            try:
+                return await worker.get_response_async(prompt)
+            finally:
+                teams.put_nowait(worker)
+
+        return list(await asyncio.gather(*(analyze(prompt) for prompt in prompts)))
+
+    @staticmethod
+    async def _run_batch(analysis_prompts: List[str]) -> List[str]:
+        """Submit the prompts as a Gemini batch job and wait for its inlined responses"""
+        client = genai.Client(api_key=settings.GOOGLE_API_KEY)
+        job = await client.aio.batches.create(
+            model=BATCH_MODEL,
+            src=[
+                {
+                    "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+                    "config": {"system_instruction": _BATCH_SYSTEM_INSTRUCTION},
+                }
+                for prompt in analysis_prompts
+            ],
+            config={"display_name": "medication-interaction-batch"},
+        )
+        logger.info(f"Submitted medication batch {job.name} with {len(analysis_prompts)} requests")
+        while job.state.name not in _BATCH_FINAL_STATES:
+            await asyncio.sleep(BATCH_POLL_INTERVAL)
+            job = await client.aio.batches.get(name=job.name)
+
+        if job.state.name not in ("JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED"):
+            raise RuntimeError(f"Batch {job.name} ended with {job.state.name}: {job.error}")
+        results = []
+        for inlined in job.dest.inlined_responses:
+            if inlined.error is not None or inlined.response is None:
+                results.append(_error_report(inlined.error))
+            else:
+                results.append(inlined.response.text or "")
+        return results
+
+    def _analysis_prompt(self, prompt: str) -> str:
+        """Build the team prompt for a medication request, enhanced with drug search results"""
+        logger.info("Processing medication request: %s...", prompt[:100])
+        
+        # Enhance with search results if needed
+        enhanced_info = self._enhance_with_search(prompt)
+        
+        return _ANALYSIS_PROMPT_TEMPLATE.format_map({"prompt": prompt, "enhanced_info": enhanced_info})
+
+    @safe_call(default="Search enhancement unavailable.")
     def _enhance_with_search(self, prompt: str) -> str:
         """Enhance prompt with search results for unknown drugs"""
         if self.drug_search_tool is None:
             return "Search enhancement unavailable (search tool not initialized)."
-            
+
+        drugs = _search_candidates(prompt)
+
+        # Searches are blocking HTTP round-trips, so run them side by side
+        if drugs:
+            logger.info(f"Searching for drug information: {', '.join(drugs)}")
+        search_tool = self.drug_search_tool
+        futures = {_DRUG_SEARCH_POOL.submit(self._lookup_drug, search_tool, drug): drug for drug in drugs}
+        found = {}
         try:
-            # Extract potential drug names from prompt
-            words = prompt.split()
-            drug_candidates = [word for word in words if len(word) > 3 and word.isalpha()]
-            
-            search_results = []
-            for drug in drug_candidates[:2]:  # Limit to 2 searches to avoid rate limiting
-                if self._might_be_drug(drug):
-                    logger.info(f"Searching for drug information: {drug}")
-                    result = self.drug_search_tool.search_drug_info(drug)
-                    search_results.append(f"Search for '{drug}': {result[:300]}...")
-            
-            return "\n".join(search_results) if search_results else "No additional search performed."
-            
-        except Exception as e:
-            logger.warning(f"Search enhancement failed: {e}")
-            return "Search enhancement unavailable."
-
-    def _might_be_drug(self, word: str) -> bool:
-        """Simple heuristic to determine if a word might be a drug name"""
-        # Skip common words
-        common_words = {'patient', 'taking', 'medication', 'drug', 'interaction', 'check', 'analysis'}
-        if word.lower() in common_words:
-            return False
-        
-        # Consider words that might be drug names
-        return len(word) > 4 and word.isalpha()
+            for future in as_completed(futures, timeout=DRUG_SEARCH_TIMEOUT):
+                drug = futures[future]
+                try:
+                    found[drug] = future.result()
+                except Exception as e:
+                    logger.warning(f"Drug search failed for {drug}: {e}")
+        except FuturesTimeoutError:
+            logger.warning(f"Drug search timed out for: {', '.join(d for d in drugs if d not in found)}")
+
+        search_results = [f"Search for '{drug}': {found[drug]}" for drug in drugs if drug in found]
+        return "\n".join(search_results) if search_results else "No additional search performed."
+
+    @classmethod
+    def _lookup_drug(cls, search_tool, drug: str) -> str:
+        """
+        Search for a drug and return what the team should see of the result.
+
+        With MEDICATION_SEARCH_SUMMARIES the raw result is condensed by a small, cheap model,
+        so the team reads a short summary instead of a blind 300-character cut.
+        """
+        result = _DRUG_SEARCHES.get_or_call(
+            drug.lower(), lambda: search_tool.search_drug_info(drug), cacheable=_has_drug_findings
+        )
+        if settings.MEDICATION_SEARCH_SUMMARIES:
+            summary = cls._summarize_drug_result(drug, result)
+            if summary:
+                return summary
+        return f"{result[:300]}..."
+
+    @classmethod
+    @safe_call(default=None)
+    def _summarize_drug_result(cls, drug: str, result: str) -> Optional[str]:
+        """Condense a drug search result with the search summarizer; None if it has nothing to say"""
+        summarizer = cls._shared_agent("search_summarizer", cls._create_search_summarizer)
+        response: RunResponse = summarizer.run(f"Drug: {drug}\n\n{result}", stream=False)
+        return response.content.strip() if response.content else None
+
+    @staticmethod
+    def _create_search_summarizer():
+        return Agent(
+            name="Drug Search Summarizer",
+            model=PooledGemini(id=SEARCH_SUMMARY_MODEL, api_key=settings.GOOGLE_API_KEY, max_output_tokens=400),
+            instructions=[
+                "Summarize the key pharmacology facts about the drug from the search results below",
+                "Cover drug class, main uses, metabolism pathways and known interactions or warnings",
+                "Use at most five short bullet points and only state facts found in the results",
+            ],
+        )
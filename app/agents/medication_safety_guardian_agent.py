@@ -1,28 +1,75 @@
-from typing import Iterator
-from agno.agent import Agent, RunResponse
-from agno.models.anthropic import Claude
-from agno.storage.sqlite import SqliteStorage
+from agno.agent import Agent
 from agno.tools.googlesearch import GoogleSearchTools
 from agno.tools.reasoning import ReasoningTools
 from app.agents.base_agent import BaseAgent
+from app.agents.pooled_gemini import PooledGemini
+from app.agents.semantic_cache import SemanticCache, normalize_text
 from app.core import settings
-from agno.utils.pprint import pprint_run_response
-from agno.models.google import Gemini
-import os
+from app.db.agent_storage import WalSqliteStorage
+import logging
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+# Team prompt, filled per request with str.format_map
+_SAFETY_REVIEW_TEMPLATE = """
+        Please conduct a complete medication safety review and analysis for this patient case.
+        The goal is to ensure patient safety and optimal therapeutic outcomes through comprehensive assessment.
+        
+        PATIENT CASE:
+        {patient_case}
+        
+        Follow this comprehensive process:
+        1. FDA Recall Monitor: Check all medications against current FDA recalls and safety alerts
+        2. Drug Interaction Analyzer: Evaluate all potential drug-drug, drug-food, and drug-disease interactions
+        3. Therapeutic Alternative Specialist: Identify any problematic medications and suggest alternatives
+        4. Clinical Safety Analyst: Perform overall patient safety risk assessment
+        5. Patient Monitoring Specialist: Design monitoring protocols and follow-up plans
+        
+        For each area, provide:
+        - Current safety status assessment
+        - Specific safety concerns identified
+        - Evidence-based recommendations with urgency levels
+        - Monitoring requirements and timelines
+        - Patient and provider communication guidance
+        
+        Create a comprehensive medication safety report with:
+        - Executive summary with key safety alerts
+        - Detailed analysis from each specialist
+        - Prioritized action items with timelines
+        - Monitoring and follow-up protocols
+        - Patient education recommendations
+        - Provider notification requirements
+        
+        Use urgency indicators throughout:
+        CRITICAL - Immediate action required (within 2 hours)
+        CAUTION - Action needed within 24 hours
+        ROUTINE - Include in routine care and monitoring
+        
+        Provide a comprehensive safety assessment with all findings and actionable recommendations.
+        """
+
+# Finished reviews keyed by the review brief and looked up by the normalized patient case
+_REVIEW_CACHE = SemanticCache(
+    maxsize=256,
+    ttl=settings.MEDICATION_REPORT_CACHE_TTL_HOURS * 3600,
+    db_file=settings.SEMANTIC_CACHE_DB,
+    table="medication_safety_cache",
+)
+_REVIEW_CACHE_KEY = ("review_medication_safety", _SAFETY_REVIEW_TEMPLATE)
 
 
 class MedicationSafetyGuardianAgent(BaseAgent):
     def __init__(self):
         self.AGENT_STORAGE = settings.AGENT_STORAGE
-        print(self.AGENT_STORAGE)
-        self.medication_safety_team = self._create_medication_safety_team()
+        self.medication_safety_team = self._shared_agent("medication_safety_team", self._create_medication_safety_team)
 
     # Factory methods for creating individual agents
     def create_recall_monitor_agent(self):
         return Agent(
             name="FDA Recall Monitor Agent",
             role="You are an expert FDA drug recall monitoring specialist focused on patient safety",
-            model=Gemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
+            model=PooledGemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
             instructions=[
                 "Monitor and analyze FDA drug recalls with clinical precision",
                 "Identify recall severity levels and patient impact immediately",
@@ -38,8 +85,8 @@ class MedicationSafetyGuardianAgent(BaseAgent):
                 "Format all output in markdown with urgency indicators",
             ],
             show_tool_calls=True,
-            tools=[ReasoningTools(add_instructions=True), GoogleSearchTools()],
-            stream=True,
+            tools=[GoogleSearchTools()],
+            stream=False,
             markdown=True,
         )
 
@@ -47,7 +94,7 @@ class MedicationSafetyGuardianAgent(BaseAgent):
         return Agent(
             name="Drug Interaction Analyzer Agent",
             role="You are a clinical pharmacology expert specializing in drug-drug interactions",
-            model=Gemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
+            model=PooledGemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
             instructions=[
                 "Analyze drug interactions with clinical precision and evidence-based assessment",
                 "Classify interactions by severity: Major (contraindicated), Moderate (caution), Minor (awareness)",
@@ -64,7 +111,7 @@ class MedicationSafetyGuardianAgent(BaseAgent):
             ],
             show_tool_calls=True,
             tools=[ReasoningTools(add_instructions=True), GoogleSearchTools()],
-            stream=True,
+            stream=False,
             markdown=True,
         )
 
@@ -72,7 +119,7 @@ class MedicationSafetyGuardianAgent(BaseAgent):
         return Agent(
             name="Therapeutic Alternative Specialist Agent",
             role="You are a clinical pharmacist expert in therapeutic alternatives and medication substitutions",
-            model=Gemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
+            model=PooledGemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
             instructions=[
                 "Identify safe and effective therapeutic alternatives for problematic medications",
                 "Consider bioequivalent, therapeutically equivalent, and pharmacologically similar options",
@@ -88,8 +135,8 @@ class MedicationSafetyGuardianAgent(BaseAgent):
                 "Format all output in markdown with prioritized recommendations",
             ],
             show_tool_calls=True,
-            tools=[ReasoningTools(add_instructions=True), GoogleSearchTools()],
-            stream=True,
+            tools=[GoogleSearchTools()],
+            stream=False,
             markdown=True,
         )
 
@@ -97,7 +144,7 @@ class MedicationSafetyGuardianAgent(BaseAgent):
         return Agent(
             name="Clinical Safety Analyst Agent",
             role="You are a clinical safety expert specializing in comprehensive medication risk assessment",
-            model=Gemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
+            model=PooledGemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
             instructions=[
                 "Perform comprehensive clinical safety assessments for medication regimens",
                 "Evaluate patient-specific risk factors: age, organ function, comorbidities",
@@ -114,7 +161,7 @@ class MedicationSafetyGuardianAgent(BaseAgent):
             ],
             show_tool_calls=True,
             tools=[ReasoningTools(add_instructions=True), GoogleSearchTools()],
-            stream=True,
+            stream=False,
             markdown=True,
         )
 
@@ -122,7 +169,7 @@ class MedicationSafetyGuardianAgent(BaseAgent):
         return Agent(
             name="Patient Monitoring Specialist Agent",
             role="You are a clinical monitoring expert specializing in patient safety during medication changes",
-            model=Gemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
+            model=PooledGemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
             instructions=[
                 "Design comprehensive monitoring protocols for medication transitions",
                 "Establish safety benchmarks and warning indicators",
@@ -138,8 +185,8 @@ class MedicationSafetyGuardianAgent(BaseAgent):
                 "Format all output in markdown with monitoring schedules",
             ],
             show_tool_calls=True,
-            tools=[ReasoningTools(add_instructions=True), GoogleSearchTools()],
-            stream=True,
+            tools=[GoogleSearchTools()],
+            stream=False,
             markdown=True,
         )
 
@@ -153,7 +200,7 @@ class MedicationSafetyGuardianAgent(BaseAgent):
                 self.create_clinical_safety_agent(),
                 self.create_patient_monitoring_agent()
             ],
-            model=Gemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
+            model=PooledGemini(id="gemini-2.0-flash", api_key=settings.GOOGLE_API_KEY),
             instructions=[
                 "You are a team of medication safety experts who work together to ensure patient safety and optimal therapeutic outcomes.",
                 "Given patient information and medication details, conduct a comprehensive safety review.",
@@ -174,69 +221,65 @@ class MedicationSafetyGuardianAgent(BaseAgent):
             ],
             show_tool_calls=True,
             markdown=True,
-            storage=SqliteStorage(table_name="medication_safety_team", db_file=self.AGENT_STORAGE),
+            storage=WalSqliteStorage(table_name="medication_safety_team", db_file=self.AGENT_STORAGE),
             stream=True,
         )
 
 
-    def review_medication_safety(self, patient_case):
+    async def review_medication_safety_async(self, patient_case):
         """
-        Main method to conduct comprehensive medication safety review (like review_marketing_website)
+        Main method to conduct comprehensive medication safety review (like review_marketing_website_async)
         """
-        print(f"Starting medication safety review for patient case")
+        logger.info("Starting medication safety review for patient case")
+        case = normalize_text(patient_case)
+        if settings.MEDICATION_REPORT_CACHE_ENABLED:
+            cached = _REVIEW_CACHE.get(_REVIEW_CACHE_KEY, case, strategy="exact-match")
+            if cached is not None:
+                logger.info("Returning cached medication safety review")
+                return cached
         
-        prompt = f"""
-        Please conduct a complete medication safety review and analysis for this patient case.
-        The goal is to ensure patient safety and optimal therapeutic outcomes through comprehensive assessment.
-        
-        PATIENT CASE:
-        {patient_case}
-        
-        Follow this comprehensive process:
-        1. FDA Recall Monitor: Check all medications against current FDA recalls and safety alerts
-        2. Drug Interaction Analyzer: Evaluate all potential drug-drug, drug-food, and drug-disease interactions
-        3. Therapeutic Alternative Specialist: Identify any problematic medications and suggest alternatives
-        4. Clinical Safety Analyst: Perform overall patient safety risk assessment
-        5. Patient Monitoring Specialist: Design monitoring protocols and follow-up plans
-        
-        For each area, provide:
-        - Current safety status assessment
-        - Specific safety concerns identified
-        - Evidence-based recommendations with urgency levels
-        - Monitoring requirements and timelines
-        - Patient and provider communication guidance
-        
-        Create a comprehensive medication safety report with:
-        - Executive summary with key safety alerts
-        - Detailed analysis from each specialist
-        - Prioritized action items with timelines
-        - Monitoring and follow-up protocols
-        - Patient education recommendations
-        - Provider notification requirements
-        
-        Use urgency indicators throughout:
-        CRITICAL - Immediate action required (within 2 hours)
-        CAUTION - Action needed within 24 hours
-        ROUTINE - Include in routine care and monitoring
-        
-        Provide a comprehensive safety assessment with all findings and actionable recommendations.
-        """
+        prompt = _SAFETY_REVIEW_TEMPLATE.format_map({"patient_case": patient_case})
 
         try:
-            print(f"Running medication safety team for patient case")
-            
-            print(self.medication_safety_team)
-            response_stream: Iterator[RunResponse] = self.medication_safety_team.run(prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            pprint_run_response(response, markdown=True)
-            print("Medication safety team review completed successfully.")
-            return content
+            content = await self._arun_content(self.medication_safety_team, prompt)
+            logger.info("Medication safety team review completed successfully.")
         except Exception as e:
-            print(f"Error running medication safety team: {e}")
+            logger.exception("Error running medication safety team")
             return f"# Error: {e}"
 
+        if settings.MEDICATION_REPORT_CACHE_ENABLED and content:
+            _REVIEW_CACHE.set(_REVIEW_CACHE_KEY, case, content)
+        return content
+
+    def review_medication_safety_stream(self, patient_case: str) -> Iterator[str]:
+        """
+        Review a patient case like review_medication_safety_async, yielding the report as the team writes it
+        """
+        case = normalize_text(patient_case)
+        if settings.MEDICATION_REPORT_CACHE_ENABLED:
+            cached = _REVIEW_CACHE.get(_REVIEW_CACHE_KEY, case, strategy="exact-match")
+            if cached is not None:
+                logger.info("Returning cached medication safety review")
+                yield cached
+                return
+
+        prompt = _SAFETY_REVIEW_TEMPLATE.format_map({"patient_case": patient_case})
+        parts = []
+        try:
+            for content in self._stream_content(self.medication_safety_team.run(prompt, stream=True)):
+                parts.append(content)
+                yield content
+        except Exception as e:
+            logger.exception("Error streaming medication safety team")
+            yield f"# Error: {e}"
+            return
+
+        if settings.MEDICATION_REPORT_CACHE_ENABLED and parts:
+            _REVIEW_CACHE.set(_REVIEW_CACHE_KEY, case, "".join(parts))
+
+    def review_medication_safety(self, patient_case):
+        return self._run_async(self.review_medication_safety_async(patient_case))
+
     def run_medication_safety_agent(self, patient_case: str) -> str:
         """
         Wrapper method (like run_marketing_agent)
@@ -249,3 +292,9 @@ class MedicationSafetyGuardianAgent(BaseAgent):
         """
         response = self.run_medication_safety_agent(patient_case)
         return response
+
+    def get_response_stream(self, patient_case: str) -> Iterator[str]:
+        """
+        Stream the safety review so callers can send it before the team finishes
+        """
+        yield from self.review_medication_safety_stream(patient_case)
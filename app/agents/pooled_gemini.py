@@ -0,0 +1,55 @@
+"""
+Gemini model that shares its google-genai client.
+
+agno's Gemini builds a genai.Client per model, and every client opens its own
+sync and async HTTP connection pools, so a team of five Gemini agents keeps
+five sets of connections to the API. PooledGemini models with the same API key
+share one HTTP/2 client per worker thread instead, so team members and the
+requests a thread handles reuse open TLS connections.
+
+Clients are shared per thread rather than process-wide because connections in
+the async pool belong to the event loop that opened them; BaseAgent._run_async
+keeps one event loop per worker thread for the same reason.
+
+Like CachedClaude, several tool calls requested in one turn run concurrently
+(see concurrent_tool_calls).
+"""
+
+import threading
+from os import getenv
+from typing import Optional
+
+from agno.models.google import Gemini
+from google import genai
+from google.genai import types
+
+from app.agents.concurrent_tool_calls import ConcurrentToolCalls
+
+HTTP_OPTIONS = types.HttpOptions(client_args={"http2": True}, async_client_args={"http2": True})
+
+_thread_clients = threading.local()
+
+
+def shared_genai_client(api_key: Optional[str]) -> genai.Client:
+    """The genai client shared by this thread's PooledGemini models using api_key"""
+    clients = getattr(_thread_clients, "clients", None)
+    if clients is None:
+        clients = _thread_clients.clients = {}
+    client = clients.get(api_key)
+    if client is None:
+        client = clients[api_key] = genai.Client(api_key=api_key, http_options=HTTP_OPTIONS)
+    return client
+
+
+class PooledGemini(ConcurrentToolCalls, Gemini):
+    """Gemini model that uses its thread's shared genai client for the Gemini Developer API"""
+
+    def get_client(self) -> genai.Client:
+        if self.client is None and not self.client_params and not self._uses_vertexai():
+            api_key = self.api_key or getenv("GOOGLE_API_KEY")
+            if api_key:
+                self.client = shared_genai_client(api_key)
+        return super().get_client()
+
+    def _uses_vertexai(self) -> bool:
+        return self.vertexai or getenv("GOOGLE_GENAI_USE_VERTEXAI", "false").lower() == "true"
@@ -0,0 +1,50 @@
+"""
+Keyword helpers for routing free-form prompts to agent methods.
+
+A prompt is tokenized once into a set of words and adjacent word pairs, so
+routers can test many keywords with set intersections instead of scanning
+the prompt once per keyword. Routers that match raw substrings (so "explain"
+also matches "explaining") compile their keywords into one pattern with
+keyword_pattern and collect every hit in a single pass with keyword_hits.
+"""
+
+import re
+from typing import FrozenSet, Iterable, Mapping, Pattern, TypeVar
+
+_TOKEN_RE = re.compile(r"[a-z_]+")
+SERIES_COUNT_RE = re.compile(r"\b([3-9]|10)[\s-]*(?:posts?|parts?|articles?|episodes?|installments?)\b", re.IGNORECASE)
+SERIES_LENGTH_RE = re.compile(r"\b([3-9]|10)\b")
+
+T = TypeVar("T")
+
+
+def prompt_terms(prompt: str) -> FrozenSet[str]:
+    """Lower-cased words of prompt plus "word word" pairs for multi-word keywords"""
+    tokens = _TOKEN_RE.findall(prompt.lower())
+    return frozenset(tokens).union(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+
+def keyword_pattern(keywords: Iterable[str]) -> Pattern[str]:
+    """Compile keywords into one lookahead alternation that finds overlapping substring matches"""
+    alternation = "|".join(map(re.escape, sorted(keywords, key=len, reverse=True)))
+    return re.compile(f"(?=({alternation}))")
+
+
+def keyword_hits(pattern: Pattern[str], prompt: str) -> FrozenSet[str]:
+    """Keywords of pattern that occur anywhere in the lower-cased prompt"""
+    return frozenset(pattern.findall(prompt.lower()))
+
+
+def first_match(terms: FrozenSet[str], keyword_map: Mapping[str, T], default: T) -> T:
+    """Value of the first keyword in keyword_map (in insertion order) present in terms"""
+    return next((value for keyword, value in keyword_map.items() if keyword in terms), default)
+
+
+def series_length(prompt: str, default: int = 5) -> int:
+    """
+    Series length between 3 and 10 mentioned in prompt, or default.
+
+    A count written as "N posts" or "N-part" wins over other numbers in the prompt.
+    """
+    match = SERIES_COUNT_RE.search(prompt) or SERIES_LENGTH_RE.search(prompt)
+    return int(match.group(1)) if match else default
@@ -0,0 +1,284 @@
+"""
+Semantic response cache for agent generations.
+
+Responses are stored against a hard lexical key (method name and the
+generation options) plus a lightweight local embedding of the user's text.
+A lookup returns a stored response when an entry with the same key has an
+embedding whose cosine similarity with the query is above the threshold,
+so paraphrased requests reuse an earlier generation instead of another
+model call.
+
+Entries can optionally be persisted to SQLite so the cache survives
+restarts; the in-memory index keeps one stacked embedding matrix per key,
+so a lookup is a single matrix-vector product over that key's entries.
+"""
+
+import functools
+from concurrent.futures import Future
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+EMBEDDING_DIM = 1024
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY,
+    key_hash TEXT NOT NULL,
+    text TEXT NOT NULL,
+    embedding BLOB NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    UNIQUE (key_hash, text)
+)
+"""
+
+
+def _feature_index(feature: str) -> Tuple[int, float]:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % EMBEDDING_DIM, 1.0 if value >> 63 else -1.0
+
+
+def embed_text(text: str) -> np.ndarray:
+    """Embed text as an L2-normalised signed hash of its unigrams and bigrams"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for feature in features:
+        index, sign = _feature_index(feature)
+        vector[index] += sign
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+    return vector
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text and collapse its whitespace, so trivially different requests share an exact-match entry"""
+    return " ".join(text.lower().split())
+
+
+def key_hash(key: Hashable) -> str:
+    """Stable identifier of a cache key, shared by memory and SQLite"""
+    return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+
+class SemanticCache:
+    """
+    Thread-safe LRU of (embedding, response) entries grouped by a lexical key.
+
+    Caches persisted to the same db_file must use different tables, since each
+    one loads and evicts every row of its table.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 512,
+        ttl: float = 3600,
+        threshold: float = 0.92,
+        db_file: Optional[str] = None,
+        table: str = "semantic_cache",
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[np.ndarray, str, float]]" = OrderedDict()
+        self._index: Dict[str, Tuple[List[Tuple[str, str]], np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._table = table
+        if db_file:
+            self._db = sqlite3.connect(db_file, check_same_thread=False)
+            self._db.execute(_SCHEMA.format(table=table))
+            self._load()
+
+    def _load(self) -> None:
+        rows = self._db.execute(
+            f"SELECT key_hash, text, embedding, response, created_at FROM {self._table} "
+            "WHERE created_at > ? ORDER BY created_at DESC LIMIT ?",
+            (time.time() - self.ttl, self.maxsize),
+        ).fetchall()
+        for khash, text, embedding, response, created_at in reversed(rows):
+            vector = np.frombuffer(embedding, dtype=np.float32)
+            self._entries[(khash, text)] = (vector, response, created_at + self.ttl)
+
+    def _drop(self, entry_key: Tuple[str, str]) -> None:
+        del self._entries[entry_key]
+        self._index.pop(entry_key[0], None)
+        if self._db is not None:
+            self._db.execute(f"DELETE FROM {self._table} WHERE key_hash = ? AND text = ?", entry_key)
+
+    def _key_index(self, khash: str) -> Optional[Tuple[List[Tuple[str, str]], np.ndarray, np.ndarray]]:
+        index = self._index.get(khash)
+        if index is None:
+            entry_keys = [entry_key for entry_key in self._entries if entry_key[0] == khash]
+            if not entry_keys:
+                return None
+            matrix = np.vstack([self._entries[entry_key][0] for entry_key in entry_keys])
+            expires = np.array([self._entries[entry_key][2] for entry_key in entry_keys])
+            index = self._index[khash] = (entry_keys, matrix, expires)
+        return index
+
+    def get(self, key: Hashable, text: str, strategy: str = "semantic") -> Optional[str]:
+        """
+        Return the closest cached response for text under key, if similar enough.
+
+        An exact (key, text) match is answered from a dict lookup before any
+        embedding is computed; strategy="exact-match" stops there.
+        """
+        khash = key_hash(key)
+        entry_key = (khash, text)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[2] > time.time():
+                self._entries.move_to_end(entry_key)
+                return entry[1]
+        if strategy == "exact-match":
+            return None
+
+        query = embed_text(text)
+        with self._lock:
+            index = self._key_index(khash)
+            if index is None:
+                return None
+
+            entry_keys, matrix, expires = index
+            expired = expires <= time.time()
+            if expired.any():
+                for position in np.flatnonzero(expired):
+                    self._drop(entry_keys[position])
+                if self._db is not None:
+                    self._db.commit()
+
+            scores = np.where(expired, -np.inf, matrix @ query)
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+
+            entry_key = entry_keys[best]
+            self._entries.move_to_end(entry_key)
+            return self._entries[entry_key][1]
+
+    def neighbors(self, key: Hashable, text: str, k: int = 3, min_similarity: float = 0.75) -> List[Tuple[float, str]]:
+        """
+        Return up to k (similarity, response) pairs under key that are at least min_similarity close to text.
+
+        Used on a cache miss to find related responses that are close but below the hit threshold.
+        """
+        query = embed_text(text)
+        with self._lock:
+            index = self._key_index(key_hash(key))
+            if index is None:
+                return []
+
+            entry_keys, matrix, expires = index
+            scores = np.where(expires <= time.time(), -np.inf, matrix @ query)
+            best = np.argsort(scores)[::-1][:k]
+            return [
+                (float(scores[position]), self._entries[entry_keys[position]][1])
+                for position in best
+                if scores[position] >= min_similarity
+            ]
+
+    def set(self, key: Hashable, text: str, response: str) -> None:
+        """Store response for text under key, evicting the least recently used entry"""
+        entry_key = (key_hash(key), text)
+        embedding = embed_text(text)
+        now = time.time()
+        with self._lock:
+            self._entries[entry_key] = (embedding, response, now + self.ttl)
+            self._entries.move_to_end(entry_key)
+            self._index.pop(entry_key[0], None)
+            if self._db is not None:
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO {self._table} (key_hash, text, embedding, response, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (*entry_key, embedding.tobytes(), response, now),
+                )
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+            if self._db is not None:
+                self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self._table}")
+                self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+CACHE_STRATEGIES = ("semantic", "exact-match", "off")
+
+
+def semantic_cached(threshold: float = 0.92, ttl: float = 3600, maxsize: int = 512, db_file: Optional[str] = None) -> Callable:
+    """
+    Cache a ``(self, key, text, *args)`` method in a SemanticCache.
+
+    ``key`` is the hard lexical prefix (e.g. method name, style, length) and
+    ``text`` is the user-supplied part that is embedded for similarity.
+    Callers may pass ``cache_strategy`` ("semantic", "exact-match" or "off")
+    to narrow or skip the lookup. Concurrent misses for the same key and text
+    are single-flighted: one call generates and the others wait for its
+    result. Exceptions propagate (to waiters too) and are never cached.
+    The cache is exposed as the wrapper's ``cache`` attribute.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        cache = SemanticCache(maxsize=maxsize, ttl=ttl, threshold=threshold, db_file=db_file)
+        inflight: Dict[Tuple[str, str], Future] = {}
+        inflight_lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(self, key: Hashable, text: str, *args, cache_strategy: str = "semantic", **kwargs):
+            if cache_strategy not in CACHE_STRATEGIES:
+                raise ValueError(f"Unknown cache strategy: {cache_strategy}")
+            if cache_strategy == "off":
+                return func(self, key, text, *args, **kwargs)
+
+            cached = cache.get(key, text, strategy=cache_strategy)
+            if cached is not None:
+                return cached
+
+            flight_key = (key_hash(key), text)
+            with inflight_lock:
+                future = inflight.get(flight_key)
+                leader = future is None
+                if leader:
+                    future = inflight[flight_key] = Future()
+            if not leader:
+                return future.result()
+
+            try:
+                # A previous leader may have finished between our cache miss and taking the lock
+                response = cache.get(key, text, strategy="exact-match")
+                if response is None:
+                    response = func(self, key, text, *args, **kwargs)
+                    if response:
+                        cache.set(key, text, response)
+                future.set_result(response)
+                return response
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with inflight_lock:
+                    del inflight[flight_key]
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
@@ -1,86 +1,65 @@
+import logging
 from agno.agent import Agent, RunResponse
-from agno.models.anthropic import Claude
 from agno.tools.reasoning import ReasoningTools
 from agno.tools.googlesearch import GoogleSearchTools
 from app.agents.base_agent import BaseAgent
-from app.core.setting import settings
-from agno.utils.pprint import pprint_run_response
+from app.agents.cached_claude import CachedClaude
+from app.agents.prompt_routing import first_match, keyword_hits, keyword_pattern, series_length
+from types import MappingProxyType
 from typing import Iterator
 
+logger = logging.getLogger(__name__)
 
-class TechBlogWriterAgent(BaseAgent):
-    def __init__(self):
-        self.tech_blog_writer = self._create_tech_blog_writer()
+# Prompt details for each blog post option
+_LENGTH_SPECS = MappingProxyType({
+    "short": "800-1200 words, focus on key concepts and quick implementation",
+    "medium": "1500-2500 words, comprehensive coverage with examples and best practices", 
+    "long": "3000-5000 words, in-depth analysis with multiple examples, case studies, and advanced topics"
+})
 
-    def _create_tech_blog_writer(self):
-        return Agent(
-            name="Technical Blog Writer",
-            role="You are an expert technical blog writer specializing in software development, AI, and technology content",
-            model=Claude(id="claude-3-7-sonnet-20250219", max_tokens=8096),
-            instructions=[
-                "Create comprehensive, well-structured technical blog posts that educate and engage developers",
-                "Include clear explanations of technical concepts with appropriate depth for the target audience",
-                "Provide practical code examples, best practices, and real-world applications",
-                "Structure content with proper headings, subheadings, and logical flow",
-                "Include common pitfalls, troubleshooting tips, and performance considerations",
-                "Use markdown formatting for code blocks, links, and emphasis",
-                "Ensure content is accurate, up-to-date, and follows industry standards",
-                "Create engaging introductions that hook readers and clear conclusions that summarize key points",
-                "Include relevant technical keywords for SEO without keyword stuffing",
-                "Provide actionable takeaways that readers can implement immediately",
-                "Adapt writing style and complexity based on target audience level",
-                "Include references to documentation, tools, and additional resources when helpful",
-                "Focus on practical value and real-world problem solving",
-                "Ensure code examples are syntactically correct and follow best practices",
-            ],
-            show_tool_calls=True,
-            tools=[ReasoningTools(add_instructions=True), GoogleSearchTools()],
-            stream=True,
-            markdown=True,
-        )
+_COMPLEXITY_SPECS = MappingProxyType({
+    "beginner": "Assume basic programming knowledge, explain fundamental concepts clearly, include step-by-step instructions",
+    "intermediate": "Assume solid programming foundation, focus on practical implementation and best practices",
+    "advanced": "Assume expert-level knowledge, dive deep into implementation details, performance optimization, and edge cases"
+})
 
-    def generate_tech_blog_post(self, topic: str, complexity: str = "intermediate", length: str = "medium", post_type: str = "tutorial") -> str:
-        """
-        Generate a technical blog post based on the topic, complexity, and length
-        
-        Args:
-            topic: The technical topic for the blog post
-            complexity: Target audience level (beginner, intermediate, advanced)
-            length: Desired post length (short, medium, long)
-            post_type: Type of post (tutorial, explainer, review, comparison, guide, news)
-        """
-        
-        # Define length specifications
-        length_specs = {
-            "short": "800-1200 words, focus on key concepts and quick implementation",
-            "medium": "1500-2500 words, comprehensive coverage with examples and best practices", 
-            "long": "3000-5000 words, in-depth analysis with multiple examples, case studies, and advanced topics"
-        }
-        
-        # Define complexity specifications
-        complexity_specs = {
-            "beginner": "Assume basic programming knowledge, explain fundamental concepts clearly, include step-by-step instructions",
-            "intermediate": "Assume solid programming foundation, focus on practical implementation and best practices",
-            "advanced": "Assume expert-level knowledge, dive deep into implementation details, performance optimization, and edge cases"
-        }
-        
-        # Define post type specifications
-        post_type_specs = {
-            "tutorial": "Step-by-step guide with hands-on examples and code implementations",
-            "explainer": "Deep dive into concepts, theories, and how things work under the hood",
-            "review": "Analysis and evaluation of tools, libraries, frameworks, or technologies",
-            "comparison": "Side-by-side comparison of different approaches, tools, or technologies",
-            "guide": "Comprehensive reference covering multiple aspects of a topic",
-            "news": "Analysis of recent developments, updates, or trends in technology"
-        }
+_POST_TYPE_SPECS = MappingProxyType({
+    "tutorial": "Step-by-step guide with hands-on examples and code implementations",
+    "explainer": "Deep dive into concepts, theories, and how things work under the hood",
+    "review": "Analysis and evaluation of tools, libraries, frameworks, or technologies",
+    "comparison": "Side-by-side comparison of different approaches, tools, or technologies",
+    "guide": "Comprehensive reference covering multiple aspects of a topic",
+    "news": "Analysis of recent developments, updates, or trends in technology"
+})
 
-        enhanced_prompt = f"""
+# Routing keywords, matched as substrings of the prompt; map order sets priority
+_SERIES_KEYWORDS = frozenset({"series", "multiple posts"})
+_REVIEW_KEYWORDS = frozenset({"review", "analyze"})
+_COMPARISON_KEYWORDS = frozenset({"compare", "vs", " vs ", " versus "})
+_COMPLEXITY_MAP = {"beginner": "beginner", "basic": "beginner", "advanced": "advanced", "expert": "advanced"}
+_LENGTH_MAP = {
+    "short": "short", "brief": "short",
+    "long": "long", "detailed": "long", "comprehensive": "long",
+}
+_POST_TYPE_MAP = {
+    "tutorial": "tutorial", "how to": "tutorial",
+    "explain": "explainer", "what is": "explainer",
+    "guide": "guide",
+    "news": "news", "update": "news",
+}
+_KEYWORD_PATTERN = keyword_pattern(
+    _SERIES_KEYWORDS | _REVIEW_KEYWORDS | _COMPARISON_KEYWORDS
+    | _COMPLEXITY_MAP.keys() | _LENGTH_MAP.keys() | _POST_TYPE_MAP.keys()
+)
+
+# Prompt templates, filled per request with str.format_map
+_TECH_BLOG_POST_TEMPLATE = """
         Create a technical blog post about: "{topic}"
         
         Specifications:
-        - Complexity Level: {complexity} ({complexity_specs.get(complexity, complexity_specs['intermediate'])})
-        - Length: {length} ({length_specs.get(length, length_specs['medium'])})
-        - Post Type: {post_type} ({post_type_specs.get(post_type, post_type_specs['tutorial'])})
+        - Complexity Level: {complexity} ({complexity_desc})
+        - Length: {length} ({length_desc})
+        - Post Type: {post_type} ({post_type_desc})
         
         Content Structure Requirements:
         1. **Engaging Title**: Create a compelling, SEO-friendly title
@@ -120,25 +99,7 @@ class TechBlogWriterAgent(BaseAgent):
         Please create a comprehensive technical blog post that provides genuine value to developers and establishes thought leadership in the software development community.
         """
 
-        try:
-            print(f"Generating technical blog post for topic: {topic}")
-            response_stream: Iterator[RunResponse] = self.tech_blog_writer.run(enhanced_prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            pprint_run_response(response, markdown=True)
-            print("Technical blog post generated successfully.")
-            return content
-        except Exception as e:
-            print(f"Error generating technical blog post: {e}")
-            return f"# Error generating technical blog post: {e}"
-
-    def create_blog_series(self, topic: str, series_length: int = 5, complexity: str = "intermediate") -> str:
-        """
-        Create a series of related technical blog posts
-        """
-        
-        series_prompt = f"""
+_BLOG_SERIES_TEMPLATE = """
         Create a comprehensive blog series about: "{topic}"
         
         Series Specifications:
@@ -170,30 +131,10 @@ class TechBlogWriterAgent(BaseAgent):
         Focus: Practical, actionable content that solves real development challenges
         """
 
-        try:
-            print(f"Creating technical blog series for topic: {topic}")
-            response_stream: Iterator[RunResponse] = self.tech_blog_writer.run(series_prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            print("Technical blog series created successfully.")
-            return content
-        except Exception as e:
-            print(f"Error creating technical blog series: {e}")
-            return f"# Error creating blog series: {e}"
-
-    def review_technology(self, technology: str, focus_areas: list = None) -> str:
-        """
-        Create a comprehensive technology review or analysis
-        """
-        
-        if focus_areas is None:
-            focus_areas = ["features", "performance", "ease_of_use", "ecosystem", "community", "pricing"]
-        
-        review_prompt = f"""
+_TECHNOLOGY_REVIEW_TEMPLATE = """
         Create a comprehensive technical review and analysis of: "{technology}"
         
-        Review Focus Areas: {', '.join(focus_areas)}
+        Review Focus Areas: {focus_areas}
         
         Review Structure:
         1. **Technology Overview**: What it is, what problem it solves, target use cases
@@ -219,30 +160,10 @@ class TechBlogWriterAgent(BaseAgent):
         Target Audience: Technical decision makers, developers evaluating technology choices
         """
 
-        try:
-            print(f"Creating technology review for: {technology}")
-            response_stream: Iterator[RunResponse] = self.tech_blog_writer.run(review_prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            print("Technology review created successfully.")
-            return content
-        except Exception as e:
-            print(f"Error creating technology review: {e}")
-            return f"# Error creating technology review: {e}"
-
-    def create_technical_comparison(self, technologies: list, comparison_criteria: list = None) -> str:
-        """
-        Create a detailed comparison between multiple technologies
-        """
-        
-        if comparison_criteria is None:
-            comparison_criteria = ["performance", "ease_of_use", "learning_curve", "community", "ecosystem", "cost", "scalability"]
+_TECHNICAL_COMPARISON_TEMPLATE = """
+        Create a comprehensive technical comparison between: {technologies}
         
-        comparison_prompt = f"""
-        Create a comprehensive technical comparison between: {', '.join(technologies)}
-        
-        Comparison Criteria: {', '.join(comparison_criteria)}
+        Comparison Criteria: {comparison_criteria}
         
         Comparison Structure:
         1. **Executive Summary**: Quick overview of recommendations for different use cases
@@ -267,51 +188,161 @@ class TechBlogWriterAgent(BaseAgent):
         Target Audience: Technical leads, architects, and decision makers evaluating technology choices
         """
 
+
+class TechBlogWriterAgent(BaseAgent):
+    def __init__(self):
+        self.tech_blog_writer = self._shared_agent("tech_blog_writer", self._create_tech_blog_writer)
+
+    def _create_tech_blog_writer(self):
+        return Agent(
+            name="Technical Blog Writer",
+            role="You are an expert technical blog writer specializing in software development, AI, and technology content",
+            model=CachedClaude(id="claude-3-7-sonnet-20250219", max_tokens=8096),
+            instructions=[
+                "Create comprehensive, well-structured technical blog posts that educate and engage developers",
+                "Include clear explanations of technical concepts with appropriate depth for the target audience",
+                "Provide practical code examples, best practices, and real-world applications",
+                "Structure content with proper headings, subheadings, and logical flow",
+                "Include common pitfalls, troubleshooting tips, and performance considerations",
+                "Use markdown formatting for code blocks, links, and emphasis",
+                "Ensure content is accurate, up-to-date, and follows industry standards",
+                "Create engaging introductions that hook readers and clear conclusions that summarize key points",
+                "Include relevant technical keywords for SEO without keyword stuffing",
+                "Provide actionable takeaways that readers can implement immediately",
+                "Adapt writing style and complexity based on target audience level",
+                "Include references to documentation, tools, and additional resources when helpful",
+                "Focus on practical value and real-world problem solving",
+                "Ensure code examples are syntactically correct and follow best practices",
+            ],
+            show_tool_calls=True,
+            tools=[ReasoningTools(add_instructions=True), GoogleSearchTools()],
+            stream=True,
+            markdown=True,
+        )
+
+    def generate_tech_blog_post(self, topic: str, complexity: str = "intermediate", length: str = "medium", post_type: str = "tutorial") -> str:
+        """
+        Generate a technical blog post based on the topic, complexity, and length
+        
+        Args:
+            topic: The technical topic for the blog post
+            complexity: Target audience level (beginner, intermediate, advanced)
+            length: Desired post length (short, medium, long)
+            post_type: Type of post (tutorial, explainer, review, comparison, guide, news)
+        """
+        enhanced_prompt = _TECH_BLOG_POST_TEMPLATE.format_map({
+            "topic": topic,
+            "complexity": complexity,
+            "complexity_desc": _COMPLEXITY_SPECS.get(complexity, _COMPLEXITY_SPECS["intermediate"]),
+            "length": length,
+            "length_desc": _LENGTH_SPECS.get(length, _LENGTH_SPECS["medium"]),
+            "post_type": post_type,
+            "post_type_desc": _POST_TYPE_SPECS.get(post_type, _POST_TYPE_SPECS["tutorial"]),
+        })
+
+        try:
+            logger.info("Generating technical blog post for topic: %s", topic)
+            response_stream: Iterator[RunResponse] = self.tech_blog_writer.run(enhanced_prompt)
+            content = self._collect_content(response_stream)
+            logger.info("Technical blog post generated successfully.")
+            return content
+        except Exception as e:
+            logger.exception("Error generating technical blog post")
+            return f"# Error generating technical blog post: {e}"
+
+    def create_blog_series(self, topic: str, series_length: int = 5, complexity: str = "intermediate") -> str:
+        """
+        Create a series of related technical blog posts
+        """
+        
+        series_prompt = _BLOG_SERIES_TEMPLATE.format_map({
+            "topic": topic,
+            "series_length": series_length,
+            "complexity": complexity,
+        })
+
+        try:
+            logger.info("Creating technical blog series for topic: %s", topic)
+            response_stream: Iterator[RunResponse] = self.tech_blog_writer.run(series_prompt)
+            content = self._collect_content(response_stream)
+            logger.info("Technical blog series created successfully.")
+            return content
+        except Exception as e:
+            logger.exception("Error creating technical blog series")
+            return f"# Error creating blog series: {e}"
+
+    def review_technology(self, technology: str, focus_areas: list = None) -> str:
+        """
+        Create a comprehensive technology review or analysis
+        """
+        
+        if focus_areas is None:
+            focus_areas = ["features", "performance", "ease_of_use", "ecosystem", "community", "pricing"]
+        
+        review_prompt = _TECHNOLOGY_REVIEW_TEMPLATE.format_map({
+            "technology": technology,
+            "focus_areas": ", ".join(focus_areas),
+        })
+
+        try:
+            logger.info("Creating technology review for: %s", technology)
+            response_stream: Iterator[RunResponse] = self.tech_blog_writer.run(review_prompt)
+            content = self._collect_content(response_stream)
+            logger.info("Technology review created successfully.")
+            return content
+        except Exception as e:
+            logger.exception("Error creating technology review")
+            return f"# Error creating technology review: {e}"
+
+    def create_technical_comparison(self, technologies: list, comparison_criteria: list = None) -> str:
+        """
+        Create a detailed comparison between multiple technologies
+        """
+        
+        if comparison_criteria is None:
+            comparison_criteria = ["performance", "ease_of_use", "learning_curve", "community", "ecosystem", "cost", "scalability"]
+        
+        comparison_prompt = _TECHNICAL_COMPARISON_TEMPLATE.format_map({
+            "technologies": ", ".join(technologies),
+            "comparison_criteria": ", ".join(comparison_criteria),
+        })
+
         try:
-            print(f"Creating technical comparison for: {', '.join(technologies)}")
+            logger.info("Creating technical comparison for: %s", ", ".join(technologies))
             response_stream: Iterator[RunResponse] = self.tech_blog_writer.run(comparison_prompt)
-            content = ""
-            for response in response_stream:
-                content += response.content
-            print("Technical comparison created successfully.")
+            content = self._collect_content(response_stream)
+            logger.info("Technical comparison created successfully.")
             return content
         except Exception as e:
-            print(f"Error creating technical comparison: {e}")
+            logger.exception("Error creating technical comparison")
             return f"# Error creating technical comparison: {e}"
 
     def get_response(self, prompt: str) -> str:
         """
         Main interface method that handles different types of technical blog content requests
         """
-        print(f"Processing technical blog content request: {prompt}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Processing technical blog content request: %s", prompt[:50])
         
-        # Parse the prompt to determine the type of content and parameters
-        prompt_lower = prompt.lower()
+        hits = keyword_hits(_KEYWORD_PATTERN, prompt)
         
         # Detect series requests
-        if "series" in prompt_lower or "multiple posts" in prompt_lower:
-            # Extract series length if specified
-            series_length = 5  # default
-            for num in range(3, 11):  # check for numbers 3-10
-                if str(num) in prompt:
-                    series_length = num
-                    break
-            return self.create_blog_series(prompt, series_length)
+        if hits & _SERIES_KEYWORDS:
+            return self.create_blog_series(prompt, series_length(prompt))
         
         # Detect review requests
-        elif "review" in prompt_lower or "analyze" in prompt_lower:
+        elif hits & _REVIEW_KEYWORDS:
             return self.review_technology(prompt)
         
         # Detect comparison requests
-        elif "compare" in prompt_lower or "vs" in prompt_lower or " versus " in prompt_lower:
+        elif hits & _COMPARISON_KEYWORDS:
             # Simple extraction - in a real implementation, you might want more sophisticated parsing
             technologies = []
-            if " vs " in prompt_lower:
-                parts = prompt.split(" vs ")
-                technologies = [part.strip() for part in parts[:2]]
-            elif " versus " in prompt_lower:
-                parts = prompt.split(" versus ")
-                technologies = [part.strip() for part in parts[:2]]
+            for separator in (" vs ", " versus "):
+                if separator in hits:
+                    parts = prompt.split(separator)
+                    technologies = [part.strip() for part in parts[:2]]
+                    break
             
             if len(technologies) >= 2:
                 return self.create_technical_comparison(technologies)
@@ -320,29 +351,7 @@ class TechBlogWriterAgent(BaseAgent):
         
         # Default to blog post generation
         else:
-            # Detect complexity level
-            complexity = "intermediate"  # default
-            if "beginner" in prompt_lower or "basic" in prompt_lower:
-                complexity = "beginner"
-            elif "advanced" in prompt_lower or "expert" in prompt_lower:
-                complexity = "advanced"
-            
-            # Detect length
-            length = "medium"  # default
-            if "short" in prompt_lower or "brief" in prompt_lower:
-                length = "short"
-            elif "long" in prompt_lower or "detailed" in prompt_lower or "comprehensive" in prompt_lower:
-                length = "long"
-            
-            # Detect post type
-            post_type = "tutorial"  # default
-            if "tutorial" in prompt_lower or "how to" in prompt_lower:
-                post_type = "tutorial"
-            elif "explain" in prompt_lower or "what is" in prompt_lower:
-                post_type = "explainer"
-            elif "guide" in prompt_lower:
-                post_type = "guide"
-            elif "news" in prompt_lower or "update" in prompt_lower:
-                post_type = "news"
-            
+            complexity = first_match(hits, _COMPLEXITY_MAP, "intermediate")
+            length = first_match(hits, _LENGTH_MAP, "medium")
+            post_type = first_match(hits, _POST_TYPE_MAP, "tutorial")
             return self.generate_tech_blog_post(prompt, complexity, length, post_type)
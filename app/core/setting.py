@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings 
-from typing import Optional
+from typing import Dict, Optional
 
 class Setting(BaseSettings):
     
@@ -10,6 +10,21 @@ class Setting(BaseSettings):
     DATABASE_URL: str
     ALLOWED_ORIGINS: list[str] 
     GOOGLE_API_KEY: str
+    SEMANTIC_CACHE_DB: Optional[str] = None
+    MARKETING_REVIEW_CACHE_ENABLED: bool = True
+    MARKETING_REVIEW_CACHE_TTL_DAYS: int = 7
+    MARKETING_AGENT_MAX_TOKENS: Dict[str, int] = {}
+    MARKETING_AGENT_CONCURRENCY: int = 6
+    CLINICAL_AGENT_MAX_TOKENS: Dict[str, int] = {}
+    CLINICAL_BATCH_CONCURRENCY: int = 4
+    MEDICATION_SEARCH_SUMMARIES: bool = False
+    MEDICATION_REPORT_CACHE_ENABLED: bool = True
+    MEDICATION_REPORT_CACHE_TTL_HOURS: int = 24
+    MEDICATION_BATCH_CONCURRENCY: int = 4
+    LOCATION_REPORT_CACHE_ENABLED: bool = True
+    LOCATION_REPORT_CACHE_TTL_HOURS: int = 1
+    LLM_REQUEST_TIMEOUT: float = 60.0
+    LLM_MAX_RETRIES: int = 2
 
     class Config:
         env_file = ".env"
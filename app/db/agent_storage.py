@@ -0,0 +1,108 @@
+import atexit
+import functools
+from pathlib import Path
+
+from agno.storage.sqlite import SqliteStorage
+from sqlalchemy import Delete, Insert, TextClause, Update, create_engine, event, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+# Reader connections per storage file; WAL lets all of them read while the writer commits
+READER_POOL_SIZE = 8
+
+
+def _configure_connection(dbapi_connection, query_only: bool = False) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    if query_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+def _storage_url(db_file: str) -> str:
+    db_path = Path(db_file).resolve()
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    return f"sqlite:///{db_path}"
+
+
+@functools.lru_cache(maxsize=None)
+def agent_storage_engine(db_file: str) -> Engine:
+    """
+    Return the process-wide writer engine for an agno agent storage file.
+
+    Every SqliteStorage on the file shares this engine, which holds a single
+    connection, so writes from concurrent agent runs queue in the pool instead of
+    contending for SQLite's file lock. Transactions start with BEGIN IMMEDIATE so a
+    writer in another process makes them wait for the lock up front rather than fail
+    when a read upgrades to a write. Connections run in WAL mode with NORMAL sync, so
+    commits do not fsync the whole database.
+    """
+    storage_engine = create_engine(_storage_url(db_file), pool_size=1, max_overflow=0)
+
+    @event.listens_for(storage_engine, "connect")
+    def _configure(dbapi_connection, _):
+        _configure_connection(dbapi_connection)
+        # Let SQLAlchemy's begin event issue the BEGIN instead of the sqlite3 driver
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(storage_engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    atexit.register(storage_engine.dispose)
+    return storage_engine
+
+
+@functools.lru_cache(maxsize=None)
+def agent_storage_reader_engine(db_file: str) -> Engine:
+    """
+    Return the process-wide read-only engine for an agno agent storage file.
+
+    Its connections are query_only, and reads through them never wait for the writer.
+    """
+    reader_engine = create_engine(_storage_url(db_file), pool_size=READER_POOL_SIZE)
+
+    @event.listens_for(reader_engine, "connect")
+    def _configure(dbapi_connection, _):
+        _configure_connection(dbapi_connection, query_only=True)
+
+    atexit.register(reader_engine.dispose)
+    return reader_engine
+
+
+class _ReadWriteSession(Session):
+    """Session that sends selects to the readers and every other statement to the writer"""
+
+    def __init__(self, reader: Engine, **kwargs):
+        super().__init__(**kwargs)
+        self._reader = reader
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)) or (
+            isinstance(clause, TextClause) and not clause.text.lstrip().upper().startswith("SELECT")
+        ):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return self._reader
+
+
+class WalSqliteStorage(SqliteStorage):
+    """
+    SqliteStorage backed by the shared engines for db_file.
+
+    Session reads go to the reader engine and upserts, deletes and schema changes
+    to the single-connection writer engine. agno's SqliteStorage replaces a db_engine
+    argument with an in-memory database, so the shared engines are swapped in after
+    construction instead.
+    """
+
+    def __init__(self, table_name: str, db_file: str, **kwargs):
+        super().__init__(table_name=table_name, **kwargs)
+        self.db_engine = agent_storage_engine(db_file)
+        self.inspector = inspect(self.db_engine)
+        self.SqlSession = sessionmaker(
+            bind=self.db_engine, class_=_ReadWriteSession, reader=agent_storage_reader_engine(db_file)
+        )
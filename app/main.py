@@ -10,6 +10,7 @@ import sys
 import signal
 import os
 from app.core.setting import settings
+from app.core.logging_config import start_logging, stop_logging
 
 # Handle Windows event loop policy for Playwright/Crawl4AI compatibility
 if sys.platform == "win32":
@@ -19,6 +20,7 @@ if sys.platform == "win32":
 # Modern lifespan context manager to replace deprecated on_event
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    start_logging()
     print("Starting up agno-ai-api...")
     
     # Create database tables
@@ -32,6 +34,7 @@ async def lifespan(app: FastAPI):
     print("Shutting down gracefully...")
     # Add any cleanup code here if needed
     # For example: closing database connections, cleaning up resources, etc.
+    stop_logging()
 
 
 # Initialize FastAPI with lifespan
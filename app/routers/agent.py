@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from fastapi_utils.cbv import cbv
 
 from app.service.agent_service import AgentService
 from app.service import PdfService, EmailService
 from app.db.models import Agent
-from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 router = APIRouter()
@@ -39,11 +42,9 @@ class AgentRouter:
     @router.get("/agents/{agent_id}")
     def get_agent(self, agent_id: int):
         """Get a specific agent by ID"""
-        print(f"Fetching agent with ID: {agent_id}")
-        
+        logger.debug("Fetching agent with ID: %s", agent_id)
         agent = self.agent_service.get_agent_by_id(agent_id)
         prompt = self.agent_service.get_prompt(agent.slug)
-        print(f"Found agent: {agent}, Prompt: {prompt}")
         return {"agent": agent, "prompt": prompt}
 
     @router.post("/create-agent")
@@ -62,6 +63,20 @@ class AgentRouter:
                 user_email=request.user_email
             )
         return {"response": response}
+
+    @router.post("/run-agent/{agent_id}/stream")
+    def stream_agent_by_id(self, agent_id: int, request: AgentRequest):
+        """Run an agent by ID and stream the response as Server-Sent Events"""
+        events = self.agent_service.stream_agent_by_id(
+                agent_id=agent_id,
+                prompt=request.prompt,
+                user_email=request.user_email
+            )
+        return StreamingResponse(
+            events,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
        
 
     @router.put("/agents/{agent_id}")
@@ -2,7 +2,10 @@
 Agent Service - Business logic layer for agent operations
 This service handles the business logic and coordinates between the route layer and repository layer.
 """
-from typing import List, Optional
+import asyncio
+import json
+import threading
+from typing import AsyncIterator, List, Optional
 from app.db.models import Agent, UserAgentRun
 from app.db.repository.agent_repository import AgentRepository
 from app.service.user_agent_run_service import UserAgentRunService
@@ -85,6 +88,57 @@ class AgentService:
         clean_response = textwrap.dedent(response).lstrip()
             
         return clean_response
+
+    def stream_agent_by_id(self, agent_id: int, prompt: str, user_email: str) -> AsyncIterator[str]:
+        """Run an agent by ID and return its response as Server-Sent Events, one event per content chunk"""
+        if not prompt:
+            raise ValueError("Prompt must not be empty")
+
+        if not user_email:
+            raise ValueError("User email must not be empty")
+
+        agent = self.get_agent_by_id(agent_id)
+        agent_type = AgentType(agent.slug)
+        self.save_user_agent_run(user_email, agent_id)
+        return self._sse_events(agent_type, prompt)
+
+    @staticmethod
+    async def _sse_events(agent_type: AgentType, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream an agent response as SSE ``data:`` events.
+
+        The blocking agent stream runs start to finish on one worker thread (agno Agents
+        are reused per thread), handing chunks to the event loop as they arrive. Stops the
+        worker early if the client disconnects.
+        """
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+        done = object()
+
+        def produce():
+            try:
+                agent = AgentFactory.get_agent(agent_type)
+                if hasattr(agent, "get_response_stream"):
+                    stream = agent.get_response_stream(prompt)
+                else:
+                    stream = iter([agent.get_response(prompt)])
+                for chunk in stream:
+                    if stopped.is_set():
+                        break
+                    loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+            except Exception as e:
+                loop.call_soon_threadsafe(chunks.put_nowait, f"# Error generating response: {e}")
+            finally:
+                loop.call_soon_threadsafe(chunks.put_nowait, done)
+
+        loop.run_in_executor(None, produce)
+        try:
+            while (chunk := await chunks.get()) is not done:
+                yield f"data: {json.dumps({'delta': chunk})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        finally:
+            stopped.set()
         
 
     def update_agent(self, agent_id: int, updated_data: dict) -> Optional[Agent]:
@@ -4,8 +4,11 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
 from email.mime.application import MIMEApplication
 from app.core import settings
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 class EmailService:
     def __init__(self, smtp_server='smtp.gmail.com', smtp_port=587, sender_email=settings.SENDER_EMAIL, sender_password=settings.SENDER_PASSWORD):
         self.smtp_server = smtp_server
@@ -19,7 +22,7 @@ class EmailService:
         self.server = smtplib.SMTP(self.smtp_server, self.smtp_port)
         self.server.starttls()
         self.server.login(self.sender_email, self.sender_password)
-        print("Connected to SMTP server successfully.")
+        logger.debug("Connected to SMTP server successfully.")
 
     def send_email(self, to_email, subject, body, logo_path=None, pdf_path=None):
         """Send an email with optional embedded logo and PDF attachment"""
@@ -44,7 +47,7 @@ class EmailService:
                 mime_image = MIMEImage(img.read())
                 mime_image.add_header('Content-ID', '<logo>')
                 msg.attach(mime_image)
-            print("Logo attached.")
+            logger.debug("Logo attached.")
 
         if pdf_path and os.path.isfile(pdf_path):
             with open(pdf_path, 'rb') as pdf_file:
@@ -55,14 +58,14 @@ class EmailService:
                     filename=os.path.basename(pdf_path)
                 )
                 msg.attach(pdf_attachment)
-            print("PDF attached.")
+            logger.debug("PDF attached.")
 
         self.server.send_message(msg)
-        print(f"Email sent to {to_email}.")
+        logger.info("Email sent to %s.", to_email)
 
     def disconnect(self):
         """Close the SMTP connection"""
         if self.server:
             self.server.quit()
-            print("Disconnected from SMTP server.")
+            logger.debug("Disconnected from SMTP server.")
 
@@ -1,7 +1,9 @@
 import markdown
 from weasyprint import HTML,CSS
 import os
+from pathlib import Path
 
+_CSS_PATH = str(Path(__file__).resolve().parent.parent / "static" / "css" / "styles.css")
 
 
 class PdfService:  
@@ -14,9 +16,7 @@ class PdfService:
         if not os.path.exists('pdf'):
             os.makedirs('pdf')
 
-        base_dir = os.path.dirname(os.path.abspath(__file__)) 
-        css_path = os.path.join(base_dir, '..', 'static', 'css', 'styles.css')
-        HTML(string=self.html_content).write_pdf("pdf/output.pdf", stylesheets=[CSS(css_path)])
+        HTML(string=self.html_content).write_pdf("pdf/output.pdf", stylesheets=[CSS(_CSS_PATH)])
 
 
 
@@ -0,0 +1,65 @@
+"""
+Crawl4ai toolkit that shares crawl results across agents.
+
+Every member of a team reviewing the same website crawls the same URL.
+CachedCrawl4aiTools keeps recent crawl results in a process-wide memo, and
+concurrent crawls of a URL that is not cached yet are single-flighted, so
+the page is fetched once per review instead of once per agent.
+
+Each agent still gets its own toolkit instance: agno binds a toolkit's
+functions to the agent using them, so instances cannot be shared.
+
+crawl4ai (and the browser stack behind it) is only imported on the first
+crawl, so building agents that may never crawl stays cheap.
+"""
+
+from typing import Optional
+
+from agno.tools import Toolkit
+
+from app.tools.result_cache import ToolResultCache
+
+CRAWL_TTL = 600
+CRAWL_CACHE_SIZE = 128
+
+_crawls = ToolResultCache(ttl=CRAWL_TTL, maxsize=CRAWL_CACHE_SIZE)
+
+
+def clear_crawl_cache() -> None:
+    _crawls.clear()
+
+
+class CachedCrawl4aiTools(Toolkit):
+    """Crawl4aiTools whose crawls are memoized per (url, max_length) for CRAWL_TTL seconds"""
+
+    def __init__(self, max_length: Optional[int] = 1000, **kwargs):
+        super().__init__(name="crawl4ai_tools", **kwargs)
+
+        self.max_length = max_length
+        self._crawler = None
+
+        self.register(self.web_crawler)
+
+    def _crawl(self, url: str, max_length: Optional[int]) -> str:
+        if self._crawler is None:
+            from agno.tools.crawl4ai import Crawl4aiTools
+
+            self._crawler = Crawl4aiTools(max_length=self.max_length)
+        return self._crawler.web_crawler(url, max_length)
+
+    def web_crawler(self, url: str, max_length: Optional[int] = None) -> str:
+        """
+        Crawls a website using crawl4ai's WebCrawler.
+
+        :param url: The URL to crawl.
+        :param max_length: The maximum length of the result.
+
+        :return: The results of the crawling.
+        """
+        if url is None:
+            return "No URL provided"
+
+        return _crawls.get_or_call(
+            (url, self.max_length or max_length),
+            lambda: self._crawl(url, max_length),
+        )
@@ -0,0 +1,49 @@
+"""
+Google search toolkit that deduplicates queries across agents.
+
+Team members researching the same website tend to issue the same searches
+("<company> reviews", "site:<domain>", ...). CachedGoogleSearchTools
+normalises each query and answers repeats from a short-lived process-wide
+memo; concurrent identical searches share one request.
+"""
+
+from agno.tools.googlesearch import GoogleSearchTools
+
+from app.tools.result_cache import ToolResultCache
+
+SEARCH_TTL = 600
+SEARCH_CACHE_SIZE = 256
+
+_searches = ToolResultCache(ttl=SEARCH_TTL, maxsize=SEARCH_CACHE_SIZE)
+
+
+def clear_search_cache() -> None:
+    _searches.clear()
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query"""
+    return " ".join(query.lower().split())
+
+
+class CachedGoogleSearchTools(GoogleSearchTools):
+    """GoogleSearchTools whose searches are memoized per normalised query for SEARCH_TTL seconds"""
+
+    def google_search(self, query: str, max_results: int = 5, language: str = "en") -> str:
+        """
+        Use this function to search Google for a specified query.
+
+        Args:
+            query (str): The query to search for.
+            max_results (int, optional): The maximum number of results to return. Default is 5.
+            language (str, optional): The language of the search results. Default is "en".
+
+        Returns:
+            str: A JSON formatted string containing the search results.
+        """
+        query = normalize_query(query)
+        key = (query, self.fixed_max_results or max_results, self.fixed_language or language, self.proxy)
+        return _searches.get_or_call(
+            key,
+            lambda: super(CachedGoogleSearchTools, self).google_search(query, max_results, language),
+        )
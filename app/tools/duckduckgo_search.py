@@ -8,9 +8,11 @@ try:
 except ImportError:
     requests = None
 
-import json
+import re
+import threading
 import time
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
 from urllib.parse import quote_plus
 import logging
 
@@ -18,6 +20,29 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Result links and snippets in DuckDuckGo's HTML search page
+_RESULT_TITLE_RE = re.compile(r'<a[^>]*class="result__a"[^>]*href="([^"]*)"[^>]*>([^<]*)</a>')
+_RESULT_SNIPPET_RE = re.compile(r'<a[^>]*class="result__snippet"[^>]*>([^<]*)</a>')
+
+# Drug and medical sources whose results are ranked first
+MEDICAL_SOURCES = (
+    'drugs.com', 'rxlist.com', 'webmd.com', 'mayoclinic.org',
+    'medlineplus.gov', 'nih.gov', 'fda.gov', 'ncbi.nlm.nih.gov'
+)
+_MEDICAL_SOURCE_RE = re.compile("|".join(map(re.escape, MEDICAL_SOURCES)), re.IGNORECASE)
+
+# Queries that mention these get pharmaceutical terms added (web search) or are served at all (general search)
+_DRUG_QUERY_RE = re.compile(r"drug|medication|interaction|pharmacy", re.IGNORECASE)
+_GENERAL_DRUG_QUERY_RE = re.compile(r"drug|medication|interact|side effect", re.IGNORECASE)
+
+# Runs the independent queries of one drug lookup side by side
+_QUERY_POOL = ThreadPoolExecutor(max_workers=12, thread_name_prefix="ddg-query")
+
+# DuckDuckGo throttles bursts with empty or blocked responses, so at most this many
+# requests are in flight across all lookups in the process; the rest wait their turn
+MAX_CONCURRENT_REQUESTS = 3
+_REQUEST_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
 
 class DuckDuckGoSearchTool:
     """
@@ -43,6 +68,11 @@ class DuckDuckGoSearchTool:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
     
+    def _get(self, url: str, timeout: float):
+        """GET url once one of the shared request slots is free"""
+        with _REQUEST_SLOTS:
+            return self.session.get(url, timeout=timeout)
+    
     def search_instant_answers(self, query: str) -> Dict[str, Any]:
         """
         Search DuckDuckGo instant answers API for drug information
@@ -52,7 +82,7 @@ class DuckDuckGoSearchTool:
             encoded_query = quote_plus(query)
             url = f"https://api.duckduckgo.com/?q={encoded_query}&format=json&no_html=1&skip_disambig=1"
             
-            response = self.session.get(url, timeout=10)
+            response = self._get(url, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -85,7 +115,7 @@ class DuckDuckGoSearchTool:
         """
         try:
             # Add medical/drug specific terms to improve relevance
-            if any(term in query.lower() for term in ['drug', 'medication', 'interaction', 'pharmacy']):
+            if _DRUG_QUERY_RE.search(query):
                 enhanced_query = f"{query} drug interaction pharmaceutical FDA"
             else:
                 enhanced_query = query
@@ -93,34 +123,22 @@ class DuckDuckGoSearchTool:
             encoded_query = quote_plus(enhanced_query)
             url = f"https://html.duckduckgo.com/html/?q={encoded_query}"
             
-            response = self.session.get(url, timeout=15)
+            response = self._get(url, timeout=15)
             response.raise_for_status()
             
             # Simple HTML parsing for key information
             content = response.text
             results = []
             
-            # Look for drug databases and medical sources
-            medical_sources = [
-                'drugs.com', 'rxlist.com', 'webmd.com', 'mayoclinic.org', 
-                'medlineplus.gov', 'nih.gov', 'fda.gov', 'ncbi.nlm.nih.gov'
-            ]
-            
             # Extract basic information (simplified approach)
-            import re
-            
-            # Find titles and URLs
-            title_pattern = r'<a[^>]*class="result__a"[^>]*href="([^"]*)"[^>]*>([^<]*)</a>'
-            snippet_pattern = r'<a[^>]*class="result__snippet"[^>]*>([^<]*)</a>'
-            
-            titles = re.findall(title_pattern, content)
-            snippets = re.findall(snippet_pattern, content)
+            titles = _RESULT_TITLE_RE.findall(content)
+            snippets = _RESULT_SNIPPET_RE.findall(content)
             
             for i, (url, title) in enumerate(titles[:self.max_results]):
                 snippet = snippets[i] if i < len(snippets) else ""
                 
                 # Prioritize medical sources
-                is_medical_source = any(source in url.lower() for source in medical_sources)
+                is_medical_source = _MEDICAL_SOURCE_RE.search(url) is not None
                 
                 results.append({
                     'title': title.strip(),
@@ -145,22 +163,14 @@ class DuckDuckGoSearchTool:
         Comprehensive drug information search combining multiple approaches
         """
         time.sleep(self.delay)  # Rate limiting
-        
-        # Search for basic drug information
-        basic_query = f"{drug_name} drug medication"
-        instant_results = self.search_instant_answers(basic_query)
-        
-        time.sleep(self.delay)
-        
-        # Search for interaction information
-        interaction_query = f"{drug_name} drug interactions side effects"
-        web_results = self.search_web_results(interaction_query)
-        
-        time.sleep(self.delay)
-        
-        # Search for FDA information
-        fda_query = f"{drug_name} FDA approved drug information"
-        fda_results = self.search_web_results(fda_query)
+
+        # The overview, interaction and FDA searches are independent, so run them concurrently
+        instant_future = _QUERY_POOL.submit(self.search_instant_answers, f"{drug_name} drug medication")
+        web_future = _QUERY_POOL.submit(self.search_web_results, f"{drug_name} drug interactions side effects")
+        fda_future = _QUERY_POOL.submit(self.search_web_results, f"{drug_name} FDA approved drug information")
+        instant_results = instant_future.result()
+        web_results = web_future.result()
+        fda_results = fda_future.result()
         
         # Combine results
         combined_results = {
@@ -237,36 +247,36 @@ class FreeDrugSearchTool:
             results = self.search_engine.search_drug_information(drug_name)
             
             # Format results for agent consumption
-            formatted_results = f"# Drug Information: {drug_name}\n\n"
+            parts = [f"# Drug Information: {drug_name}\n\n"]
             
             # Add instant answers
             instant = results.get('instant_answers', {})
             if instant.get('abstract'):
-                formatted_results += f"## Overview\n{instant['abstract']}\n\n"
+                parts.append(f"## Overview\n{instant['abstract']}\n\n")
             if instant.get('definition'):
-                formatted_results += f"## Definition\n{instant['definition']}\n\n"
+                parts.append(f"## Definition\n{instant['definition']}\n\n")
             
             # Add interaction sources
             interaction_sources = results.get('interaction_sources', [])
             if interaction_sources:
-                formatted_results += "## Interaction Information Sources\n"
+                parts.append("## Interaction Information Sources\n")
                 for source in interaction_sources[:3]:
                     if 'error' not in source:
-                        formatted_results += f"- **{source.get('title', 'N/A')}**\n"
-                        formatted_results += f"  {source.get('snippet', 'No snippet available')}\n"
-                        formatted_results += f"  Source: {source.get('url', 'N/A')}\n\n"
+                        parts.append(f"- **{source.get('title', 'N/A')}**\n")
+                        parts.append(f"  {source.get('snippet', 'No snippet available')}\n")
+                        parts.append(f"  Source: {source.get('url', 'N/A')}\n\n")
             
             # Add FDA sources
             fda_sources = results.get('fda_sources', [])
             if fda_sources:
-                formatted_results += "## Official/FDA Sources\n"
+                parts.append("## Official/FDA Sources\n")
                 for source in fda_sources[:2]:
                     if 'error' not in source and source.get('is_medical_source'):
-                        formatted_results += f"- **{source.get('title', 'N/A')}**\n"
-                        formatted_results += f"  {source.get('snippet', 'No snippet available')}\n"
-                        formatted_results += f"  Source: {source.get('url', 'N/A')}\n\n"
+                        parts.append(f"- **{source.get('title', 'N/A')}**\n")
+                        parts.append(f"  {source.get('snippet', 'No snippet available')}\n")
+                        parts.append(f"  Source: {source.get('url', 'N/A')}\n\n")
             
-            return formatted_results
+            return "".join(parts)
             
         except Exception as e:
             logger.error(f"Error in drug info search: {e}")
@@ -280,22 +290,22 @@ class FreeDrugSearchTool:
         try:
             results = self.search_engine.search_drug_interactions(drug1, drug2)
             
-            formatted_results = f"# Drug Interaction Search: {drug1} + {drug2}\n\n"
+            parts = [f"# Drug Interaction Search: {drug1} + {drug2}\n\n"]
             
             interaction_results = results.get('interaction_results', [])
             if interaction_results:
-                formatted_results += "## Interaction Information Found\n"
+                parts.append("## Interaction Information Found\n")
                 for i, result in enumerate(interaction_results[:5], 1):
                     if 'error' not in result:
-                        formatted_results += f"### Source {i}\n"
-                        formatted_results += f"**Title:** {result.get('title', 'N/A')}\n"
-                        formatted_results += f"**Summary:** {result.get('snippet', 'No summary available')}\n"
-                        formatted_results += f"**URL:** {result.get('url', 'N/A')}\n"
-                        formatted_results += f"**Medical Source:** {'Yes' if result.get('is_medical_source') else 'No'}\n\n"
+                        parts.append(f"### Source {i}\n")
+                        parts.append(f"**Title:** {result.get('title', 'N/A')}\n")
+                        parts.append(f"**Summary:** {result.get('snippet', 'No summary available')}\n")
+                        parts.append(f"**URL:** {result.get('url', 'N/A')}\n")
+                        parts.append(f"**Medical Source:** {'Yes' if result.get('is_medical_source') else 'No'}\n\n")
             else:
-                formatted_results += "No specific interaction information found in search results.\n"
+                parts.append("No specific interaction information found in search results.\n")
             
-            return formatted_results
+            return "".join(parts)
             
         except Exception as e:
             logger.error(f"Error in drug interaction search: {e}")
@@ -305,18 +315,18 @@ class FreeDrugSearchTool:
         """General search functionality"""
         try:
             # Determine if this is a drug-related query
-            if any(term in query.lower() for term in ['drug', 'medication', 'interact', 'side effect']):
+            if _GENERAL_DRUG_QUERY_RE.search(query):
                 web_results = self.search_engine.search_web_results(query)
                 
-                formatted_results = f"# Search Results: {query}\n\n"
+                parts = [f"# Search Results: {query}\n\n"]
                 for i, result in enumerate(web_results[:3], 1):
                     if 'error' not in result:
-                        formatted_results += f"## Result {i}\n"
-                        formatted_results += f"**Title:** {result.get('title', 'N/A')}\n"
-                        formatted_results += f"**Summary:** {result.get('snippet', 'No summary available')}\n"
-                        formatted_results += f"**URL:** {result.get('url', 'N/A')}\n\n"
+                        parts.append(f"## Result {i}\n")
+                        parts.append(f"**Title:** {result.get('title', 'N/A')}\n")
+                        parts.append(f"**Summary:** {result.get('snippet', 'No summary available')}\n")
+                        parts.append(f"**URL:** {result.get('url', 'N/A')}\n\n")
                 
-                return formatted_results
+                return "".join(parts)
             else:
                 return "This search tool is optimized for drug and medical information. Please use drug-related search terms."
                 
@@ -4,12 +4,11 @@ Uses entirely free APIs and services for location-based health intelligence
 """
 
 import requests
-import json
 import time
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Tuple, Any
 from urllib.parse import quote_plus
-from datetime import datetime, timedelta
+from datetime import datetime
 import re
 
 try:
@@ -23,6 +22,38 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_COORDINATE_PAIR_RE = re.compile(r'^-?\d+\.?\d*\s*,\s*-?\d+\.?\d*$')
+
+# Address fields that fill each administrative level, most specific name first
+_ADMIN_LEVEL_KEYS = {
+    'country': ('country', 'country_code'),
+    'state_province': ('state', 'state_district', 'region'),
+    'county_district': ('county', 'state_district', 'district'),
+    'city': ('city', 'town', 'village', 'municipality'),
+    'postal_code': ('postcode',),
+}
+
+# Lowercased names of the largest US cities
+_MAJOR_CITIES = frozenset({
+    'new york', 'los angeles', 'chicago', 'houston', 'phoenix',
+    'philadelphia', 'san antonio', 'san diego', 'dallas', 'san jose',
+})
+
+_US_COUNTRY_NAMES = frozenset({'united states', 'usa', 'us'})
+
+_HEALTH_AUTHORITIES = {
+    'united states': 'CDC (Centers for Disease Control and Prevention)',
+    'canada': 'Health Canada / Public Health Agency of Canada',
+    'united kingdom': 'UK Health Security Agency',
+    'australia': 'Department of Health',
+    'germany': 'Robert Koch Institute',
+    'france': 'Santé publique France',
+    'india': 'Ministry of Health and Family Welfare',
+    'china': 'National Health Commission',
+    'japan': 'Ministry of Health, Labour and Welfare',
+    'brazil': 'Ministry of Health',
+}
+
 
 class FreeGeoIntelligenceTools:
     """
@@ -79,8 +110,7 @@ class FreeGeoIntelligenceTools:
     
     def _is_coordinate_pair(self, text: str) -> bool:
         """Check if text looks like lat,lon coordinates"""
-        coord_pattern = r'^-?\d+\.?\d*\s*,\s*-?\d+\.?\d*$'
-        return bool(re.match(coord_pattern, text.strip()))
+        return bool(_COORDINATE_PAIR_RE.match(text.strip()))
     
     def _parse_coordinates(self, coord_text: str) -> Dict[str, Any]:
         """Parse coordinate string into structured data"""
@@ -139,17 +169,9 @@ class FreeGeoIntelligenceTools:
     
     def _extract_admin_levels(self, address_parts: Dict) -> Dict[str, str]:
         """Extract administrative boundary levels from address data"""
-        admin_mapping = {
-            'country': ['country', 'country_code'],
-            'state_province': ['state', 'state_district', 'region'],
-            'county_district': ['county', 'state_district', 'district'],
-            'city': ['city', 'town', 'village', 'municipality'],
-            'postal_code': ['postcode']
-        }
-        
         admin_levels = {}
         
-        for level, keys in admin_mapping.items():
+        for level, keys in _ADMIN_LEVEL_KEYS.items():
             for key in keys:
                 if key in address_parts:
                     admin_levels[level] = address_parts[key]
@@ -314,20 +336,7 @@ class FreeGeoIntelligenceTools:
     def _estimate_city_population(self, city_name: str) -> str:
         """Simple city population estimation"""
         # This is a very basic estimation - in production you'd use a proper database
-        major_cities = {
-            'new york': 'large_metro',
-            'los angeles': 'large_metro', 
-            'chicago': 'large_metro',
-            'houston': 'large_metro',
-            'phoenix': 'large_metro',
-            'philadelphia': 'large_metro',
-            'san antonio': 'large_metro',
-            'san diego': 'large_metro',
-            'dallas': 'large_metro',
-            'san jose': 'large_metro'
-        }
-        
-        if city_name in major_cities:
+        if city_name in _MAJOR_CITIES:
             return 'large_metro_1M+'
         elif len(city_name) > 10:  # Rough heuristic
             return 'medium_city_100K+'
@@ -336,21 +345,8 @@ class FreeGeoIntelligenceTools:
     
     def _get_health_authority(self, country: str) -> str:
         """Get primary health authority for country"""
-        health_authorities = {
-            'united states': 'CDC (Centers for Disease Control and Prevention)',
-            'canada': 'Health Canada / Public Health Agency of Canada',
-            'united kingdom': 'UK Health Security Agency',
-            'australia': 'Department of Health',
-            'germany': 'Robert Koch Institute',
-            'france': 'Santé publique France',
-            'india': 'Ministry of Health and Family Welfare',
-            'china': 'National Health Commission',
-            'japan': 'Ministry of Health, Labour and Welfare',
-            'brazil': 'Ministry of Health',
-        }
-        
         country_lower = country.lower()
-        return health_authorities.get(country_lower, f"{country} Ministry/Department of Health")
+        return _HEALTH_AUTHORITIES.get(country_lower, f"{country} Ministry/Department of Health")
 
 
 class FreeHealthDataSources:
@@ -386,7 +382,7 @@ class FreeHealthDataSources:
             state = location_context.get('administrative_levels', {}).get('state_province', '')
             country = location_context.get('administrative_levels', {}).get('country', '')
             
-            if state and country.lower() in ['united states', 'usa', 'us']:
+            if state and country.lower() in _US_COUNTRY_NAMES:
                 # Search for state-specific outbreak information
                 search_queries = [
                     f"CDC outbreak {state} current active",
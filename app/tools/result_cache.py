@@ -0,0 +1,68 @@
+"""
+Process-wide memo for tool call results.
+
+Agents working on the same task (e.g. a team reviewing one website) often make
+identical tool calls. ToolResultCache keeps recent results for a short TTL and
+single-flights concurrent calls with the same key, so only one of them does
+the network round-trip and the rest wait for its result.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+
+class ToolResultCache:
+    """Thread-safe TTL/LRU memo of tool results with single-flighted misses"""
+
+    def __init__(self, ttl: float = 600, maxsize: int = 128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._results: "OrderedDict[Hashable, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_or_call(
+        self, key: Hashable, call: Callable[[], str], cacheable: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        """
+        Return the cached result for key, or call() and cache its result.
+
+        Exceptions propagate to every caller waiting on the same key and are not cached.
+        Results for which cacheable returns False (e.g. tools that report failures as
+        text) are shared with waiting callers but not cached.
+        """
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._results.move_to_end(key)
+                return entry[1]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            result = call()
+            if cacheable is None or cacheable(result):
+                with self._lock:
+                    self._results[key] = (time.monotonic() + self.ttl, result)
+                    self._results.move_to_end(key)
+                    while len(self._results) > self.maxsize:
+                        self._results.popitem(last=False)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
@@ -0,0 +1,37 @@
+import threading
+
+import pytest
+
+from app.agents.agent_factory import AgentFactory
+from app.agents.enum.agent_enum import AgentType
+from app.agents.linkedin_writer_agent import LinkedInWriterAgent
+
+
+def test_get_agent_reuses_the_instance_within_a_thread():
+    agent = AgentFactory.get_agent(AgentType.LINKEDIN_WRITER_AGENT)
+    assert isinstance(agent, LinkedInWriterAgent)
+    assert AgentFactory.get_agent(AgentType.LINKEDIN_WRITER_AGENT) is agent
+
+    other = []
+    worker = threading.Thread(target=lambda: other.append(AgentFactory.get_agent(AgentType.LINKEDIN_WRITER_AGENT)))
+    worker.start()
+    worker.join()
+    assert other[0] is not agent
+
+
+def test_get_agent_rejects_unknown_types():
+    with pytest.raises(ValueError):
+        AgentFactory.get_agent(AgentType.MARKETING_COPYWRITER_AGENT)
+
+
+def test_get_agent_starts_each_request_in_a_fresh_session():
+    from agno.memory.v2.memory import Memory
+
+    agent = AgentFactory.get_agent(AgentType.LINKEDIN_WRITER_AGENT)
+    agent.linkedin_writer.session_id = "previous-request"
+    agent.linkedin_writer.memory = Memory()
+    agent.linkedin_writer.memory.runs = {"previous-request": ["earlier run"]}
+
+    assert AgentFactory.get_agent(AgentType.LINKEDIN_WRITER_AGENT) is agent
+    assert agent.linkedin_writer.session_id is None
+    assert agent.linkedin_writer.memory.runs == {}
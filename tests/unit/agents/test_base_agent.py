@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+
+from agno.agent import Agent
+from agno.models.base import Model
+from agno.models.response import ModelResponse
+
+from app.agents.base_agent import BaseAgent
+
+
+@dataclass
+class EchoModel(Model):
+    """Model that answers with the number of messages it was sent"""
+
+    id: str = "echo"
+    name: str = "Echo"
+    provider: str = "Echo"
+
+    def invoke(self, messages, **kwargs):
+        return len(messages)
+
+    async def ainvoke(self, messages, **kwargs):
+        return len(messages)
+
+    def invoke_stream(self, messages, **kwargs):
+        yield len(messages)
+
+    async def ainvoke_stream(self, messages, **kwargs):
+        yield len(messages)
+
+    def parse_provider_response(self, response):
+        return ModelResponse(role="assistant", content=f"{response} messages")
+
+    def parse_provider_response_delta(self, response):
+        return ModelResponse(role="assistant", content=f"{response} messages")
+
+
+class EchoAgent(BaseAgent):
+    def __init__(self):
+        self.writer = self._shared_agent("writer", self._create_writer)
+        self.team = {"member": self._shared_agent("member", self._create_writer)}
+
+    @staticmethod
+    def _create_writer():
+        return Agent(model=EchoModel(), add_history_to_messages=True)
+
+    def get_response(self, prompt: str) -> str:
+        return self._run_content(self.writer, prompt)
+
+
+def test_shared_agents_start_each_request_in_a_fresh_session():
+    first = EchoAgent()
+    assert first.get_response("Hello") == "1 messages"
+    first_session = first.writer.session_id
+
+    second = EchoAgent()
+    assert second.writer is first.writer
+    assert second.get_response("Hello again") == "1 messages"
+    assert second.writer.session_id != first_session
+    assert len(second.writer.memory.runs) == 1
+
+
+def test_new_sessions_resets_every_agent_the_instance_holds():
+    agent = EchoAgent()
+    agent.get_response("Hello")
+    agent.team["member"].run("Hi")
+    assert agent.writer.session_id and agent.team["member"].session_id
+
+    agent.new_sessions()
+
+    assert agent.writer.session_id is None and agent.team["member"].session_id is None
+    assert agent.get_response("Hello again") == "1 messages"
@@ -0,0 +1,92 @@
+import time
+
+from agno.tools.function import Function, FunctionCall
+
+from app.agents.cached_claude import CachedClaude, cached_prompt, shared_http_client
+
+
+def test_cached_claude_marks_system_prompt_for_caching():
+    """Test that the system prompt is sent as a cached content block"""
+    model = CachedClaude(id="claude-3-7-sonnet-20250219", max_tokens=1024)
+
+    request_kwargs = model._prepare_request_kwargs("You are a helpful writer")
+
+    assert request_kwargs["system"] == [
+        {"type": "text", "text": "You are a helpful writer", "cache_control": {"type": "ephemeral"}}
+    ]
+    assert request_kwargs["max_tokens"] == 1024
+
+
+def test_cached_claude_leaves_empty_system_prompt_untouched():
+    """Test that an empty system prompt is not wrapped in a cache block"""
+    model = CachedClaude(id="claude-3-7-sonnet-20250219")
+
+    assert model._prepare_request_kwargs("")["system"] == ""
+
+
+def test_cached_prompt_only_caches_the_static_prefix():
+    """Test that only the static prefix carries cache_control"""
+    content = cached_prompt("Static guidelines", "Topic: morning routines")
+
+    assert content[0] == {"type": "text", "text": "Static guidelines", "cache_control": {"type": "ephemeral"}}
+    assert content[1] == {"type": "text", "text": "Topic: morning routines"}
+
+
+def test_cached_claude_records_prompt_cache_reads():
+    """Test that Anthropic cache reads show up as the message's cached tokens"""
+    from anthropic.types import Usage
+    from agno.models.message import Message
+
+    message = Message(role="assistant")
+    usage = Usage(input_tokens=12, output_tokens=40, cache_read_input_tokens=2048, cache_creation_input_tokens=0)
+    CachedClaude(id="claude-3-7-sonnet-20250219")._add_usage_metrics_to_assistant_message(message, usage)
+
+    assert message.metrics.cached_tokens == 2048
+    assert message.metrics.input_tokens == 12
+
+
+def test_cached_claude_runs_tool_calls_concurrently():
+    """Test that several tool calls in one turn overlap instead of running back to back"""
+    def slow_search(query: str) -> str:
+        time.sleep(0.2)
+        return f"results for {query}"
+
+    function = Function.from_callable(slow_search)
+    calls = [
+        FunctionCall(function=function, arguments={"query": query}, call_id=str(i))
+        for i, query in enumerate(["wellness", "seasons", "sleep"])
+    ]
+    results = []
+
+    started = time.perf_counter()
+    list(CachedClaude(id="claude-3-7-sonnet-20250219").run_function_calls(calls, results))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5
+    assert [result.content for result in results] == [
+        "results for wellness", "results for seasons", "results for sleep"
+    ]
+
+
+def test_cached_claude_models_share_clients_and_http_pool():
+    """Test that models share an Anthropic client per API key and one HTTP/2 connection pool"""
+    first = CachedClaude(id="claude-3-7-sonnet-20250219", api_key="test-key").get_client()
+    second = CachedClaude(id="claude-3-5-haiku-latest", api_key="test-key").get_client()
+    custom = CachedClaude(id="claude-3-7-sonnet-20250219", api_key="test-key", client_params={"max_retries": 5}).get_client()
+
+    assert first is second
+    assert custom is not first
+    assert first._client is custom._client is shared_http_client()
+
+
+def test_shared_http_pool_is_closed_at_exit():
+    """Test that the HTTP/2 pool is built once and registered to close at interpreter exit"""
+    from unittest.mock import patch
+    from app.agents import cached_claude
+
+    with patch.object(cached_claude, "_http_client", None), patch.object(cached_claude.atexit, "register") as register:
+        client = cached_claude.shared_http_client()
+        assert cached_claude.shared_http_client() is client
+
+    register.assert_called_once_with(client.close)
+    client.close()
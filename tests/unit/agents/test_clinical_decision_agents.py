@@ -0,0 +1,104 @@
+from unittest.mock import Mock, patch
+
+from app.agents.cached_claude import CachedClaude
+from app.agents.clinical_decision_agents import ClinicalDecisionAgent
+
+
+def test_clinical_decision_team_uses_prompt_caching_models():
+    agent = ClinicalDecisionAgent()
+    team = agent.clinical_decision_team
+
+    assert isinstance(team.model, CachedClaude)
+    assert all(isinstance(member.model, CachedClaude) for member in team.team)
+
+
+def test_clinical_case_prompt_caches_the_static_brief():
+    agent = ClinicalDecisionAgent()
+    prompts = []
+
+    def fake_run(prompt, stream):
+        assert stream is False
+        prompts.append(prompt)
+        return Mock(content="## Recommendation")
+
+    with patch.object(agent, "clinical_decision_team") as team:
+        team.run.side_effect = fake_run
+        assert agent.get_response('{"age": 67, "clinical_question": "Start an anticoagulant?"}') == "## Recommendation"
+        agent.get_response("Hypertension in a 40 year old")
+
+    first, second = prompts
+    assert first[0]["cache_control"] == {"type": "ephemeral"}
+    assert first[0] == second[0]
+    assert '"age": 67' in first[1]["text"]
+    assert "Hypertension in a 40 year old" in second[1]["text"]
+
+
+def test_clinical_decision_agents_reuse_the_team_within_a_thread():
+    import threading
+
+    first = ClinicalDecisionAgent()
+    assert ClinicalDecisionAgent().clinical_decision_team is first.clinical_decision_team
+
+    other = []
+    worker = threading.Thread(target=lambda: other.append(ClinicalDecisionAgent().clinical_decision_team))
+    worker.start()
+    worker.join()
+    assert other[0] is not first.clinical_decision_team
+
+
+def test_clinical_decision_agents_use_per_role_max_tokens():
+    from app.agents import clinical_decision_agents
+
+    team = ClinicalDecisionAgent().clinical_decision_team
+    members = {member.name: member for member in team.team}
+    assert members["Patient Assessment Agent"].model.max_tokens == 3000
+    assert members["Clinical Documentation Agent"].model.max_tokens == 6000
+    assert team.model.max_tokens == 8000
+
+    with patch.object(clinical_decision_agents.settings, "CLINICAL_AGENT_MAX_TOKENS", {"safety_monitoring": 2000}):
+        tuned = ClinicalDecisionAgent(max_tokens={"patient_assessment": 1500})
+    members = {member.name: member for member in tuned.clinical_decision_team.team}
+    assert tuned.clinical_decision_team is not team
+    assert members["Patient Assessment Agent"].model.max_tokens == 1500
+    assert members["Safety Monitoring Agent"].model.max_tokens == 2000
+    assert members["Treatment Comparison Agent"].model.max_tokens == 4000
+
+
+def test_clinical_batch_warms_the_cache_then_runs_cases_concurrently():
+    import threading
+
+    agent = ClinicalDecisionAgent()
+    started = threading.Barrier(2, timeout=5)
+    finished = []
+    teams = []
+
+    def analyze(self, case):
+        teams.append(self.clinical_decision_team)
+        if case != "warm-up case":
+            assert finished, "later cases wait for the first one"
+            started.wait()
+        return f"report for {case}"
+
+    with patch.object(ClinicalDecisionAgent, "analyze_clinical_case", analyze):
+        reports = agent.get_responses_batch(
+            ["warm-up case", "case 2", "case 3"], concurrency=2, on_result=lambda index, report: finished.append(index)
+        )
+
+    assert reports == ["report for warm-up case", "report for case 2", "report for case 3"]
+    assert finished[0] == 0 and sorted(finished) == [0, 1, 2]
+    assert teams[0] is agent.clinical_decision_team
+    assert teams[1] is not teams[0] and teams[2] is not teams[0] and teams[1] is not teams[2]
+
+
+def test_clinical_case_returns_the_whole_streamed_report():
+    from agno.agent import RunResponse
+
+    agent = ClinicalDecisionAgent()
+    team = agent.clinical_decision_team
+    assert team.stream is True
+
+    def fake_run(*args, **kwargs):
+        yield from (RunResponse(content=chunk) for chunk in ["# Clinical ", "Decision ", "Report"])
+
+    with patch.object(team, "_run", side_effect=fake_run):
+        assert agent.get_response("Hypertension in a 40 year old") == "# Clinical Decision Report"
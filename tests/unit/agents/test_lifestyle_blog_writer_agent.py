@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from app.agents.lifestyle_blog_writer_agent import LifestyleBlogWriterAgent
 
 
@@ -10,6 +10,21 @@ def test_lifestyle_blog_writer_agent_initialization():
     assert agent.lifestyle_blog_writer is not None
 
 
+def test_lifestyle_blog_writer_agent_reuses_writer_per_thread():
+    """Test that instances share the writer Agent within a thread but not across threads"""
+    import threading
+    
+    first = LifestyleBlogWriterAgent()
+    second = LifestyleBlogWriterAgent()
+    assert first.lifestyle_blog_writer is second.lifestyle_blog_writer
+    
+    other_thread_writers = []
+    thread = threading.Thread(target=lambda: other_thread_writers.append(LifestyleBlogWriterAgent().lifestyle_blog_writer))
+    thread.start()
+    thread.join()
+    assert other_thread_writers[0] is not first.lifestyle_blog_writer
+
+
 def test_lifestyle_blog_writer_agent_get_response():
     """Test the get_response method with a simple prompt"""
     agent = LifestyleBlogWriterAgent()
@@ -245,13 +260,11 @@ def test_lifestyle_blog_writer_agent_method_specific_tests():
         mock_run.assert_called_once()
     
     # Test create_lifestyle_series
-    with patch.object(agent.lifestyle_blog_writer, 'run') as mock_run:
-        mock_run.return_value = iter([Mock(content="Series content")])
-        
+    with patch.object(agent, '_write_series_async', new=AsyncMock(return_value="Series content")) as mock_series:
         result = agent.create_lifestyle_series("Self-Care", 4, "wellness")
         
         assert result == "Series content"
-        mock_run.assert_called_once()
+        mock_series.assert_awaited_once()
     
     # Test create_seasonal_content
     with patch.object(agent.lifestyle_blog_writer, 'run') as mock_run:
@@ -272,7 +285,7 @@ def test_lifestyle_blog_writer_agent_method_specific_tests():
         mock_run.assert_called_once()
     
     # Test chat_lifestyle_advice
-    with patch.object(agent.lifestyle_blog_writer, 'run') as mock_run:
+    with patch.object(agent.lifestyle_blog_writer_fast, 'run') as mock_run:
         mock_run.return_value = iter([Mock(content="Chat response")])
         
         result = agent.chat_lifestyle_advice("How do I balance work and life?", [])
@@ -307,7 +320,7 @@ def test_lifestyle_blog_writer_agent_chat_context():
     """Test chat functionality with context"""
     agent = LifestyleBlogWriterAgent()
     
-    with patch.object(agent.lifestyle_blog_writer, 'run') as mock_run:
+    with patch.object(agent.lifestyle_blog_writer_fast, 'run') as mock_run:
         mock_run.return_value = iter([Mock(content="Chat response with context")])
         
         context = [
@@ -320,11 +333,185 @@ def test_lifestyle_blog_writer_agent_chat_context():
         assert result == "Chat response with context"
         mock_run.assert_called_once()
         
-        # Check that context was included in the prompt
-        call_args = mock_run.call_args[0][0]
-        assert "feeling stressed lately" in call_args
-        assert "work deadlines" in call_args
+        # Check that context was sent as conversation messages ending with the new turn
+        messages = mock_run.call_args.kwargs["messages"]
+        assert messages[0] == {"role": "user", "content": "I'm feeling stressed lately"}
+        assert messages[1]["role"] == "assistant"
+        assert messages[-1] == {"role": "user", "content": "It's mainly work deadlines"}
+
+
+def test_lifestyle_blog_writer_agent_chat_summarizes_older_turns():
+    """Test that long histories send a summary plus only the recent turns, summarizing once per window"""
+    agent = LifestyleBlogWriterAgent()
+    LifestyleBlogWriterAgent._generate.cache.clear()
+    LifestyleBlogWriterAgent._summarize_history.cache_clear()
+    summarizer = LifestyleBlogWriterAgent._shared_agent("history_summarizer", LifestyleBlogWriterAgent._create_history_summarizer)
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i}"}
+        for i in range(14)
+    ]
+    
+    with patch.object(summarizer, 'run') as mock_summarize, \
+            patch.object(agent.lifestyle_blog_writer_fast, 'run') as mock_run:
+        mock_summarize.return_value = Mock(content="User wants better sleep")
+        mock_run.side_effect = lambda *args, **kwargs: iter([Mock(content="Chat response")])
+        
+        agent.chat_lifestyle_advice("What should I try tonight?", history)
+        messages = mock_run.call_args.kwargs["messages"]
+        
+        assert messages[0] == {"role": "user", "content": "Summary of our earlier conversation:\nUser wants better sleep"}
+        assert messages[1] == {"role": "user", "content": "turn 6"}
+        assert len(messages) == 1 + 8 + 1
+        assert "turn 0" in mock_summarize.call_args.args[0]
+        
+        # One more exchange stays within the same window, so the summary is reused
+        agent.chat_lifestyle_advice("And tomorrow?", history + [
+            {"role": "user", "content": "What should I try tonight?"},
+            {"role": "assistant", "content": "Chat response"},
+        ])
+        mock_summarize.assert_called_once()
+    
+    LifestyleBlogWriterAgent._generate.cache.clear()
+
+
+def test_lifestyle_blog_writer_agent_chat_cache_depends_on_older_turns():
+    """Test that chats sharing their recent turns but not their earlier history do not share cached replies"""
+    agent = LifestyleBlogWriterAgent()
+    LifestyleBlogWriterAgent._generate.cache.clear()
+    LifestyleBlogWriterAgent._summarize_history.cache_clear()
+    summarizer = LifestyleBlogWriterAgent._shared_agent("history_summarizer", LifestyleBlogWriterAgent._create_history_summarizer)
+    recent = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i}"} for i in range(6, 14)]
+    sleep_history = [{"role": "user", "content": "I can't sleep"}] * 6 + recent
+    diet_history = [{"role": "user", "content": "I want to eat better"}] * 6 + recent
+    
+    with patch.object(summarizer, 'run') as mock_summarize, \
+            patch.object(agent.lifestyle_blog_writer_fast, 'run') as mock_run:
+        mock_summarize.side_effect = [Mock(content="User can't sleep"), Mock(content="User wants to eat better")]
+        mock_run.side_effect = [iter([Mock(content="Try a wind-down routine")]), iter([Mock(content="Try meal prepping")])]
+        
+        assert agent.chat_lifestyle_advice("What should I try tonight?", sleep_history) == "Try a wind-down routine"
+        assert agent.chat_lifestyle_advice("What should I try tonight?", diet_history) == "Try meal prepping"
+        assert agent.chat_lifestyle_advice("What should I try tonight?", sleep_history) == "Try a wind-down routine"
+        assert mock_run.call_count == 2
+    
+    LifestyleBlogWriterAgent._generate.cache.clear()
+
+def test_lifestyle_blog_writer_agent_series_async_writes_posts_concurrently():
+    """Test that the async series plans once and then writes one post per Agent"""
+    import asyncio
+    
+    agent = LifestyleBlogWriterAgent()
+    post_writers = [Mock(arun=AsyncMock(return_value=Mock(content=f"Post {n}"))) for n in range(1, 4)]
+    
+    with patch.object(agent.lifestyle_blog_writer, 'arun', new=AsyncMock(return_value=Mock(content="Outline"))) as mock_outline, \
+         patch.object(agent, '_create_lifestyle_blog_writer', side_effect=post_writers):
+        result = asyncio.run(agent.create_lifestyle_series_async("Self-Care", 3, "wellness"))
+    
+    assert result == "Outline\n\n---\n\nPost 1\n\n---\n\nPost 2\n\n---\n\nPost 3"
+    mock_outline.assert_awaited_once()
+    assert agent.lifestyle_blog_writer.model.max_tokens == 4096
+    for number, writer in enumerate(post_writers, start=1):
+        prompt = writer.arun.call_args[0][0]
+        assert f"Write post {number} of 3" in prompt[-1]["text"]
+        assert "Outline" in prompt[0]["text"]
+
+
+def test_lifestyle_blog_writer_agent_series_requests_use_the_concurrent_pipeline():
+    """Test that get_response writes series through the planned pipeline and caches the result"""
+    agent = LifestyleBlogWriterAgent()
+    LifestyleBlogWriterAgent._generate.cache.clear()
+    
+    with patch.object(agent, '_write_series_async', new=AsyncMock(side_effect=[RuntimeError("overloaded"), "Series"])) as mock_series, \
+         patch.object(agent.lifestyle_blog_writer, 'run') as mock_run:
+        assert "overloaded" in agent.get_response("Create a 3-part series about sleep")
+        assert agent.get_response("Create a 3-part series about sleep") == "Series"
+        assert agent.get_response("Create a 3-part series about sleep") == "Series"
+    
+    assert mock_series.await_count == 2
+    assert mock_series.await_args.args[1:] == (3, "wellness", "quality")
+    mock_run.assert_not_called()
+    LifestyleBlogWriterAgent._generate.cache.clear()
+
+
+def test_lifestyle_blog_writer_agent_streamed_series_use_the_concurrent_pipeline():
+    """Test that get_response_stream writes series through the planned pipeline and shares its cache entry"""
+    agent = LifestyleBlogWriterAgent()
+    LifestyleBlogWriterAgent._generate.cache.clear()
+    
+    with patch.object(agent, '_write_series_async', new=AsyncMock(return_value="Series")) as mock_series, \
+         patch.object(agent.lifestyle_blog_writer, 'run') as mock_run:
+        assert list(agent.get_response_stream("Create a 3-part series about sleep")) == ["Series"]
+        assert agent.get_response("Create a 3-part series about sleep") == "Series"
+    
+    assert mock_series.await_count == 1
+    mock_run.assert_not_called()
+    LifestyleBlogWriterAgent._generate.cache.clear()
+
+
+def test_lifestyle_blog_writer_agent_get_response_stream():
+    """Test that get_response_stream yields chunks and caches the full response"""
+    agent = LifestyleBlogWriterAgent()
+    LifestyleBlogWriterAgent._generate.cache.clear()
+    
+    with patch.object(agent.lifestyle_blog_writer_fast, 'run') as mock_run:
+        mock_run.return_value = iter([Mock(content="Part one. "), Mock(content=None), Mock(content="Part two.")])
+        
+        chunks = list(agent.get_response_stream("Write a short post about evening walks"))
+        
+        assert chunks == ["Part one. ", "Part two."]
+        mock_run.assert_called_once()
+        
+        # A repeated request is served from the cache in a single chunk
+        chunks = list(agent.get_response_stream("Write a short post about evening walks"))
+        
+        assert chunks == ["Part one. Part two."]
+        mock_run.assert_called_once()
+    
+    LifestyleBlogWriterAgent._generate.cache.clear()
+
+
+
+def test_lifestyle_blog_writer_agent_bounds_max_tokens_by_length():
+    """Test that the output budget follows the requested post length"""
+    agent = LifestyleBlogWriterAgent()
+    LifestyleBlogWriterAgent._generate.cache.clear()
+    budgets = []
+    
+    def recorder(writer):
+        def record_budget(*args, **kwargs):
+            budgets.append(writer.model.max_tokens)
+            return iter([Mock(content="Post")])
+        return record_budget
+    
+    with patch.object(agent.lifestyle_blog_writer, 'run', side_effect=recorder(agent.lifestyle_blog_writer)), \
+            patch.object(agent.lifestyle_blog_writer_fast, 'run', side_effect=recorder(agent.lifestyle_blog_writer_fast)):
+        agent.generate_lifestyle_blog_post("Evening walks", length="short")
+        agent.generate_lifestyle_blog_post("Evening walks", length="long")
+        agent.create_lifestyle_guide("Evening walks")
+    
+    assert budgets == [1800, 5200, 4096]
+    LifestyleBlogWriterAgent._generate.cache.clear()
+
 
+def test_lifestyle_blog_writer_agent_routes_model_tiers():
+    """Test that chat and short posts use the fast model unless a tier is requested"""
+    agent = LifestyleBlogWriterAgent()
+    LifestyleBlogWriterAgent._generate.cache.clear()
+    
+    assert agent.lifestyle_blog_writer_fast.model.id == "claude-3-5-haiku-latest"
+    assert agent.lifestyle_blog_writer.model.id == "claude-3-7-sonnet-20250219"
+    
+    with patch.object(agent.lifestyle_blog_writer, 'run') as mock_quality, \
+            patch.object(agent.lifestyle_blog_writer_fast, 'run') as mock_fast:
+        mock_quality.side_effect = lambda *args, **kwargs: iter([Mock(content="Quality")])
+        mock_fast.side_effect = lambda *args, **kwargs: iter([Mock(content="Fast")])
+        
+        assert agent.chat_lifestyle_advice("How do I rest more?") == "Fast"
+        assert agent.generate_lifestyle_blog_post("Evening walks", length="short") == "Fast"
+        assert agent.generate_lifestyle_blog_post("Evening walks", length="medium") == "Quality"
+        assert agent.generate_lifestyle_blog_post("Evening walks", length="short", model_tier="quality") == "Quality"
+        assert agent.create_lifestyle_guide("Evening walks", model_tier="fast") == "Fast"
+    LifestyleBlogWriterAgent._generate.cache.clear()
 
 # Integration test class for when you want to test with real API calls
 class TestLifestyleBlogWriterAgentIntegration:
@@ -75,6 +75,77 @@ def test_linkedin_writer_agent_optimization_detection():
         mock_optimize.assert_called_once()
 
 
+def test_linkedin_writer_agent_skips_empty_chunks():
+    """Test that None content chunks do not break the collected response"""
+    agent = LinkedInWriterAgent()
+    
+    with patch.object(agent.linkedin_writer, 'run') as mock_run:
+        mock_run.return_value = iter([Mock(content="First line. "), Mock(content=None), Mock(content="#Craft")])
+        
+        result = agent.generate_linkedin_post("Software craftsmanship", "insight")
+        
+        assert result == "First line. #Craft"
+
+
+def test_linkedin_writer_agent_series_async_writes_posts_concurrently():
+    """Test that the async series plans once and then writes one post per Agent"""
+    import asyncio
+    from unittest.mock import AsyncMock
+    
+    agent = LinkedInWriterAgent()
+    post_writers = [Mock(arun=AsyncMock(return_value=Mock(content=f"Post {n}"))) for n in range(1, 4)]
+    
+    with patch.object(agent.linkedin_writer, 'arun', new=AsyncMock(return_value=Mock(content="Outline"))) as mock_outline, \
+         patch.object(agent, '_create_linkedin_writer', side_effect=post_writers):
+        result = asyncio.run(agent.create_content_series_async("Clean code", 3))
+    
+    assert result == "Outline\n\n---\n\nPost 1\n\n---\n\nPost 2\n\n---\n\nPost 3"
+    mock_outline.assert_awaited_once()
+    for number, writer in enumerate(post_writers, start=1):
+        prompt = writer.arun.call_args[0][0]
+        assert f"Write post {number}/3" in prompt[-1]["text"]
+        assert "Outline" in prompt[0]["text"]
+
+
+def test_linkedin_writer_agent_series_runs_the_concurrent_pipeline():
+    """Test that the sync series method writes posts through the async pipeline"""
+    from unittest.mock import AsyncMock
+    
+    agent = LinkedInWriterAgent()
+    
+    with patch.object(agent, 'create_content_series_async', new=AsyncMock(return_value="Series")) as mock_series, \
+         patch.object(agent.linkedin_writer, 'run') as mock_run:
+        assert agent.get_response("Create a series about clean code") == "Series"
+    
+    mock_series.assert_awaited_once_with("Create a series about clean code", 5)
+    mock_run.assert_not_called()
+
+
+def test_linkedin_writer_agent_get_response_stream():
+    """Test that get_response_stream yields chunks as they arrive"""
+    agent = LinkedInWriterAgent()
+    
+    with patch.object(agent.linkedin_writer, 'run') as mock_run:
+        mock_run.return_value = iter([Mock(content="Hook line. "), Mock(content=None), Mock(content="#AI")])
+        
+        chunks = list(agent.get_response_stream("Share a tip about code review"))
+        
+        assert chunks == ["Hook line. ", "#AI"]
+        assert 'Post type: tip' in mock_run.call_args[0][0][-1]["text"]
+
+
+def test_linkedin_writer_agent_get_response_stream_error():
+    """Test that streaming errors are reported as a final chunk"""
+    agent = LinkedInWriterAgent()
+    
+    with patch.object(agent.linkedin_writer, 'run') as mock_run:
+        mock_run.side_effect = Exception("API Error")
+        
+        chunks = list(agent.get_response_stream("Create a post about AI"))
+        
+        assert "API Error" in chunks[-1]
+
+
 # Integration test class for when you want to test with real API calls
 class TestLinkedInWriterAgentIntegration:
     """Integration tests that require actual API calls - run these manually or in CI"""
@@ -0,0 +1,109 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app.agents.Location_Specific_Agent import _REPORT_CACHE, LocationSpecificAgent
+
+
+@pytest.fixture(autouse=True)
+def clear_report_cache():
+    _REPORT_CACHE.clear()
+    yield
+    _REPORT_CACHE.clear()
+
+
+def test_epidemiological_and_resource_analyses_run_concurrently():
+    agent = LocationSpecificAgent()
+    both_started = threading.Barrier(2, timeout=5)
+    risk_inputs = []
+
+    def epidemiological(geographic_data, query_type, patient_context):
+        both_started.wait()
+        return {"enhanced_analysis": f"outbreaks near {geographic_data['city']}"}
+
+    def resources(geographic_data, patient_context, emergency_level):
+        both_started.wait()
+        return {"resource_analysis": f"{emergency_level} care in {geographic_data['city']}"}
+
+    def risk(geographic_data, epidemiological_data, healthcare_resources, patient_context):
+        risk_inputs.append((epidemiological_data, healthcare_resources))
+        return {"risk_assessment": "low"}
+
+    with patch.object(agent, "_run_geographic_analysis", return_value={"city": "Pune"}), \
+            patch.object(agent, "_run_epidemiological_analysis", side_effect=epidemiological), \
+            patch.object(agent, "_run_healthcare_resource_analysis", side_effect=resources), \
+            patch.object(agent, "_run_risk_assessment_analysis", side_effect=risk), \
+            patch.object(agent, "_generate_comprehensive_report", return_value="# Report"):
+        assert agent.analyze_location_health_intelligence("Pune", emergency_level="urgent") == "# Report"
+
+    assert risk_inputs == [(
+        {"enhanced_analysis": "outbreaks near Pune"},
+        {"resource_analysis": "urgent care in Pune"},
+    )]
+
+
+def test_location_reports_are_cached_by_normalized_request():
+    agent = LocationSpecificAgent()
+    epidemiology = [{"error": "CDC feed unavailable"}, {"enhanced_analysis": "none"}, {"enhanced_analysis": "none"}]
+
+    with patch.object(agent, "_run_geographic_analysis", return_value={"city": "Pune"}), \
+            patch.object(agent, "_run_epidemiological_analysis", side_effect=epidemiology), \
+            patch.object(agent, "_run_healthcare_resource_analysis", return_value={}), \
+            patch.object(agent, "_run_risk_assessment_analysis", return_value={}), \
+            patch.object(agent, "_generate_comprehensive_report", side_effect=["# Partial", "# Report", "# Urgent"]) as report:
+        assert agent.get_response("Pune, India") == "# Partial"
+        assert agent.get_response("Pune, India") == "# Report"
+        assert agent.get_response("  pune,   INDIA ") == "# Report"
+        assert agent.get_response('{"location": "Pune, India", "emergency_level": "urgent"}') == "# Urgent"
+
+    assert report.call_count == 3
+
+
+def test_location_agents_reuse_their_agents_within_a_thread():
+    first = LocationSpecificAgent()
+    second = LocationSpecificAgent()
+    assert second.main_agent is first.main_agent
+    assert second.risk_assessment_sub_agent is first.risk_assessment_sub_agent
+
+    other = []
+    worker = threading.Thread(target=lambda: other.append(LocationSpecificAgent().main_agent))
+    worker.start()
+    worker.join()
+    assert other[0] is not first.main_agent
+
+
+def test_report_outline_is_sent_as_instructions_not_per_request():
+    from app.agents.Location_Specific_Agent import REPORT_OUTLINE
+
+    agent = LocationSpecificAgent()
+    assert REPORT_OUTLINE in agent.main_agent.instructions
+
+    with patch.object(agent, "main_agent") as main_agent:
+        main_agent.run.return_value = iter([])
+        agent._generate_comprehensive_report("Pune", None, "routine", "comprehensive", {"city": "Pune"}, {}, {}, {})
+
+    prompt = main_agent.run.call_args.args[0]
+    assert '{"city": "Pune"}' in prompt
+    assert "## Executive Summary" not in prompt
+
+
+def test_location_analyses_start_the_sub_agents_on_fresh_sessions():
+    agent = LocationSpecificAgent()
+    agent.epidemiological_sub_agent.session_id = "earlier-report"
+    agent.main_agent.session_id = "earlier-report"
+    sessions = []
+
+    def epidemiological(geographic_data, query_type, patient_context):
+        sessions.append(agent.epidemiological_sub_agent.session_id)
+        return {}
+
+    with patch.object(agent, "_run_geographic_analysis", return_value={"city": "Pune"}), \
+            patch.object(agent, "_run_epidemiological_analysis", side_effect=epidemiological), \
+            patch.object(agent, "_run_healthcare_resource_analysis", return_value={}), \
+            patch.object(agent, "_run_risk_assessment_analysis", return_value={}), \
+            patch.object(agent, "_generate_comprehensive_report", return_value="# Report"):
+        agent.get_response("Pune, India")
+
+    assert sessions == [None]
+    assert agent.main_agent.session_id is None
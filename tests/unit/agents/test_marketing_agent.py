@@ -74,6 +74,18 @@ async def run_marketing_agent(
     return {"response": clean_response}
 
 
+@pytest.fixture(autouse=True)
+def no_website_crawl():
+    from unittest.mock import patch
+    from app.agents import marketing_agents
+
+    async def fake_crawl(url):
+        return f"Homepage of {url}"
+
+    with patch.object(marketing_agents.MarketingAgent, "_crawl_website", side_effect=fake_crawl):
+        yield
+
+
 @pytest.fixture
 def test_client():
     client = TestClient(app)
@@ -114,3 +126,391 @@ def test_run_marketing_agent_email_service_error(test_client_with_email_error):
     response = test_client_with_email_error.post("/run-marketing-agent", json=payload)
     assert response.status_code == 500
     assert response.json() == {"detail": "Failed to send email"}
+
+
+def test_marketing_review_runs_independent_stages_concurrently():
+    from unittest.mock import patch
+    import asyncio
+    from app.agents import marketing_agents
+
+    agent = marketing_agents.MarketingAgent()
+    running = 0
+    peak = {}
+    calls = []
+
+    async def fake_arun(member, prompt):
+        nonlocal running
+        running += 1
+        peak[member.name] = running
+        calls.append((member.name, prompt))
+        await asyncio.sleep(0.01)
+        running -= 1
+        if member.name == "Testing & Iteration Agent":
+            raise RuntimeError("boom")
+        return f"{member.name} report"
+
+    with patch.object(marketing_agents.MarketingAgent, "_arun_content", side_effect=fake_arun):
+        report = agent.review_marketing_website("https://example.com")
+
+    order = [name for name, _ in calls]
+    assert order[-1] == "Product Manager Agent"
+    assert order.index("Copywriting Agent") == 6
+    assert set(order[7:10]) == {"Technical Copy Variation Agent", "Emotional Copy Variation Agent", "Conversion Pathway Agent"}
+    assert peak["Conversion Pathway Agent"] == 3
+    # The six analysis agents overlap; later stages wait for the earlier ones
+    assert max(peak[name] for name in order[:6]) == 6
+    assert peak["Copywriting Agent"] == 1
+    copy_prompt = "".join(block["text"] for block in dict(calls)["Copywriting Agent"])
+    assert "Website Analyzer Agent report" in copy_prompt
+    assert "Testing & Iteration Agent failed: boom" in copy_prompt
+    assert "Copywriting Agent report" in dict(calls)["Product Manager Agent"][-1]["text"]
+    assert report.startswith("# Marketing Website Review: https://example.com")
+    assert report.rstrip().endswith("## TODOS\n\nProduct Manager Agent report")
+
+
+def test_marketing_review_caps_concurrent_agent_calls():
+    from unittest.mock import patch
+    import asyncio
+    from app.agents import marketing_agents
+
+    agent = marketing_agents.MarketingAgent()
+    running = 0
+    peak = 0
+
+    async def fake_arun(member, prompt):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return f"{member.name} report"
+
+    with patch.object(marketing_agents.MarketingAgent, "_arun_content", side_effect=fake_arun), \
+            patch.object(marketing_agents.settings, "MARKETING_AGENT_CONCURRENCY", 2), \
+            patch.object(marketing_agents.asyncio, "Semaphore", wraps=asyncio.Semaphore) as semaphore:
+        agent.review_marketing_website("https://example.com", force_refresh=True)
+
+    assert peak == 2
+    # One bound is shared by every stage of the review
+    semaphore.assert_called_once_with(2)
+
+
+def test_marketing_review_caches_static_prompts():
+    from app.agents import marketing_agents
+    from app.agents.cached_claude import CachedClaude
+
+    agent = marketing_agents.MarketingAgent()
+    assert all(isinstance(member.model, CachedClaude) for member in agent.marketing_website_team.values())
+
+    prompt = agent._review_prompt("https://example.com")
+    assert prompt[0]["cache_control"] == {"type": "ephemeral"}
+    assert "https://example.com" not in prompt[0]["text"]
+    assert "https://example.com" in prompt[1]["text"]
+    assert prompt[0] == agent._review_prompt("https://another.example")[0]
+
+
+def test_marketing_agents_reuse_the_team_within_a_thread():
+    import threading
+    from app.agents import marketing_agents
+
+    first = marketing_agents.MarketingAgent()
+    second = marketing_agents.MarketingAgent()
+    assert first.marketing_website_team is second.marketing_website_team
+
+    other = []
+    worker = threading.Thread(target=lambda: other.append(marketing_agents.MarketingAgent().marketing_website_team))
+    worker.start()
+    worker.join()
+    assert other[0] is not first.marketing_website_team
+
+
+def test_marketing_team_members_do_not_stream():
+    from app.agents import marketing_agents
+
+    team = marketing_agents.MarketingAgent().marketing_website_team
+    assert all(member.stream is False for member in team.values())
+
+
+def test_marketing_reviews_start_the_shared_team_on_fresh_sessions():
+    from unittest.mock import patch
+    from agno.memory.v2.memory import Memory
+    from app.agents import marketing_agents
+
+    agent = marketing_agents.MarketingAgent()
+    product_manager = agent.marketing_website_team["product_manager"]
+    product_manager.session_id = "earlier-review"
+    product_manager.memory = Memory()
+    product_manager.memory.runs = {"earlier-review": ["earlier review"]}
+    sessions = []
+
+    async def fake_arun(member, prompt):
+        if member is product_manager:
+            sessions.append((member.session_id, dict(member.memory.runs)))
+        return f"{member.name} report"
+
+    with patch.object(marketing_agents.MarketingAgent, "_arun_content", side_effect=fake_arun):
+        agent.review_marketing_website("https://example.com", force_refresh=True)
+        product_manager.session_id = "earlier-review"
+        marketing_agents.MarketingAgent()
+
+    assert sessions == [(None, {})]
+    assert product_manager.session_id is None
+
+
+def test_marketing_review_is_cached_per_url():
+    from unittest.mock import patch
+    from app.agents import marketing_agents
+
+    marketing_agents._REVIEW_CACHE.clear()
+    agent = marketing_agents.MarketingAgent()
+    calls = []
+
+    async def fake_arun(member, prompt):
+        calls.append(member.name)
+        return f"{member.name} report"
+
+    with patch.object(marketing_agents.MarketingAgent, "_arun_content", side_effect=fake_arun):
+        first = agent.run_marketing_agent("https://example.com")
+        assert agent.run_marketing_agent("https://example.com") == first
+        assert len(calls) == 11
+
+        agent.run_marketing_agent("https://example.org")
+        assert len(calls) == 22
+
+        assert agent.run_marketing_agent("https://example.com", force_refresh=True) == first
+        assert len(calls) == 33
+
+    marketing_agents._REVIEW_CACHE.clear()
+
+
+def test_marketing_review_can_be_awaited_from_a_running_loop():
+    from unittest.mock import patch
+    import asyncio
+    from app.agents import marketing_agents
+
+    marketing_agents._REVIEW_CACHE.clear()
+    agent = marketing_agents.MarketingAgent()
+
+    async def fake_arun(member, prompt):
+        return f"{member.name} report"
+
+    async def review():
+        # Awaited directly: the sync wrapper's asyncio.run would fail inside a running loop
+        return await agent.review_marketing_website_async("https://example.com")
+
+    with patch.object(marketing_agents.MarketingAgent, "_arun_content", side_effect=fake_arun):
+        report = asyncio.run(review())
+
+    assert report.startswith("# Marketing Website Review: https://example.com")
+    marketing_agents._REVIEW_CACHE.clear()
+
+
+def test_marketing_review_crawls_the_website_once_for_the_team():
+    from unittest.mock import patch
+    from app.agents import marketing_agents
+    from app.tools.cached_crawl4ai import CachedCrawl4aiTools
+
+    marketing_agents._REVIEW_CACHE.clear()
+    agent = marketing_agents.MarketingAgent()
+    prompts = {}
+
+    async def fake_arun(member, prompt):
+        prompts[member.name] = prompt
+        return f"{member.name} report"
+
+    with patch.object(marketing_agents.MarketingAgent, "_arun_content", side_effect=fake_arun):
+        agent.review_marketing_website("https://example.com", force_refresh=True)
+
+    assert marketing_agents.MarketingAgent._crawl_website.call_count == 1
+    # The product manager plans from the team's summaries, not the page
+    assert all("<website_content>" not in block["text"] for block in prompts.pop("Product Manager Agent"))
+    for prompt in prompts.values():
+        assert prompt[2]["text"] == "<website_content>\nHomepage of https://example.com\n</website_content>"
+        assert prompt[2]["cache_control"] == {"type": "ephemeral"}
+
+    team = agent.marketing_website_team
+    for name in ("copywriting", "copy_variation_technical", "copy_variation_emotional", "conversion_pathway"):
+        assert not any(isinstance(tool, CachedCrawl4aiTools) for tool in team[name].tools or [])
+    assert all(
+        tool.max_length == marketing_agents._CRAWL_MAX_LENGTH
+        for member in team.values()
+        for tool in member.tools or []
+        if isinstance(tool, CachedCrawl4aiTools)
+    )
+    marketing_agents._REVIEW_CACHE.clear()
+
+
+def test_marketing_agents_use_per_role_max_tokens():
+    from unittest.mock import patch
+    from app.agents import marketing_agents
+
+    agent = marketing_agents.MarketingAgent()
+    team = agent.marketing_website_team
+    assert team["seo_keyword"].model.max_tokens == 3000
+    assert team["copywriting"].model.max_tokens == 8000
+    assert team["product_manager"].model.max_tokens == 5000
+
+    with patch.object(marketing_agents.settings, "MARKETING_AGENT_MAX_TOKENS", {"seo_keyword": 1500}):
+        assert agent.create_seo_keyword_agent().model.max_tokens == 1500
+        assert agent.create_testing_agent().model.max_tokens == 4000
+
+
+def test_marketing_team_storage_uses_shared_wal_engine(tmp_path):
+    from app.db.agent_storage import agent_storage_engine
+
+    db_file = str(tmp_path / "agents.db")
+    engine = agent_storage_engine(db_file)
+    assert agent_storage_engine(db_file) is engine
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert connection.exec_driver_sql("PRAGMA cache_size").scalar() == -65536
+
+    from app.agents import marketing_agents
+
+    team = marketing_agents.MarketingAgent().marketing_website_team
+    assert team["product_manager"].storage.db_engine is agent_storage_engine(marketing_agents.settings.AGENT_STORAGE)
+
+
+def test_agent_storage_reads_from_readers_and_serializes_writes(tmp_path):
+    import threading
+    from agno.storage.session.agent import AgentSession
+    from app.db.agent_storage import WalSqliteStorage, agent_storage_engine, agent_storage_reader_engine
+
+    db_file = str(tmp_path / "agents.db")
+    storage = WalSqliteStorage(table_name="agent_sessions", db_file=db_file, mode="agent")
+    storage.create()
+    with agent_storage_reader_engine(db_file).connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA query_only").scalar() == 1
+    assert agent_storage_engine(db_file).pool.size() == 1
+
+    def save(session_id):
+        storage.upsert(AgentSession(session_id=session_id, agent_id="agent", user_id="user"))
+
+    writers = [threading.Thread(target=save, args=(f"session-{i}",)) for i in range(10)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+
+    assert len(storage.get_all_session_ids()) == 10
+    with agent_storage_engine(db_file).connect():
+        # The only writer connection is checked out, so this read must go to a reader
+        assert storage.read("session-3").agent_id == "agent"
+    storage.delete_session("session-3")
+    assert storage.read("session-3") is None
+
+
+def test_agent_storage_schema_upgrades_run_on_the_writer(tmp_path):
+    import sqlite3
+    from app.db.agent_storage import WalSqliteStorage
+
+    db_file = str(tmp_path / "agents.db")
+    with sqlite3.connect(db_file) as connection:
+        connection.execute("CREATE TABLE agent_sessions (session_id TEXT PRIMARY KEY, agent_id TEXT)")
+
+    storage = WalSqliteStorage(table_name="agent_sessions", db_file=db_file, mode="agent", auto_upgrade_schema=True)
+    storage.upgrade_schema()
+
+    assert storage._schema_up_to_date
+
+
+def test_marketing_review_brief_is_normalised_and_stable():
+    import hashlib
+    from app.agents import marketing_agents
+
+    prefix = marketing_agents.MarketingAgent.REVIEW_PREFIX
+    assert prefix.startswith("Please conduct a complete marketing review")
+    assert prefix.endswith("three complete variations of new website copy.")
+    assert all(line == line.strip() for line in prefix.splitlines())
+
+    first = marketing_agents.MarketingAgent()._review_prompt("https://example.com")
+    second = marketing_agents.MarketingAgent()._review_prompt("https://example.com")
+    digest = lambda prompt: hashlib.sha256(repr(prompt).encode("utf-8")).hexdigest()
+    assert digest(first) == digest(second)
+    assert first[1]["text"] == "Website to review: https://example.com"
+
+
+def test_marketing_agent_system_prompts_are_stable_across_constructions():
+    import threading
+    from app.agents import marketing_agents
+
+    team = marketing_agents.MarketingAgent().marketing_website_team
+    built = []
+    worker = threading.Thread(target=lambda: built.append(marketing_agents.MarketingAgent().marketing_website_team))
+    worker.start()
+    worker.join()
+
+    for name, member in team.items():
+        other = built[0][name]
+        member.update_model(session_id="first")
+        other.update_model(session_id="second")
+        first = member.get_system_message("first").content
+        second = other.get_system_message("second").content
+        assert hash(first) == hash(second), name
+        assert list(member.model.get_functions()) == list(other.model.get_functions()), name
+
+
+def test_marketing_review_streams_sections_as_stages_finish():
+    from unittest.mock import patch
+    from app.agents import marketing_agents
+
+    marketing_agents._REVIEW_CACHE.clear()
+    agent = marketing_agents.MarketingAgent()
+    started = []
+
+    async def fake_arun(member, prompt):
+        started.append(member.name)
+        return f"{member.name} report"
+
+    with patch.object(marketing_agents.MarketingAgent, "_arun_content", side_effect=fake_arun):
+        stream = agent.get_response_stream("https://example.com")
+        assert next(stream) == "# Marketing Website Review: https://example.com"
+        assert started == []
+        assert next(stream) == "\n\n## Website Analyzer Agent\n\nWebsite Analyzer Agent report"
+        assert "Product Manager Agent" not in started
+        chunks = ["# Marketing Website Review: https://example.com", "\n\n## Website Analyzer Agent\n\nWebsite Analyzer Agent report"]
+        chunks.extend(stream)
+
+        assert len(chunks) == 12
+        assert chunks[-1] == "\n\n## TODOS\n\nProduct Manager Agent report"
+        assert "".join(chunks) == agent.review_marketing_website("https://example.com", force_refresh=True)
+
+    # The streamed review is cached like a regular one
+    assert agent.review_marketing_website("https://example.com") == "".join(chunks)
+    marketing_agents._REVIEW_CACHE.clear()
+
+
+def test_product_manager_plans_from_merged_json_summaries():
+    import json
+    from unittest.mock import patch
+    from app.agents import marketing_agents
+
+    marketing_agents._REVIEW_CACHE.clear()
+    agent = marketing_agents.MarketingAgent()
+    team = agent.marketing_website_team
+    assert marketing_agents._STRUCTURED_OUTPUT_INSTRUCTION in team["seo_keyword"].instructions
+    assert marketing_agents._STRUCTURED_OUTPUT_INSTRUCTION not in team["product_manager"].instructions
+    prompts = {}
+
+    async def fake_arun(member, prompt):
+        prompts[member.name] = prompt
+        if member.name == "SEO Keyword Agent":
+            return "SEO report\n\n```json\n" + json.dumps(
+                {"findings": [{"title": "No meta descriptions", "priority": "high", "effort": "small"}], "actions": []}
+            ) + "\n```"
+        return f"{member.name} report"
+
+    with patch.object(marketing_agents.MarketingAgent, "_arun_content", side_effect=fake_arun):
+        report = agent.review_marketing_website("https://example.com", force_refresh=True)
+
+    assert "## SEO Keyword Agent\n\nSEO report\n\n## " in report
+    assert "```json" not in report
+    planning_text = prompts["Product Manager Agent"][-1]["text"]
+    summary = json.loads(planning_text.split("```json\n")[1].split("\n```")[0])
+    assert summary["findings"] == [
+        {"title": "No meta descriptions", "priority": "high", "effort": "small", "source": "SEO Keyword Agent"}
+    ]
+    assert "SEO report" not in planning_text
+    assert '<report agent="Website Analyzer Agent">' in planning_text
+    marketing_agents._REVIEW_CACHE.clear()
@@ -2,9 +2,19 @@
 Test file for Medication Interaction Agent
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from app.agents.medication_interaction_agent import MedicationInteractionAgent
+from app.agents.medication_interaction_agent import (
+    NOT_ENOUGH_DRUGS_REPORT,
+    MedicationInteractionAgent,
+    _REPORT_CACHE,
+    _drug_candidates,
+    _search_candidates,
+    _too_few_drugs,
+    clear_drug_search_cache,
+)
 from app.agents.enum.agent_enum import AgentType
 
 
@@ -12,6 +22,8 @@ class TestMedicationInteractionAgent:
     
     def setup_method(self):
         """Setup test fixtures"""
+        clear_drug_search_cache()
+        _REPORT_CACHE.clear()
         with patch('app.agents.medication_interaction_agent.settings') as mock_settings:
             mock_settings.AGENT_STORAGE = "test_storage.db"
             self.agent = MedicationInteractionAgent()
@@ -58,20 +70,64 @@ class TestMedicationInteractionAgent:
         assert alert_agent.name == "Alert Generation & Recommendation Agent"
         assert "clinical communication specialist" in alert_agent.role
     
-    def test_might_be_drug_method(self):
+    def test_agents_reuse_the_team_within_a_thread(self):
+        """Test the four-agent team is built once per worker thread, not per request"""
+        import threading
+
+        assert MedicationInteractionAgent().medication_team is self.agent.medication_team
+
+        other = []
+        worker = threading.Thread(target=lambda: other.append(MedicationInteractionAgent().medication_team))
+        worker.start()
+        worker.join()
+        assert other[0] is not self.agent.medication_team
+
+    def test_drug_search_tool_is_shared_and_built_lazily(self):
+        """Test agents share one search tool, built on first use"""
+        from app.agents import medication_interaction_agent as module
+
+        with patch.object(module, '_drug_search_tool', module._UNSET), \
+                patch.object(module, 'FreeDrugSearchTool') as mock_tool:
+            first = MedicationInteractionAgent()
+            second = MedicationInteractionAgent()
+            mock_tool.assert_not_called()
+
+            assert first.drug_search_tool is second.drug_search_tool
+            mock_tool.assert_called_once_with(max_results=5)
+
+    def test_team_storage_uses_shared_wal_engine(self):
+        """Test session history goes through the shared WAL-mode storage engine"""
+        from app.db.agent_storage import WalSqliteStorage, agent_storage_engine
+
+        storage = self.agent.medication_team["alert_generator"].storage
+        assert isinstance(storage, WalSqliteStorage)
+        assert storage.db_engine is agent_storage_engine(self.agent.AGENT_STORAGE)
+
+    def test_drug_candidates(self):
         """Test the drug detection heuristic"""
-        # Should return True for potential drug names
-        assert self.agent._might_be_drug("aspirin") == True
-        assert self.agent._might_be_drug("metformin") == True
-        
-        # Should return False for common words
-        assert self.agent._might_be_drug("patient") == False
-        assert self.agent._might_be_drug("taking") == False
-        assert self.agent._might_be_drug("drug") == False
-        
-        # Should return False for short words
-        assert self.agent._might_be_drug("is") == False
-        assert self.agent._might_be_drug("the") == False
+        candidates = _drug_candidates("Is the patient taking Aspirin, metformin and aspirin? Check the drug interaction")
+
+        # Potential drug names are kept once, in order, even next to punctuation
+        assert candidates == ["Aspirin", "metformin"]
+
+        # Common words and short words are skipped
+        assert _drug_candidates("patient taking drug is the") == []
+
+        # The scan stops once limit distinct candidates are found
+        assert _drug_candidates("warfarin Warfarin aspirin metformin", limit=2) == ["warfarin", "aspirin"]
+
+    def test_search_candidates_keep_drug_like_names(self):
+        """Test only known drugs and drug-class suffixes are searched, capped at MAX_DRUG_SEARCHES"""
+        prompt = "Elderly patient taking Lisinopril, warfarin and atorvastatin daily since January, check bleeding"
+        assert _search_candidates(prompt) == ["Lisinopril", "warfarin", "atorvastatin"]
+
+        many = "metoprolol losartan omeprazole sertraline amlodipine furosemide ibuprofen"
+        assert _search_candidates(many) == ["metoprolol", "losartan", "omeprazole", "sertraline", "amlodipine"]
+
+    def test_search_candidates_keep_brand_names(self):
+        """Test common brand names are searched even without a generic drug-class suffix"""
+        prompt = "Can I take Tylenol with Advil while on Xanax?"
+        assert _search_candidates(prompt) == ["Tylenol", "Advil", "Xanax"]
     
     @patch.object(MedicationInteractionAgent, '_create_medication_interaction_team')
     def test_get_response_basic_functionality(self, mock_team):
@@ -108,18 +164,269 @@ class TestMedicationInteractionAgent:
         # Should have attempted to search for potential drugs
         assert "aspirin" in result.lower() or "search" in result.lower()
     
+    def test_enhance_with_search_runs_lookups_concurrently(self):
+        """Test drug searches overlap and a failing or slow lookup does not drop the others"""
+        import threading
+        import time
+
+        started = threading.Barrier(3, timeout=5)
+
+        def search(drug):
+            started.wait()
+            if drug == "ibuprofen":
+                raise RuntimeError("rate limited")
+            if drug == "metformin":
+                time.sleep(1)
+            return f"{drug} info"
+
+        self.agent.drug_search_tool = Mock()
+        self.agent.drug_search_tool.search_drug_info.side_effect = search
+
+        with patch('app.agents.medication_interaction_agent.DRUG_SEARCH_TIMEOUT', 0.5):
+            result = self.agent._enhance_with_search("warfarin ibuprofen metformin")
+
+        assert result == "Search for 'warfarin': warfarin info..."
+
+    def test_enhance_with_search_summarizes_results_when_enabled(self):
+        """Test search results are condensed by the summarizer model, falling back to truncation"""
+        from app.agents import medication_interaction_agent as module
+
+        self.agent.drug_search_tool = Mock()
+        self.agent.drug_search_tool.search_drug_info.side_effect = lambda drug: f"{drug} raw " + "x" * 500
+
+        def summarize(prompt, stream):
+            if "ibuprofen" in prompt:
+                raise RuntimeError("quota")
+            return Mock(content="- Vitamin K antagonist\n- CYP2C9 substrate\n")
+
+        summarizer = Mock()
+        summarizer.run.side_effect = summarize
+        with patch.object(module.settings, 'MEDICATION_SEARCH_SUMMARIES', True), \
+                patch.object(MedicationInteractionAgent, '_shared_agent', return_value=summarizer):
+            result = self.agent._enhance_with_search("warfarin ibuprofen")
+
+        ibuprofen = result.split("Search for 'ibuprofen': ")[1]
+        assert "Search for 'warfarin': - Vitamin K antagonist" in result
+        assert ibuprofen == "ibuprofen raw " + "x" * 286 + "..."
+        assert summarizer.run.call_args_list[0].kwargs == {"stream": False}
+
+    def test_enhance_with_search_failure_falls_back(self):
+        """Test an unexpected search error leaves a note instead of failing the analysis"""
+        self.agent.drug_search_tool = Mock()
+        with patch('app.agents.medication_interaction_agent._drug_candidates', side_effect=RuntimeError("boom")):
+            assert self.agent._enhance_with_search("warfarin aspirin") == "Search enhancement unavailable."
+
+    def test_get_response_skips_the_team_without_a_drug_pair(self):
+        """Test empty and one-word requests never reach the team"""
+        with patch.object(self.agent, 'medication_team') as mock_team:
+            assert self.agent.get_response("aspirin") == NOT_ENOUGH_DRUGS_REPORT
+            assert self.agent.get_response("  ") == NOT_ENOUGH_DRUGS_REPORT
+
+        mock_team.run.assert_not_called()
+
+    def test_abbreviated_drug_names_reach_the_team(self):
+        """Test drug abbreviations too short to be drug candidates are left to the parser"""
+        for prompt in ["Can I combine an MAOI with an SSRI?", "Is ASA with warfarin safe?"]:
+            assert not _too_few_drugs(prompt)
+
+    def test_drug_searches_are_cached_across_requests(self):
+        """Test each drug is searched once per day, case-insensitively, unless the search found nothing"""
+        self.agent.drug_search_tool = Mock()
+        self.agent.drug_search_tool.search_drug_info.side_effect = lambda drug: (
+            f"# Drug Information: {drug}\n\n" if drug == "Zolpidem" else f"# Drug Information: {drug}\n\n## Overview\n{drug} facts\n"
+        )
+
+        self.agent._enhance_with_search("warfarin and Zolpidem")
+        result = self.agent._enhance_with_search("Warfarin with zolpidem")
+
+        searched = [call.args[0] for call in self.agent.drug_search_tool.search_drug_info.call_args_list]
+        assert sorted(searched) == ["Zolpidem", "warfarin", "zolpidem"]
+        assert "warfarin facts" in result
+        clear_drug_search_cache()
+
     def test_error_handling_in_get_response(self):
         """Test error handling in get_response method"""
         # Mock the team to raise an exception
-        with patch.object(self.agent, 'medication_team') as mock_team:
-            mock_team.run.side_effect = Exception("Test error")
-            
-            response = self.agent.get_response("test prompt")
+        with patch.object(self.agent, '_run_team', side_effect=Exception("Test error")):
+            response = self.agent.get_response("Check warfarin with ibuprofen")
             
             # Should return error message
             assert "Error in Medication Analysis" in response
             assert "Test error" in response
 
+    def _mock_team(self, run):
+        """Replace the team with mock members whose arun calls run(name, prompt)"""
+        team = {}
+        for name in ("drug_parser", "interaction_detector", "patient_context", "alert_generator"):
+            async def arun(prompt, stream, name=name):
+                assert stream is False
+                return Mock(content=await run(name, prompt))
+            team[name] = Mock(arun=arun)
+            team[name].name = name
+        return patch.object(self.agent, 'medication_team', team)
+
+    def test_get_response_runs_the_team_in_stages(self):
+        """Test the parser runs first, the two reviews build on it together and the alert generator reports"""
+        prompts = {}
+        both_started = asyncio.Event()
+
+        async def run(name, prompt):
+            prompts[name] = prompt
+            if name in ("interaction_detector", "patient_context"):
+                if len(prompts) == 3:
+                    both_started.set()
+                await asyncio.wait_for(both_started.wait(), timeout=1)
+            return f"{name} report"
+
+        with self._mock_team(run), patch.object(self.agent, '_enhance_with_search', return_value=""):
+            response = self.agent.get_response("Check aspirin and ibuprofen")
+
+        assert response == "alert_generator report"
+        assert "Reports from the team" not in prompts["drug_parser"]
+        assert '<report agent="drug_parser">\ndrug_parser report\n</report>' in prompts["patient_context"]
+        assert prompts["interaction_detector"] == prompts["patient_context"]
+        for name in ("drug_parser", "interaction_detector", "patient_context"):
+            assert f"{name} report" in prompts["alert_generator"]
+
+    def test_failing_reviewer_does_not_abort_the_analysis(self):
+        """Test a failed team member leaves a note for the alert generator instead of an error report"""
+        prompts = {}
+
+        async def run(name, prompt):
+            prompts[name] = prompt
+            if name == "patient_context":
+                raise RuntimeError("quota exceeded")
+            return f"{name} report"
+
+        with self._mock_team(run), patch.object(self.agent, '_enhance_with_search', return_value=""):
+            response = self.agent.get_response("Check aspirin and ibuprofen")
+
+        assert response == "alert_generator report"
+        assert "_patient_context failed: quota exceeded_" in prompts["alert_generator"]
+        assert "interaction_detector report" in prompts["alert_generator"]
+
+    def test_stalled_member_runs_are_retried_then_noted(self):
+        """Test a member run past the timeout is retried, and one that never finishes is reported as failed"""
+        from app.agents import medication_interaction_agent as module
+
+        calls = []
+        prompts = {}
+
+        async def run(name, prompt):
+            calls.append(name)
+            prompts[name] = prompt
+            if name == "patient_context" or (name == "drug_parser" and calls.count(name) == 1):
+                await asyncio.sleep(1)
+            return f"{name} report"
+
+        with self._mock_team(run), patch.object(self.agent, '_enhance_with_search', return_value=""), \
+                patch.object(module.settings, 'LLM_REQUEST_TIMEOUT', 0.05), \
+                patch.object(module.settings, 'LLM_MAX_RETRIES', 1):
+            response = self.agent.get_response("Check aspirin and ibuprofen")
+
+        assert response == "alert_generator report"
+        assert calls.count("drug_parser") == 2
+        assert calls.count("patient_context") == 2
+        assert "drug_parser report" in prompts["alert_generator"]
+        assert "_patient_context failed: patient_context did not finish within 0.05s (2 attempts)_" in prompts["alert_generator"]
+
+    def test_reports_are_cached_by_normalized_request(self):
+        """Test a repeated request is answered from the cache, but not after a member failed"""
+        calls = []
+
+        async def run(name, prompt):
+            calls.append(name)
+            if name == "patient_context" and len(calls) <= 4:
+                raise RuntimeError("quota exceeded")
+            return f"{name} report"
+
+        with self._mock_team(run), patch.object(self.agent, '_enhance_with_search', return_value=""):
+            assert self.agent.get_response("Check aspirin and ibuprofen") == "alert_generator report"
+            assert self.agent.get_response("check  Aspirin and ibuprofen\n") == "alert_generator report"
+            assert len(calls) == 8
+            assert self.agent.get_response("CHECK aspirin and ibuprofen") == "alert_generator report"
+            assert len(calls) == 8
+
+    def test_get_response_stream_streams_the_final_report(self):
+        """Test the earlier stages run in full and the alert generator's report is streamed and cached"""
+        prompts = {}
+
+        async def run(name, prompt):
+            prompts[name] = prompt
+            return f"{name} report"
+
+        with self._mock_team(run), patch.object(self.agent, '_enhance_with_search', return_value=""):
+            alert_generator = self.agent.medication_team["alert_generator"]
+            alert_generator.run.return_value = iter([Mock(content="## Alerts"), Mock(content=None), Mock(content="\nNone")])
+            assert list(self.agent.get_response_stream("Check aspirin and ibuprofen")) == ["## Alerts", "\nNone"]
+            assert self.agent.get_response("check aspirin and ibuprofen") == "## Alerts\nNone"
+
+        report_prompt = alert_generator.run.call_args.args[0]
+        assert alert_generator.run.call_args.kwargs == {"stream": True}
+        assert '<report agent="patient_context">\npatient_context report\n</report>' in report_prompt
+        assert "alert_generator" not in prompts
+
+    def test_batch_analyzes_requests_concurrently_on_separate_teams(self):
+        """Test batched requests overlap up to the concurrency limit, each on its own team"""
+        running = []
+        peak = []
+
+        async def run(name, prompt):
+            running.append(name)
+            peak.append(running.count("drug_parser"))
+            await asyncio.sleep(0.01)
+            running.remove(name)
+            return f"{name} report for {'ibuprofen' if 'ibuprofen' in prompt else 'naproxen'}"
+
+        with self._mock_team(run) as team, patch.object(self.agent, '_enhance_with_search', return_value=""), \
+                patch.object(self.agent, '_create_medication_interaction_team', side_effect=lambda: self._mock_team(run).new):
+            responses = asyncio.run(self.agent.get_responses_batch(
+                ["Check aspirin and ibuprofen", "Check aspirin and naproxen", "aspirin", "Check warfarin and ibuprofen"],
+                concurrency=2,
+            ))
+            assert self.agent.medication_team is team
+
+        assert responses == [
+            "alert_generator report for ibuprofen",
+            "alert_generator report for naproxen",
+            NOT_ENOUGH_DRUGS_REPORT,
+            "alert_generator report for ibuprofen",
+        ]
+        assert max(peak) == 2
+
+    def test_team_members_do_not_stream(self):
+        """Test no team member is configured to stream"""
+        team = self.agent.medication_team
+        assert set(team) == {"drug_parser", "interaction_detector", "patient_context", "alert_generator"}
+        assert all(member.stream is False for member in team.values())
+
+    def test_only_the_interaction_detector_has_reasoning_tools(self):
+        """Test the formatting members answer directly instead of looping through analyze()/think()"""
+        from agno.tools.reasoning import ReasoningTools
+
+        reasoning = {
+            name for name, member in self.agent.medication_team.items()
+            if any(isinstance(tool, ReasoningTools) for tool in member.tools or [])
+        }
+        assert reasoning == {"interaction_detector"}
+
+    def test_reasoning_tool_contract_is_stated_once(self):
+        """Test the analyze() contract lives in the shared prompt, not in every member"""
+        with patch.object(self.agent, '_enhance_with_search', return_value=""):
+            prompt = self.agent._analysis_prompt("Check warfarin with aspirin")
+
+        assert prompt.count("analyze() function requires") == 1
+        for member in self.agent.medication_team.values():
+            assert not any("analyze(" in line for line in member.instructions)
+
+    def test_analysis_prompt_fills_the_template(self):
+        """Test the request and search results are placed verbatim, braces included"""
+        with patch.object(self.agent, '_enhance_with_search', return_value="Search for 'warfarin': {found}"):
+            prompt = self.agent._analysis_prompt("Check warfarin {5mg} with aspirin")
+
+        assert "USER REQUEST:\n        Check warfarin {5mg} with aspirin\n" in prompt
+        assert "ENHANCED INFORMATION FROM SEARCH:\n        Search for 'warfarin': {found}\n" in prompt
+
 
 class TestMedicationAgentIntegration:
     """Integration tests for medication agent"""
@@ -0,0 +1,83 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.agents.medication_safety_guardian_agent import _REVIEW_CACHE, MedicationSafetyGuardianAgent
+
+
+@pytest.fixture(autouse=True)
+def clear_review_cache():
+    _REVIEW_CACHE.clear()
+    yield
+    _REVIEW_CACHE.clear()
+
+
+def test_safety_review_awaits_the_team_without_streaming():
+    agent = MedicationSafetyGuardianAgent()
+
+    with patch.object(agent, "medication_safety_team") as team:
+        team.arun = AsyncMock(return_value=Mock(content="## Safety Alerts\nNone"))
+        assert agent.get_response("72 year old on warfarin and amiodarone") == "## Safety Alerts\nNone"
+
+    prompt = team.arun.call_args.args[0]
+    assert "72 year old on warfarin and amiodarone" in prompt
+    assert team.arun.call_args.kwargs == {"stream": False}
+    team.run.assert_not_called()
+
+
+def test_safety_review_reports_team_errors():
+    agent = MedicationSafetyGuardianAgent()
+
+    with patch.object(agent, "medication_safety_team") as team:
+        team.arun = AsyncMock(side_effect=RuntimeError("quota exceeded"))
+        report = asyncio.run(agent.review_medication_safety_async("on warfarin"))
+
+    assert report == "# Error: quota exceeded"
+
+
+def test_safety_review_streams_the_team_report():
+    agent = MedicationSafetyGuardianAgent()
+
+    with patch.object(agent, "medication_safety_team") as team:
+        team.run.return_value = iter([Mock(content="## Safety"), Mock(content=""), Mock(content=" Alerts")])
+        assert list(agent.get_response_stream("On warfarin and aspirin")) == ["## Safety", " Alerts"]
+        assert agent.get_response("on warfarin and aspirin") == "## Safety Alerts"
+
+    assert team.run.call_args.kwargs == {"stream": True}
+    team.arun.assert_not_called()
+
+
+def test_safety_reviews_are_cached_by_normalized_case():
+    agent = MedicationSafetyGuardianAgent()
+
+    with patch.object(agent, "medication_safety_team") as team:
+        team.arun = AsyncMock(side_effect=[RuntimeError("quota exceeded"), Mock(content="## Review")])
+        assert agent.get_response("On warfarin and aspirin") == "# Error: quota exceeded"
+        assert agent.get_response("On warfarin and aspirin") == "## Review"
+        assert agent.get_response("  on WARFARIN and aspirin ") == "## Review"
+
+    assert team.arun.call_count == 2
+
+
+def test_safety_agents_reuse_the_team_within_a_thread():
+    import threading
+
+    first = MedicationSafetyGuardianAgent()
+    assert MedicationSafetyGuardianAgent().medication_safety_team is first.medication_safety_team
+
+    other = []
+    worker = threading.Thread(target=lambda: other.append(MedicationSafetyGuardianAgent().medication_safety_team))
+    worker.start()
+    worker.join()
+    assert other[0] is not first.medication_safety_team
+
+
+def test_only_the_analyst_members_have_reasoning_tools():
+    from agno.tools.googlesearch import GoogleSearchTools
+    from agno.tools.reasoning import ReasoningTools
+
+    members = MedicationSafetyGuardianAgent().medication_safety_team.team
+    reasoning = {member.name for member in members if any(isinstance(tool, ReasoningTools) for tool in member.tools)}
+    assert reasoning == {"Drug Interaction Analyzer Agent", "Clinical Safety Analyst Agent"}
+    assert all(any(isinstance(tool, GoogleSearchTools) for tool in member.tools) for member in members)
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import time
+
+from agno.tools.function import Function, FunctionCall
+
+from app.agents.base_agent import BaseAgent
+from app.agents.pooled_gemini import PooledGemini, shared_genai_client
+
+
+def test_pooled_gemini_models_share_a_client_per_thread():
+    first = PooledGemini(id="gemini-2.0-flash", api_key="test-key").get_client()
+    second = PooledGemini(id="gemini-2.0-flash-lite", api_key="test-key").get_client()
+    other_key = PooledGemini(id="gemini-2.0-flash", api_key="other-key").get_client()
+
+    assert first is second is shared_genai_client("test-key")
+    assert other_key is not first
+
+    other_thread = []
+    worker = threading.Thread(
+        target=lambda: other_thread.append(PooledGemini(id="gemini-2.0-flash", api_key="test-key").get_client())
+    )
+    worker.start()
+    worker.join()
+    assert other_thread[0] is not first
+
+
+def test_pooled_gemini_keeps_a_private_client_for_custom_params():
+    custom = PooledGemini(id="gemini-2.0-flash", api_key="test-key", client_params={"http_options": {"timeout": 5000}})
+
+    assert custom.get_client() is not shared_genai_client("test-key")
+
+
+def test_run_async_reuses_the_thread_event_loop():
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    first = BaseAgent._run_async(current_loop())
+    assert BaseAgent._run_async(current_loop()) is first
+    assert not first.is_closed()
+
+
+def test_pooled_gemini_runs_tool_calls_concurrently():
+    def slow_search(query: str) -> str:
+        time.sleep(0.2)
+        return f"results for {query}"
+
+    function = Function.from_callable(slow_search)
+    calls = [FunctionCall(function=function, arguments={"query": q}, call_id=str(i)) for i, q in enumerate(["cdc", "who"])]
+    results = []
+
+    started = time.perf_counter()
+    list(PooledGemini(id="gemini-2.0-flash", api_key="test-key").run_function_calls(calls, results))
+
+    assert time.perf_counter() - started < 0.35
+    assert [result.content for result in results] == ["results for cdc", "results for who"]
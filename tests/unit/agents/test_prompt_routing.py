@@ -0,0 +1,36 @@
+from app.agents.prompt_routing import first_match, keyword_hits, keyword_pattern, prompt_terms, series_length
+
+
+def test_prompt_terms_include_words_and_pairs():
+    """Test that prompts are tokenized into words and adjacent word pairs"""
+    terms = prompt_terms("Help me with Personal Growth!")
+
+    assert {"help", "me", "personal", "growth"} <= terms
+    assert {"help me", "personal growth"} <= terms
+
+
+def test_first_match_respects_map_order():
+    """Test that the earliest keyword in the map wins when several match"""
+    keyword_map = {"formal": "formal", "inspirational": "inspirational"}
+
+    assert first_match(prompt_terms("an inspirational yet formal post"), keyword_map, "casual") == "formal"
+    assert first_match(prompt_terms("a relaxed post"), keyword_map, "casual") == "casual"
+
+
+def test_series_length_extraction():
+    """Test that series length is read from the prompt within 3-10"""
+    assert series_length("Create a 7-part series") == 7
+    assert series_length("Create a 10 post series") == 10
+    assert series_length("Create a series about wellness") == 5
+    assert series_length("Create a 12 post series") == 5
+    assert series_length("A series on the top 3 habits, in 6 Posts") == 6
+    assert series_length("Python 3 tips: a 4-part series") == 4
+
+
+def test_keyword_hits_finds_overlapping_substrings_in_one_pass():
+    """Test that substring keywords are all reported, including ones inside other words"""
+    pattern = keyword_pattern(["explain", "vs", " vs ", "what is", "news"])
+
+    hits = keyword_hits(pattern, "Explaining what is new: React VS Vue")
+
+    assert hits == frozenset({"explain", "what is", "vs", " vs "})
@@ -0,0 +1,238 @@
+import threading
+from unittest.mock import Mock, patch
+
+from app.agents.lifestyle_blog_writer_agent import LifestyleBlogWriterAgent
+from app.agents.semantic_cache import SemanticCache, embed_text, semantic_cached
+
+
+def test_embed_text_is_normalised():
+    """Test that embeddings are unit length and deterministic"""
+    vector = embed_text("Morning routines for busy parents")
+    assert abs(float(vector @ vector) - 1.0) < 1e-5
+    assert (vector == embed_text("Morning routines for busy parents")).all()
+
+
+def test_semantic_cache_hits_on_paraphrase():
+    """Test that a near-identical request returns the cached response"""
+    cache = SemanticCache(threshold=0.9)
+    cache.set(("post", "casual"), "Morning routines for busy parents", "Cached post")
+
+    assert cache.get(("post", "casual"), "morning routines for busy parents!") == "Cached post"
+
+
+def test_semantic_cache_misses_on_different_topic():
+    """Test that an unrelated request is not served from the cache"""
+    cache = SemanticCache(threshold=0.92)
+    cache.set(("post", "casual"), "Morning routines for busy parents", "Cached post")
+
+    assert cache.get(("post", "casual"), "Evening yoga for beginners") is None
+
+
+def test_semantic_cache_key_is_a_hard_filter():
+    """Test that identical text under a different key is a miss"""
+    cache = SemanticCache()
+    cache.set(("post", "casual"), "Morning routines", "Casual post")
+
+    assert cache.get(("post", "formal"), "Morning routines") is None
+
+
+def test_semantic_cache_expires_entries():
+    """Test that entries older than the ttl are dropped"""
+    cache = SemanticCache(ttl=10)
+    with patch("app.agents.semantic_cache.time.time", return_value=100.0):
+        cache.set("key", "Morning routines", "Cached post")
+    with patch("app.agents.semantic_cache.time.time", return_value=111.0):
+        assert cache.get("key", "Morning routines") is None
+    assert len(cache) == 0
+
+
+def test_semantic_cache_evicts_least_recently_used():
+    """Test that the cache never grows beyond maxsize"""
+    cache = SemanticCache(maxsize=2)
+    cache.set("key", "first topic", "first")
+    cache.set("key", "second topic", "second")
+    cache.get("key", "first topic")
+    cache.set("key", "third topic", "third")
+
+    assert len(cache) == 2
+    assert cache.get("key", "first topic") == "first"
+    assert cache.get("key", "second topic") is None
+
+
+def test_lifestyle_agent_reuses_cached_generation():
+    """Test that repeated lifestyle requests only call the model once"""
+    agent = LifestyleBlogWriterAgent()
+    LifestyleBlogWriterAgent._generate.cache.clear()
+
+    with patch.object(agent.lifestyle_blog_writer, 'run') as mock_run:
+        mock_run.return_value = iter([Mock(content="Cached guide")])
+
+        first = agent.create_lifestyle_guide("Healthy sleep habits", "students")
+        second = agent.create_lifestyle_guide("healthy sleep habits", "students")
+
+        assert first == second == "Cached guide"
+        mock_run.assert_called_once()
+
+    LifestyleBlogWriterAgent._generate.cache.clear()
+
+
+def test_lifestyle_agent_does_not_cache_errors():
+    """Test that failed generations are retried rather than cached"""
+    agent = LifestyleBlogWriterAgent()
+    LifestyleBlogWriterAgent._generate.cache.clear()
+
+    with patch.object(agent.lifestyle_blog_writer, 'run') as mock_run:
+        mock_run.side_effect = [Exception("API Error"), iter([Mock(content="Recovered guide")])]
+
+        assert "Error creating lifestyle guide" in agent.create_lifestyle_guide("Digital detox", "teens")
+        assert agent.create_lifestyle_guide("Digital detox", "teens") == "Recovered guide"
+
+    LifestyleBlogWriterAgent._generate.cache.clear()
+
+
+def test_semantic_cache_persists_to_sqlite(tmp_path):
+    """Test that entries written to the database are served by a new cache instance"""
+    db_file = str(tmp_path / "semantic_cache.db")
+    SemanticCache(db_file=db_file).set(("post", "casual"), "Morning routines for busy parents", "Cached post")
+
+    restored = SemanticCache(db_file=db_file)
+
+    assert len(restored) == 1
+    assert restored.get(("post", "casual"), "morning routines for busy parents") == "Cached post"
+    assert restored.get(("post", "formal"), "morning routines for busy parents") is None
+
+
+def test_semantic_cache_evictions_are_removed_from_sqlite(tmp_path):
+    """Test that evicted entries are not restored from the database"""
+    db_file = str(tmp_path / "semantic_cache.db")
+    cache = SemanticCache(maxsize=1, db_file=db_file)
+    cache.set("key", "first topic", "first")
+    cache.set("key", "second topic", "second")
+
+    restored = SemanticCache(db_file=db_file)
+
+    assert len(restored) == 1
+    assert restored.get("key", "second topic") == "second"
+
+
+def test_semantic_caches_sharing_a_database_use_separate_tables(tmp_path):
+    """Test that a cache does not load or evict rows from another cache's table"""
+    db_file = str(tmp_path / "semantic_cache.db")
+    SemanticCache(db_file=db_file).set("key", "first topic", "first")
+    other = SemanticCache(maxsize=1, db_file=db_file, table="other_cache")
+    other.set("key", "second topic", "second")
+    other.set("key", "third topic", "third")
+
+    assert len(other) == 1
+    assert SemanticCache(db_file=db_file).get("key", "first topic") == "first"
+
+
+def test_semantic_cache_exact_match_skips_embedding():
+    """Test that an identical request is answered without embedding the text"""
+    cache = SemanticCache()
+    cache.set(("post", "casual"), "Morning routines", "Cached post")
+
+    with patch("app.agents.semantic_cache.embed_text") as mock_embed:
+        assert cache.get(("post", "casual"), "Morning routines") == "Cached post"
+        assert cache.get(("post", "casual"), "morning routines!", strategy="exact-match") is None
+        mock_embed.assert_not_called()
+
+
+def test_semantic_cached_strategy_off_bypasses_cache():
+    """Test that cache_strategy="off" always calls through"""
+    class Writer:
+        calls = 0
+
+        @semantic_cached()
+        def generate(self, key, text):
+            Writer.calls += 1
+            return f"post {Writer.calls}"
+
+    writer = Writer()
+    assert writer.generate("key", "Morning routines") == "post 1"
+    assert writer.generate("key", "Morning routines") == "post 1"
+    assert writer.generate("key", "Morning routines", cache_strategy="off") == "post 2"
+
+
+def test_semantic_cache_neighbors_returns_near_misses():
+    """Test that related entries below the hit threshold are returned closest first"""
+    cache = SemanticCache(threshold=0.92)
+    cache.set("key", "Morning routines for busy parents", "Parents post")
+    cache.set("key", "Morning routines for busy working moms", "Moms post")
+    cache.set("key", "Evening yoga for beginners", "Yoga post")
+
+    neighbors = cache.neighbors("key", "Morning routines for busy working parents", k=3, min_similarity=0.75)
+
+    assert cache.get("key", "Morning routines for busy working parents") is None
+    assert [response for _, response in neighbors] == ["Moms post", "Parents post"]
+    assert neighbors[0][0] >= neighbors[1][0]
+    assert cache.neighbors("other", "Morning routines for busy working parents") == []
+
+
+def test_lifestyle_agent_adapts_near_miss_on_fast_model():
+    """Test that a near-miss request adapts related cached guides with the fast model"""
+    agent = LifestyleBlogWriterAgent()
+    LifestyleBlogWriterAgent._generate.cache.clear()
+
+    with patch.object(agent.lifestyle_blog_writer, 'run') as mock_quality, \
+            patch.object(agent.lifestyle_blog_writer_fast, 'run') as mock_fast:
+        mock_fast.side_effect = [iter([Mock(content="Morning guide")]), iter([Mock(content="Evening guide")])]
+
+        agent.create_lifestyle_guide("Morning routines for busy working parents", "parents", model_tier="fast")
+        result = agent.create_lifestyle_guide("Evening routines for busy working parents", "parents", model_tier="fast")
+
+        assert result == "Evening guide"
+        mock_quality.assert_not_called()
+        prompt = mock_fast.call_args.args[0]
+        assert "<previous_post_on_similar_topic>\nMorning guide\n</previous_post_on_similar_topic>" in prompt[-1]["text"]
+
+    LifestyleBlogWriterAgent._generate.cache.clear()
+
+
+def test_lifestyle_agent_writes_quality_near_misses_from_scratch():
+    """Test that quality requests are never adapted from related guides, since the fast model would write them"""
+    agent = LifestyleBlogWriterAgent()
+    LifestyleBlogWriterAgent._generate.cache.clear()
+
+    with patch.object(agent.lifestyle_blog_writer, 'run') as mock_quality, \
+            patch.object(agent.lifestyle_blog_writer_fast, 'run') as mock_fast:
+        mock_quality.side_effect = [iter([Mock(content="Morning guide")]), iter([Mock(content="Evening guide")])]
+
+        agent.create_lifestyle_guide("Morning routines for busy working parents", "parents")
+        result = agent.create_lifestyle_guide("Evening routines for busy working parents", "parents")
+
+        assert result == "Evening guide"
+        mock_fast.assert_not_called()
+        assert "previous_post_on_similar_topic" not in str(mock_quality.call_args.args[0])
+
+    LifestyleBlogWriterAgent._generate.cache.clear()
+
+
+def test_semantic_cached_single_flights_concurrent_misses():
+    """Test that concurrent identical requests share one generation"""
+    started = threading.Event()
+    release = threading.Event()
+
+    class Writer:
+        calls = 0
+
+        @semantic_cached()
+        def generate(self, key, text):
+            Writer.calls += 1
+            started.set()
+            release.wait(timeout=5)
+            return "shared post"
+
+    writer = Writer()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(writer.generate("key", "Morning routines"))) for _ in range(5)]
+    threads[0].start()
+    started.wait(timeout=5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert Writer.calls == 1
+    assert results == ["shared post"] * 5
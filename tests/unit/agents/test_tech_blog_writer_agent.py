@@ -10,6 +10,20 @@ def test_tech_blog_writer_agent_initialization():
     assert agent.tech_blog_writer is not None
 
 
+def test_tech_blog_writer_agents_reuse_the_writer_within_a_thread():
+    """Test the writer is built once per worker thread, not per agent"""
+    import threading
+
+    first = TechBlogWriterAgent()
+    assert TechBlogWriterAgent().tech_blog_writer is first.tech_blog_writer
+
+    other = []
+    worker = threading.Thread(target=lambda: other.append(TechBlogWriterAgent().tech_blog_writer))
+    worker.start()
+    worker.join()
+    assert other[0] is not first.tech_blog_writer
+
+
 def test_tech_blog_writer_agent_get_response():
     """Test the get_response method with a simple prompt"""
     agent = TechBlogWriterAgent()
@@ -272,3 +286,10 @@ class TestTechBlogWriterAgentIntegration:
         assert len(result) > 0
         assert "react" in result.lower()
         assert "vue" in result.lower()
+
+
+def test_tech_blog_writer_uses_shared_client_model():
+    from app.agents.cached_claude import CachedClaude
+
+    agent = TechBlogWriterAgent()
+    assert isinstance(agent.tech_blog_writer.model, CachedClaude)
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 import os
 import sys
@@ -172,3 +173,31 @@ class TestAgentService:
             assert len(result) == 2
             assert result[0].name == "Fixture Agent 1"
             assert result[1].name == "Fixture Agent 2"
+
+    @patch.object(agent_service_module, 'AgentFactory')
+    @patch.object(agent_service_module, 'AgentRepository')
+    def test_stream_agent_by_id_yields_sse_events(self, mock_agent_repository, mock_agent_factory):
+        """Test stream_agent_by_id emits one SSE data event per chunk followed by a done event"""
+        mock_agent_repository.return_value.get_by_id.return_value = MagicMock(slug="lifestyle-blog-writer-agent")
+        mock_agent_factory.get_agent.return_value.get_response_stream.return_value = iter(["Hello", " world"])
+
+        service = AgentService()
+        with patch.object(service, 'save_user_agent_run') as mock_save:
+            events = service.stream_agent_by_id(1, "Write a post", "user@example.com")
+
+            async def collect():
+                return [event async for event in events]
+
+            result = asyncio.run(collect())
+
+        mock_save.assert_called_once_with("user@example.com", 1)
+        assert result == [
+            'data: {"delta": "Hello"}\n\n',
+            'data: {"delta": " world"}\n\n',
+            "event: done\ndata: {}\n\n",
+        ]
+
+    def test_stream_agent_by_id_rejects_empty_prompt(self):
+        """Test stream_agent_by_id validates the prompt before streaming"""
+        with pytest.raises(ValueError):
+            AgentService().stream_agent_by_id(1, "", "user@example.com")
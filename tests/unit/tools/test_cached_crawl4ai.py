@@ -0,0 +1,70 @@
+import threading
+import time
+from unittest.mock import AsyncMock, patch
+
+from agno.tools.crawl4ai import Crawl4aiTools
+
+from app.tools.cached_crawl4ai import CachedCrawl4aiTools, clear_crawl_cache
+
+
+def test_crawls_are_shared_across_toolkit_instances():
+    """Test that a URL crawled by one agent's toolkit is reused by another's"""
+    clear_crawl_cache()
+    with patch.object(CachedCrawl4aiTools, "_crawl", return_value="page") as mock_crawl:
+        assert CachedCrawl4aiTools(max_length=None).web_crawler("https://example.com") == "page"
+        assert CachedCrawl4aiTools(max_length=None).web_crawler("https://example.com") == "page"
+        assert CachedCrawl4aiTools(max_length=None).web_crawler("https://example.org") == "page"
+
+    assert mock_crawl.call_count == 2
+    clear_crawl_cache()
+
+
+def test_concurrent_crawls_of_a_url_are_single_flighted():
+    """Test that agents crawling the same URL at once wait for one fetch"""
+    clear_crawl_cache()
+
+    def slow_crawl(url, max_length=None):
+        time.sleep(0.05)
+        return f"crawl of {url}"
+
+    results = []
+    with patch.object(CachedCrawl4aiTools, "_crawl", side_effect=slow_crawl) as mock_crawl:
+        threads = [
+            threading.Thread(target=lambda: results.append(CachedCrawl4aiTools(max_length=None).web_crawler("https://example.com")))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert results == ["crawl of https://example.com"] * 6
+    mock_crawl.assert_called_once()
+    clear_crawl_cache()
+
+
+def test_failed_crawls_are_not_cached():
+    """Test that a crawl error propagates and the next crawl retries"""
+    clear_crawl_cache()
+    with patch.object(CachedCrawl4aiTools, "_crawl", side_effect=[RuntimeError("timeout"), "page"]):
+        tools = CachedCrawl4aiTools(max_length=None)
+        try:
+            tools.web_crawler("https://example.com")
+        except RuntimeError:
+            pass
+        assert tools.web_crawler("https://example.com") == "page"
+    clear_crawl_cache()
+
+
+def test_crawler_is_built_on_first_crawl():
+    """Test that crawl4ai is only set up once the toolkit crawls a page"""
+    clear_crawl_cache()
+    tools = CachedCrawl4aiTools(max_length=500)
+    assert tools._crawler is None
+    assert [function.name for function in tools.functions.values()] == ["web_crawler"]
+
+    with patch.object(Crawl4aiTools, "_async_web_crawler", new_callable=AsyncMock, return_value="page") as mock_crawl:
+        assert tools.web_crawler("https://example.com") == "page"
+    assert tools._crawler.max_length == 500
+    mock_crawl.assert_awaited_once_with("https://example.com", None)
+    clear_crawl_cache()
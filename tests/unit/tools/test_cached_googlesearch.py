@@ -0,0 +1,44 @@
+import threading
+import time
+from unittest.mock import patch
+
+from agno.tools.googlesearch import GoogleSearchTools
+
+from app.tools.cached_googlesearch import CachedGoogleSearchTools, clear_search_cache
+
+
+def test_equivalent_queries_share_one_search():
+    """Test that queries differing only in case and spacing are searched once"""
+    clear_search_cache()
+    with patch.object(GoogleSearchTools, "google_search", return_value="[]") as mock_search:
+        assert CachedGoogleSearchTools().google_search("Incubyte reviews") == "[]"
+        assert CachedGoogleSearchTools().google_search("  incubyte   REVIEWS ") == "[]"
+        CachedGoogleSearchTools().google_search("incubyte reviews", max_results=10)
+
+    assert mock_search.call_count == 2
+    mock_search.assert_any_call("incubyte reviews", 5, "en")
+    clear_search_cache()
+
+
+def test_concurrent_identical_searches_are_single_flighted():
+    """Test that agents searching the same query at once wait for one request"""
+    clear_search_cache()
+
+    def slow_search(query, max_results=5, language="en"):
+        time.sleep(0.05)
+        return f"results for {query}"
+
+    results = []
+    with patch.object(GoogleSearchTools, "google_search", side_effect=slow_search) as mock_search:
+        threads = [
+            threading.Thread(target=lambda: results.append(CachedGoogleSearchTools().google_search("site:example.com")))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert results == ["results for site:example.com"] * 4
+    mock_search.assert_called_once()
+    clear_search_cache()
@@ -0,0 +1,107 @@
+from unittest.mock import Mock
+
+from app.tools.duckduckgo_search import DuckDuckGoSearchTool, FreeDrugSearchTool
+
+RESULTS_PAGE = """
+<a rel="nofollow" class="result__a" href="https://example.com/aspirin">Aspirin overview</a>
+<a class="result__snippet" href="https://example.com/aspirin">Pain reliever and antiplatelet.</a>
+<a rel="nofollow" class="result__a" href="https://www.drugs.com/aspirin.html"> Aspirin - Drugs.com </a>
+<a class="result__snippet" href="https://www.drugs.com/aspirin.html"> Uses, dosage and warnings. </a>
+"""
+
+
+def test_search_web_results_parses_results_page():
+    tool = DuckDuckGoSearchTool(max_results=5)
+    tool.session = Mock()
+    tool.session.get.return_value = Mock(text=RESULTS_PAGE)
+
+    results = tool.search_web_results("aspirin")
+
+    assert [result["url"] for result in results] == ["https://www.drugs.com/aspirin.html", "https://example.com/aspirin"]
+    assert results[0]["title"] == "Aspirin - Drugs.com"
+    assert results[0]["snippet"] == "Uses, dosage and warnings."
+    assert results[0]["is_medical_source"] is True
+    assert results[1]["snippet"] == "Pain reliever and antiplatelet."
+
+
+def test_search_drug_info_formats_results_as_markdown():
+    tool = FreeDrugSearchTool()
+    tool.search_engine = Mock()
+    tool.search_engine.search_drug_information.return_value = {
+        "instant_answers": {"abstract": "Aspirin is an NSAID."},
+        "interaction_sources": [
+            {"title": "Aspirin interactions", "snippet": "Bleeding risk with warfarin.", "url": "https://www.drugs.com/aspirin"},
+            {"error": "timeout"},
+        ],
+        "fda_sources": [{"title": "Label", "snippet": "Approved uses.", "url": "https://fda.gov/aspirin", "is_medical_source": True}],
+    }
+
+    assert tool.search_drug_info("aspirin") == (
+        "# Drug Information: aspirin\n\n"
+        "## Overview\nAspirin is an NSAID.\n\n"
+        "## Interaction Information Sources\n"
+        "- **Aspirin interactions**\n  Bleeding risk with warfarin.\n  Source: https://www.drugs.com/aspirin\n\n"
+        "## Official/FDA Sources\n"
+        "- **Label**\n  Approved uses.\n  Source: https://fda.gov/aspirin\n\n"
+    )
+
+
+def test_search_general_only_serves_drug_queries():
+    tool = FreeDrugSearchTool()
+    tool.search_engine = Mock()
+    tool.search_engine.search_web_results.return_value = [{"title": "Aspirin", "snippet": "NSAID", "url": "https://www.drugs.com/aspirin"}]
+
+    assert tool.search_general("Aspirin SIDE EFFECTS").startswith("# Search Results: Aspirin SIDE EFFECTS")
+    assert tool.search_general("weather in Pune").startswith("This search tool is optimized")
+    tool.search_engine.search_web_results.assert_called_once_with("Aspirin SIDE EFFECTS")
+
+
+def test_search_drug_information_runs_its_queries_concurrently():
+    import threading
+
+    tool = DuckDuckGoSearchTool(delay=0)
+    searches_started = threading.Barrier(3, timeout=5)
+
+    def instant(query):
+        searches_started.wait()
+        return {"query": query}
+
+    def web(query):
+        searches_started.wait()
+        return [{"query": query}]
+
+    tool.search_instant_answers = instant
+    tool.search_web_results = web
+    results = tool.search_drug_information("aspirin")
+
+    assert results["instant_answers"] == {"query": "aspirin drug medication"}
+    assert results["interaction_sources"] == [{"query": "aspirin drug interactions side effects"}]
+    assert results["fda_sources"] == [{"query": "aspirin FDA approved drug information"}]
+
+
+def test_requests_are_capped_across_concurrent_lookups():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from app.tools import duckduckgo_search
+
+    tool = DuckDuckGoSearchTool(delay=0)
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def get(url, timeout):
+        with lock:
+            in_flight.append(url)
+            peak.append(len(in_flight))
+        threading.Event().wait(0.02)
+        with lock:
+            in_flight.remove(url)
+        return Mock(text="", json=Mock(return_value={}))
+
+    tool.session = Mock()
+    tool.session.get.side_effect = get
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(tool.search_drug_information, ["aspirin", "warfarin", "metformin", "lisinopril"]))
+
+    assert tool.session.get.call_count == 12
+    assert max(peak) <= duckduckgo_search.MAX_CONCURRENT_REQUESTS